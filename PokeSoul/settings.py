@@ -51,6 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.QueryAccountingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -58,6 +59,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middleware.PerformanceLoggingMiddleware",
+    "core.middleware.ReplicaPinningMiddleware",
+    "core.middleware.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "PokeSoul.urls"
@@ -94,11 +97,83 @@ DATABASES = {
     }
 }
 
+# Read replicas as "host" or "host:port", with the primary's credentials.
+# Catalog and questionnaire reads are spread over them (see core/db_router.py).
+DATABASE_REPLICAS = []
+for number, replica in enumerate(env.list("DATABASE_REPLICA_HOSTS", default=[]), 1):
+    replica_host, _, replica_port = replica.partition(":")
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        # Tests run against the primary only
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+
 # Redis settings
 REDIS_HOST = env("REDIS_HOST", default="localhost")
 REDIS_PORT = env("REDIS_PORT", default=6379)
 REDIS_DB = env("REDIS_DB", default=0)
 
+# PokeAPI settings
+POKEAPI_BASE_URL = env("POKEAPI_BASE_URL", default="https://pokeapi.co/api/v2")
+# On-disk cache of PokeAPI responses, revalidated with ETag / Last-Modified.
+# Set to an empty string to disable; POKEAPI_OFFLINE serves from it exclusively.
+POKEAPI_CACHE_DIR = env(
+    "POKEAPI_CACHE_DIR", default=str(BASE_DIR / ".cache" / "pokeapi")
+)
+POKEAPI_OFFLINE = env.bool("POKEAPI_OFFLINE", default=False)
+# Limit on requests to PokeAPI shared through Redis by every web worker and
+# ingest process (requests per second, burst size); 0 disables it.
+POKEAPI_RATE_LIMIT = env.float("POKEAPI_RATE_LIMIT", default=20)
+POKEAPI_BURST = env.int("POKEAPI_BURST", default=20)
+# Pooled keep-alive connections to PokeAPI per event loop (async search view)
+POKEAPI_MAX_CONNECTIONS = env.int("POKEAPI_MAX_CONNECTIONS", default=20)
+# Threads scoring matches for the async match view, shared by the process
+MATCH_SCORING_WORKERS = env.int("MATCH_SCORING_WORKERS", default=4)
+# How match results are stored: "sync" inserts before responding, "redis" or
+# "memory" queue them for a background bulk insert (see matcher/write_behind.py)
+MATCH_RESULT_WRITE_MODE = env("MATCH_RESULT_WRITE_MODE", default="sync")
+MATCH_RESULT_FLUSH_SIZE = env.int("MATCH_RESULT_FLUSH_SIZE", default=100)
+MATCH_RESULT_FLUSH_INTERVAL_MS = env.int("MATCH_RESULT_FLUSH_INTERVAL_MS", default=250)
+# Seconds after which a batch claimed by a flusher that never committed it
+# (killed mid-flush) goes back to the Redis queue
+MATCH_RESULT_CLAIM_TIMEOUT = env.int("MATCH_RESULT_CLAIM_TIMEOUT", default=300)
+# Progress log of load_top_pokemons, used by --resume / --retry-failed
+INGEST_CHECKPOINT_PATH = env(
+    "INGEST_CHECKPOINT_PATH",
+    default=str(BASE_DIR / ".cache" / "load_top_pokemons.jsonl"),
+)
+# refresh_catalog re-fetches rows last fetched longer ago than this
+CATALOG_REFRESH_MAX_AGE_HOURS = env.float("CATALOG_REFRESH_MAX_AGE_HOURS", default=24)
+
+# purge_history deletes profiles (and their matches) older than this
+HISTORY_RETENTION_DAYS = env.int("HISTORY_RETENTION_DAYS", default=180)
+# Days of per-day match statistics kept in Redis (longest /api/matcher/stats/ window)
+MATCH_STATS_DAYS = env.int("MATCH_STATS_DAYS", default=90)
+
+# Seconds between pushes of each process' request metrics to Redis
+METRICS_FLUSH_INTERVAL = env.float("METRICS_FLUSH_INTERVAL", default=5)
+# Clients allowed to scrape /metrics (the REMOTE_ADDR seen by Django)
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+# Requests running more queries than this, or the same statement more than
+# QUERY_REPEAT_THRESHOLD times, log a warning (see QueryAccountingMiddleware)
+QUERY_BUDGET = env.int("QUERY_BUDGET", default=30)
+QUERY_REPEAT_THRESHOLD = env.int("QUERY_REPEAT_THRESHOLD", default=5)
+# On-demand cProfile runs of single requests (see core.profiling); when off,
+# ProfilingMiddleware removes itself from the middleware chain
+PROFILING_ENABLED = env.bool("PROFILING_ENABLED", default=False)
+# Fraction of all requests profiled into PROFILING_DIR without being asked
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.0)
+PROFILING_DIR = env("PROFILING_DIR", default=str(BASE_DIR / ".cache" / "profiles"))
+# Seconds a token from `manage.py profiling_token` stays valid
+PROFILING_TOKEN_MAX_AGE = env.int("PROFILING_TOKEN_MAX_AGE", default=3600)
+# Functions listed in a profile summary
+PROFILING_TOP_FUNCTIONS = env.int("PROFILING_TOP_FUNCTIONS", default=30)
+
 # Django REST Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
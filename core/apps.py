@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from core.query_accounting import install_query_accounting
+
+        # Count every request's queries (see QueryAccountingMiddleware)
+        connection_created.connect(install_query_accounting)
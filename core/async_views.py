@@ -0,0 +1,53 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.views import APIView
+
+from core.loop_clients import aclose_loop_clients
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers may be coroutines (``async def post``).
+
+    DRF's dispatch is synchronous, so this one mirrors it for the event loop:
+    authentication, permission checks and exception handling run in a thread
+    (session authentication reads the database), while the handler itself is
+    awaited. Under an ASGI server a handler waiting on I/O then holds a
+    coroutine instead of a worker; under WSGI Django runs it to completion,
+    in an event loop of its own whose Redis and httpx clients are closed
+    with the request.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+        finally:
+            if not isinstance(request._request, ASGIRequest):
+                await aclose_loop_clients()
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
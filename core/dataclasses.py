@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
@@ -38,3 +39,13 @@ class QuestionData:
     identifier: str
     text: str
     options: List[Dict[str, Any]]
+
+
+@dataclass
+class QueryStats:
+    """Database queries run while serving one request"""
+
+    count: int = 0
+    duration: float = 0.0
+    # SQL fingerprint -> times it ran
+    statements: Counter = field(default_factory=Counter)
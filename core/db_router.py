@@ -0,0 +1,82 @@
+"""
+Read-replica routing.
+
+Reads of the catalog and questionnaire models (``REPLICA_READ_MODELS``) go to
+a random alias of ``DATABASE_REPLICAS``; everything else, and every write,
+goes to ``default``. Reads stay on the primary when replica lag could show
+stale data to the code that caused a write:
+
+- a model written earlier in the same request (or, outside a request, in the
+  same process) is read from the primary from then on, see
+  ``ReplicaPinningMiddleware``;
+- reads inside a transaction on the primary use that transaction;
+- ``use_primary()`` sends every read in its block to the primary.
+
+UserProfile and MatchResult are never read from a replica: a profile is
+matched right after ``quiz_result`` creates it.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_READ_MODELS = frozenset(
+    {
+        "pokemons.pokemon",
+        "core.question",
+        "core.answeroption",
+    }
+)
+
+# Labels of the models written in the current request, read from the primary
+_written_models: ContextVar[frozenset] = ContextVar(
+    "written_models", default=frozenset()
+)
+_primary_only: ContextVar[bool] = ContextVar("primary_only", default=False)
+
+
+@contextmanager
+def use_primary():
+    """Read every model from the primary inside the block"""
+    token = _primary_only.set(True)
+    try:
+        yield
+    finally:
+        _primary_only.reset(token)
+
+
+def reset_replica_pinning() -> None:
+    """Forget the writes recorded so far; called at the start of each request"""
+    _written_models.set(frozenset())
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        label = model._meta.label_lower
+        if (
+            not replicas
+            or label not in REPLICA_READ_MODELS
+            or label in _written_models.get()
+            or _primary_only.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        label = model._meta.label_lower
+        written = _written_models.get()
+        if label not in written:
+            _written_models.set(written | {label})
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -10,6 +10,7 @@ from rest_framework.views import exception_handler
 
 from matcher.exceptions import (
     MatchingFailed,
+    MatchStatsUnavailable,
 )
 from pokemons.exceptions import (
     InvalidPokemonData,
@@ -32,6 +33,7 @@ def custom_exception_handler(exc, context):
     custom_exceptions = (
         # Matcher exceptions
         MatchingFailed,
+        MatchStatsUnavailable,
         # Pokemon exceptions
         PokemonAPIUnavailable,
         InvalidPokemonData,
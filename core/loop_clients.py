@@ -0,0 +1,40 @@
+"""
+Clients bound to an asyncio event loop (redis.asyncio, httpx), one per loop.
+
+Under an ASGI server the loop lives as long as the worker, so each client is
+created once and pools its connections across requests. Under WSGI, Django
+runs every async view in a new event loop, so AsyncAPIView closes that
+loop's clients when the request ends; the clients hold on to their loop, so
+they would otherwise never be freed, sockets included.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Callable, TypeVar
+
+logger = logging.getLogger("core")
+
+T = TypeVar("T")
+
+# Event loop -> {name: client}
+_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_loop_client(name: str, factory: Callable[[], T]) -> T:
+    """The running loop's client called ``name``, created by ``factory``"""
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(name)
+    if client is None:
+        client = clients[name] = factory()
+    return client
+
+
+async def aclose_loop_clients() -> None:
+    """Close and forget every client of the running event loop"""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for name, client in clients.items():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Could not close the {name} client: {e}")
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import make_profiling_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a signed token that makes ProfilingMiddleware profile requests "
+        "sent with it in the X-Profile-Token header"
+    )
+
+    def handle(self, *args, **options):
+        if not settings.PROFILING_ENABLED:
+            self.stderr.write(
+                self.style.WARNING("PROFILING_ENABLED is off, the token has no effect")
+            )
+        # Only the token goes to stdout, for $(python manage.py profiling_token)
+        self.stdout.write(make_profiling_token())
+        self.stderr.write(
+            f"Valid for {settings.PROFILING_TOKEN_MAX_AGE} seconds", self.style.SUCCESS
+        )
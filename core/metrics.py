@@ -0,0 +1,230 @@
+"""
+Request metrics in the Prometheus text format.
+
+Each process counts into a dict under a lock, a few microseconds per
+request, and a background thread adds the counts to one Redis hash every
+``METRICS_FLUSH_INTERVAL`` seconds with ``HINCRBYFLOAT``, so every gunicorn
+worker (and every server sharing the Redis) feeds the same totals. The hash
+fields are the Prometheus sample names with their labels, and ``/metrics``
+renders them as they are.
+"""
+
+import atexit
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from pokemons.cache import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "metrics"
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the queries-per-request histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Exposed metrics: name -> (type, help)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests by route and status class"),
+    "http_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency by route and status class",
+    ),
+    "http_request_exceptions_total": (
+        "counter",
+        "Unhandled exceptions raised by views, by route and exception type",
+    ),
+    "http_request_db_queries": (
+        "histogram",
+        "Database queries per request by route",
+    ),
+    "http_request_db_duration_seconds": (
+        "histogram",
+        "Time per request spent in database queries by route",
+    ),
+    "http_request_query_warnings_total": (
+        "counter",
+        "Requests over the query budget or repeating a statement, by route and reason",
+    ),
+}
+
+UNMATCHED_ROUTE = "<unmatched>"
+_NAMED_GROUP = re.compile(r"\(\?P<(\w+)>[^)]*\)")
+
+
+@lru_cache(maxsize=1024)
+def route_template(route: str) -> str:
+    """``api/pokemons/(?P<pk>[^/.]+)/$`` -> ``/api/pokemons/<pk>/``"""
+    return "/" + _NAMED_GROUP.sub(r"<\1>", route).replace("^", "").replace("$", "")
+
+
+def request_route(request) -> str:
+    """Route template of a request, bounded in number unlike the path"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return route_template(match.route)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@lru_cache(maxsize=4096)
+def sample_name(name: str, labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return name
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f"{name}{{{pairs}}}"
+
+
+@lru_cache(maxsize=1024)
+def histogram_samples(
+    name: str, labels: Tuple[Tuple[str, str], ...], buckets: Tuple[float, ...]
+) -> Tuple[Tuple[str, ...], str, str]:
+    """Bucket (ending with +Inf), count and sum sample names of a series"""
+    bounds = [str(bound) for bound in buckets] + ["+Inf"]
+    return (
+        tuple(sample_name(f"{name}_bucket", labels + (("le", le),)) for le in bounds),
+        sample_name(f"{name}_count", labels),
+        sample_name(f"{name}_sum", labels),
+    )
+
+
+class MetricsRegistry:
+    """Counters and histograms of this process, flushed to Redis"""
+
+    def __init__(self, key: str = METRICS_KEY, interval: float = 5.0):
+        self.key = key
+        self.interval = interval
+        self._pending: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def inc(self, name: str, labels: Tuple = (), amount: float = 1) -> None:
+        sample = sample_name(name, labels)
+        with self._lock:
+            self._pending[sample] += amount
+        self._start()
+
+    def observe(
+        self,
+        name: str,
+        labels: Tuple,
+        value: float,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        """Record ``value`` in the cumulative buckets, sum and count of a histogram"""
+        samples, count, total = histogram_samples(name, labels, buckets)
+        # Every bucket with a bound >= value, then the +Inf bucket; the lower
+        # ones are touched so that every series exposes all of its buckets
+        first = bisect_left(buckets, value)
+        with self._lock:
+            pending = self._pending
+            for sample in samples[:first]:
+                pending[sample] += 0
+            for sample in samples[first:]:
+                pending[sample] += 1
+            pending[count] += 1
+            pending[total] += value
+        self._start()
+
+    def _start(self) -> None:
+        # Threads don't survive a fork, so every gunicorn worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="metrics-flusher", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Add the counts of this process to the shared totals"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+        if not pending:
+            return
+        try:
+            pipe = get_redis_connection().pipeline(transaction=False)
+            for sample, amount in pending.items():
+                pipe.hincrbyfloat(self.key, sample, amount)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Metrics not flushed, keeping them for the next try: {e}")
+            with self._lock:
+                for sample, amount in pending.items():
+                    self._pending[sample] += amount
+
+    def render(self) -> str:
+        """Every process' totals in the Prometheus text exposition format"""
+        self.flush()
+        samples = get_redis_connection().hgetall(self.key)
+        by_metric = defaultdict(list)
+        for sample, value in samples.items():
+            base = sample.split("{", 1)[0]
+            for suffix in ("_bucket", "_count", "_sum"):
+                if base.endswith(suffix) and base[: -len(suffix)] in METRICS:
+                    base = base[: -len(suffix)]
+                    break
+            by_metric[base].append((sample, value))
+
+        lines = []
+        for name in sorted(by_metric):
+            metric_type, help_text = METRICS.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample, value in sorted(by_metric[name], key=_sample_order):
+                lines.append(f"{sample} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _sample_order(item):
+    """Group a histogram's samples by series, buckets in increasing order"""
+    sample = item[0]
+    le = re.search(r'le="([^"]+)"', sample)
+    series = re.sub(r',?le="[^"]+"', "", sample).replace("{}", "")
+    series = re.sub(r"_(bucket|count|sum)(?=\{|$)", "", series)
+    bound = float(le.group(1)) if le else float("inf")
+    return (series, not sample.split("{", 1)[0].endswith("_bucket"), bound, sample)
+
+
+def _format_value(value: str) -> str:
+    number = float(value)
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry(
+                    interval=getattr(settings, "METRICS_FLUSH_INTERVAL", 5.0)
+                )
+    return _registry
@@ -1,16 +1,38 @@
 import logging
+import random
 import time
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 
+from core.db_router import reset_replica_pinning
+from core.metrics import QUERY_COUNT_BUCKETS, get_metrics_registry, request_route
+from core.profiling import (
+    OUTPUT_HEADER,
+    QUERY_PARAM,
+    SUMMARY,
+    TOKEN_HEADER,
+    RequestProfile,
+    is_valid_profiling_token,
+    profile_summary,
+    save_profile,
+)
+from core.query_accounting import end_request_stats, start_request_stats
+
 logger = logging.getLogger("core")
 
 
 class PerformanceLoggingMiddleware(MiddlewareMixin):
-    """Middleware to log request performance metrics"""
+    """
+    Middleware to log request performance metrics and record them in the
+    per-route latency histograms and request counters served at /metrics
+    """
 
     def process_request(self, request):
-        request.start_time = time.time()
+        request.start_time = time.perf_counter()
         logger.debug(
             f"PerformanceLoggingMiddleware: Starting request {request.method} {request.path}"
         )
@@ -18,20 +40,214 @@ class PerformanceLoggingMiddleware(MiddlewareMixin):
 
     def process_response(self, request, response):
         if hasattr(request, "start_time"):
-            duration = time.time() - request.start_time
+            duration = time.perf_counter() - request.start_time
             logger.info(
                 f"Request {request.method} {request.path} - "
                 f"Status: {response.status_code} - "
                 f"Duration: {duration:.3f}s"
             )
+            labels = (
+                ("method", request.method),
+                ("route", request_route(request)),
+                ("status", f"{response.status_code // 100}xx"),
+            )
+            registry = get_metrics_registry()
+            registry.inc("http_requests_total", labels)
+            registry.observe("http_request_duration_seconds", labels, duration)
         return response
 
     def process_exception(self, request, exception):
         if hasattr(request, "start_time"):
-            duration = time.time() - request.start_time
+            duration = time.perf_counter() - request.start_time
             logger.error(
                 f"Request {request.method} {request.path} - "
                 f"Exception: {type(exception).__name__} - "
                 f"Duration: {duration:.3f}s"
             )
+            get_metrics_registry().inc(
+                "http_request_exceptions_total",
+                (
+                    ("method", request.method),
+                    ("route", request_route(request)),
+                    ("exception", type(exception).__name__),
+                ),
+            )
+        return None
+
+
+class ReplicaPinningMiddleware(MiddlewareMixin):
+    """Scopes the replica router's read-your-writes pinning to one request"""
+
+    def process_request(self, request):
+        reset_replica_pinning()
+        return None
+
+
+class QueryAccountingMiddleware:
+    """
+    Counts the database queries of each request into the /metrics histograms
+    and warns about requests over QUERY_BUDGET queries or running the same
+    statement more than QUERY_REPEAT_THRESHOLD times (a likely N+1)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.query_stats, token = start_request_stats()
+        try:
+            response = self.get_response(request)
+        finally:
+            # Later queries of this thread or context aren't the request's
+            end_request_stats(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        request.query_stats, token = start_request_stats()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request_stats(token)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        stats = request.query_stats
+
+        route = request_route(request)
+        labels = (("method", request.method), ("route", route))
+        registry = get_metrics_registry()
+        registry.observe(
+            "http_request_db_queries", labels, stats.count, QUERY_COUNT_BUCKETS
+        )
+        registry.observe("http_request_db_duration_seconds", labels, stats.duration)
+
+        summary = (
+            f"route={route} method={request.method} queries={stats.count} "
+            f"db_ms={stats.duration * 1000:.1f}"
+        )
+        if stats.count > settings.QUERY_BUDGET:
+            registry.inc(
+                "http_request_query_warnings_total", labels + (("reason", "budget"),)
+            )
+            logger.warning(
+                f"Query budget exceeded {summary} budget={settings.QUERY_BUDGET}"
+            )
+        if stats.statements:
+            statement, repeats = stats.statements.most_common(1)[0]
+            if repeats > settings.QUERY_REPEAT_THRESHOLD:
+                registry.inc(
+                    "http_request_query_warnings_total",
+                    labels + (("reason", "repeated"),),
+                )
+                # Unquoted identifiers keep the JSON log line valid
+                statement = statement.replace('"', "")[:300]
+                logger.warning(
+                    f"Repeated query (possible N+1) {summary} repeats={repeats} "
+                    f"statement={statement}"
+                )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Runs single requests under cProfile on demand (see core.profiling). It is
+    left out of the middleware chain unless PROFILING_ENABLED is set, and
+    otherwise only looks at a header and the query string of each request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    # Where the profile of a request goes
+    FILE, SAMPLE = "file", "sample"
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        output, staff_only = self._requested_output(request)
+        if staff_only and not request.user.is_staff:
+            output = self._sampled()
+        if output is None:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        try:
+            profile.start()
+        except ValueError:  # Another profiler is running in this thread
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        return self._report(request, response, profile, output)
+
+    async def __acall__(self, request):
+        output, staff_only = self._requested_output(request)
+        if staff_only and not (await request.auser()).is_staff:
+            output = self._sampled()
+        if output is None:
+            return await self.get_response(request)
+
+        # Under ASGI this profiles the event loop's thread, so the profile
+        # also holds whatever other requests run on the loop meanwhile
+        profile = RequestProfile()
+        try:
+            profile.start()
+        except ValueError:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            profile.stop()
+        return self._report(request, response, profile, output)
+
+    def _sampled(self):
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.SAMPLE
         return None
+
+    def _requested_output(self, request):
+        """(output or None, whether the request must come from a staff user)"""
+        token = request.META.get(TOKEN_HEADER)
+        if token and is_valid_profiling_token(token):
+            if request.META.get(OUTPUT_HEADER) == SUMMARY:
+                return SUMMARY, False
+            return self.FILE, False
+        # The query string is only parsed when it may hold the parameter
+        if QUERY_PARAM in request.META.get("QUERY_STRING", ""):
+            value = request.GET.get(QUERY_PARAM)
+            if value:
+                return (SUMMARY if value == SUMMARY else self.FILE), True
+        return self._sampled(), False
+
+    def _report(self, request, response, profile, output):
+        if output == SUMMARY:
+            # Replaces the response; its status is kept in a header
+            summary = profile_summary(profile, settings.PROFILING_TOP_FUNCTIONS)
+            return HttpResponse(
+                summary,
+                content_type="text/plain; charset=utf-8",
+                headers={"X-Profile-Status": str(response.status_code)},
+            )
+        path = save_profile(profile, request)
+        logger.info(f"Profiled {request.method} {request.path} into {path}")
+        if output == self.FILE:
+            response["X-Profile-File"] = path.name
+        return response
@@ -34,5 +34,11 @@ class UserProfile(models.Model):
     # (keys = question.identifier)
     answers = models.JSONField()
 
+    class Meta:
+        indexes = [
+            # purge_history walks old profiles in created_at order
+            models.Index(fields=["created_at"], name="userprofile_created_at_idx"),
+        ]
+
     def __str__(self):
         return f"UserProfile #{self.id} – {self.created_at.strftime('%Y-%m-%d %H:%M')}"
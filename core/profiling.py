@@ -0,0 +1,129 @@
+"""
+On-demand profiling of single requests (see ProfilingMiddleware).
+
+A request is profiled when PROFILING_ENABLED is set and one of:
+
+- its ``X-Profile-Token`` header holds a token from ``manage.py
+  profiling_token``, signed with SECRET_KEY and valid for
+  PROFILING_TOKEN_MAX_AGE seconds;
+- a staff user adds ``?_profile=1`` (or ``?_profile=summary``);
+- it is picked at random at PROFILING_SAMPLE_RATE.
+
+The profile is written to PROFILING_DIR as a ``.prof`` file (for pstats,
+snakeviz, ...), or, when ``summary`` is asked for with ``?_profile=summary``
+or ``X-Profile-Output: summary``, returned instead of the response as the top
+functions by cumulative time.
+
+cProfile only follows the thread it runs in. Under gunicorn that thread also
+runs the ORM calls of async views (sync_to_async brings them back to it), but
+work handed to a thread pool, like async matching's scoring, must be wrapped
+with ``profiled`` to be part of the profile.
+"""
+
+import cProfile
+import functools
+import io
+import pstats
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+from django.conf import settings
+from django.core import signing
+
+TOKEN_HEADER = "HTTP_X_PROFILE_TOKEN"
+OUTPUT_HEADER = "HTTP_X_PROFILE_OUTPUT"
+QUERY_PARAM = "_profile"
+SUMMARY = "summary"
+_SALT = "core.profiling"
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]+")
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "active_profile", default=None
+)
+
+
+def make_profiling_token() -> str:
+    return signing.TimestampSigner(salt=_SALT).sign("profile")
+
+
+def is_valid_profiling_token(token: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class RequestProfile:
+    """The cProfile runs of one request, merged into a single pstats.Stats"""
+
+    def __init__(self):
+        self._profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._main: Optional[cProfile.Profile] = None
+        self._token = None
+
+    def _new_profiler(self) -> cProfile.Profile:
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._profilers.append(profiler)
+        return profiler
+
+    def start(self) -> None:
+        """Profile the current thread and the ``profiled`` calls made from it"""
+        self._main = self._new_profiler()
+        self._main.enable()
+        self._token = _active_profile.set(self)
+
+    def stop(self) -> None:
+        _active_profile.reset(self._token)
+        self._main.disable()
+
+    def call(self, fn, *args, **kwargs):
+        return self._new_profiler().runcall(fn, *args, **kwargs)
+
+    def stats(self, stream=None) -> pstats.Stats:
+        with self._lock:
+            profilers = list(self._profilers)
+        stats = pstats.Stats(profilers[0], stream=stream)
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+
+def profiled(fn):
+    """
+    ``fn`` as it should be handed to a worker thread: unchanged, or profiled
+    into the current request's profile while one is running
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        return fn
+    return functools.partial(profile.call, fn)
+
+
+def profile_summary(profile: RequestProfile, limit: int) -> str:
+    """The ``limit`` functions with the most cumulative time, as pstats prints"""
+    out = io.StringIO()
+    stats = profile.stats(stream=out)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return out.getvalue()
+
+
+def save_profile(profile: RequestProfile, request) -> Path:
+    """Dump the profile into PROFILING_DIR and return the file's path"""
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path_part = _UNSAFE_FILENAME.sub("_", request.path.strip("/")) or "root"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = (
+        directory / f"{stamp}-{time.monotonic_ns()}-{request.method}-{path_part}.prof"
+    )
+    profile.stats().dump_stats(path)
+    return path
@@ -0,0 +1,66 @@
+"""
+Per-request database query accounting.
+
+``QueryAccountingMiddleware`` starts a ``QueryStats`` for each request in a
+ContextVar, which sync_to_async hands to the threads an async view queries
+from, and resets it when the request ends. ``account_query``, an execute wrapper installed on every database
+connection when it opens, adds each query's duration and statement
+fingerprint to it. Outside a request it only reads the ContextVar.
+"""
+
+import logging
+import re
+import time
+from contextvars import ContextVar, Token
+from typing import Optional, Tuple
+
+from core.dataclasses import QueryStats
+
+logger = logging.getLogger("core")
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+# Parameter lists of any length, e.g. IN (%s, %s, %s), have the same shape
+_PARAMETER_LIST = re.compile(r"\((?:%s, )+%s\)")
+
+
+def fingerprint(sql: str) -> str:
+    """Statement shape: Django already passes values as %s parameters"""
+    return _PARAMETER_LIST.sub("(%s, ...)", sql)
+
+
+def start_request_stats() -> Tuple[QueryStats, Token]:
+    """New stats for the current request, and the token to end them with"""
+    stats = QueryStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request_stats(token: Token) -> None:
+    """Stop counting into the request's stats, e.g. from a reused thread"""
+    _request_stats.reset(token)
+
+
+def current_request_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+
+def account_query(execute, sql, params, many, context):
+    """Execute wrapper counting a query into the current request's stats"""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.duration += time.perf_counter() - start
+        stats.statements[fingerprint(sql)] += 1
+
+
+def install_query_accounting(sender, connection, **kwargs):
+    """connection_created receiver adding ``account_query`` once per connection"""
+    if account_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(account_query)
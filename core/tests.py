@@ -1 +1,256 @@
-# Create your tests here.
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core import metrics
+from core.db_router import ReplicaRouter, reset_replica_pinning, use_primary
+from core.metrics import MetricsRegistry, route_template
+from core.middleware import ProfilingMiddleware, QueryAccountingMiddleware
+from core.models import AnswerOption, Question, UserProfile
+from core.profiling import make_profiling_token
+from core.query_accounting import current_request_stats, fingerprint
+from matcher.models import MatchResult
+from pokemons.cache import get_redis_connection
+from pokemons.models import Pokemon
+
+
+@pytest.fixture
+def router(settings):
+    settings.DATABASE_REPLICAS = ["replica1", "replica2"]
+    reset_replica_pinning()
+    yield ReplicaRouter()
+    reset_replica_pinning()
+
+
+def test_catalog_and_questionnaire_reads_go_to_replicas(router):
+    assert router.db_for_read(Pokemon) in {"replica1", "replica2"}
+    assert router.db_for_read(AnswerOption) in {"replica1", "replica2"}
+    assert router.db_for_read(UserProfile) == "default"
+    assert router.db_for_read(MatchResult) == "default"
+    assert router.db_for_write(Pokemon) == "default"
+
+
+def test_reads_after_a_write_stay_on_the_primary(router):
+    router.db_for_write(Pokemon)
+
+    assert router.db_for_read(Pokemon) == "default"
+    assert router.db_for_read(AnswerOption) != "default"
+
+    # Next request
+    reset_replica_pinning()
+    assert router.db_for_read(Pokemon) != "default"
+
+
+def test_use_primary_pins_every_read(router):
+    with use_primary():
+        assert router.db_for_read(Pokemon) == "default"
+    assert router.db_for_read(Pokemon) != "default"
+
+
+@pytest.mark.django_db
+def test_reads_in_a_transaction_use_the_primary(router):
+    with transaction.atomic():
+        assert router.db_for_read(Pokemon) == "default"
+
+
+def test_without_replicas_everything_uses_the_primary(settings):
+    settings.DATABASE_REPLICAS = []
+
+    assert ReplicaRouter().db_for_read(Pokemon) == "default"
+
+
+@pytest.fixture
+def metrics_registry(monkeypatch):
+    registry = MetricsRegistry(key="test:metrics", interval=3600)
+    monkeypatch.setattr(metrics, "_registry", registry)
+    redis = get_redis_connection()
+    redis.delete(registry.key)
+    yield registry
+    redis.delete(registry.key)
+
+
+def test_route_templates_replace_url_parameters():
+    assert route_template("api/pokemons/(?P<pk>[^/.]+)/$") == "/api/pokemons/<pk>/"
+    assert route_template("api/matcher/match/") == "/api/matcher/match/"
+
+
+def test_histograms_are_rendered_in_prometheus_format(metrics_registry):
+    labels = (("method", "GET"), ("route", "/a/"), ("status", "2xx"))
+    for duration in (0.003, 0.07, 20):
+        metrics_registry.observe("http_request_duration_seconds", labels, duration)
+    metrics_registry.inc("http_requests_total", labels, 3)
+
+    lines = metrics_registry.render().splitlines()
+
+    series = 'method="GET",route="/a/",status="2xx"'
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert f'http_request_duration_seconds_bucket{{{series},le="0.005"}} 1' in lines
+    assert f'http_request_duration_seconds_bucket{{{series},le="0.05"}} 1' in lines
+    assert f'http_request_duration_seconds_bucket{{{series},le="0.1"}} 2' in lines
+    assert f'http_request_duration_seconds_bucket{{{series},le="10.0"}} 2' in lines
+    assert f'http_request_duration_seconds_bucket{{{series},le="+Inf"}} 3' in lines
+    assert f"http_request_duration_seconds_count{{{series}}} 3" in lines
+    assert f"http_request_duration_seconds_sum{{{series}}} 20.073" in lines
+    assert f"http_requests_total{{{series}}} 3" in lines
+    buckets = [line for line in lines if "_bucket" in line]
+    assert buckets[-1].startswith(
+        f'http_request_duration_seconds_bucket{{{series},le="+Inf"}}'
+    )
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_serves_request_metrics_to_allowed_clients(
+    client, metrics_registry
+):
+    client.get("/api/matcher/stats/", {"top": 0})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    assert (
+        'http_requests_total{method="GET",route="/api/matcher/stats/",status="4xx"} 1'
+        in body
+    )
+    assert client.get("/metrics", REMOTE_ADDR="10.1.2.3").status_code == 404
+
+
+def test_fingerprints_ignore_parameter_list_lengths():
+    assert fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)') == (
+        'SELECT * FROM "t" WHERE "id" IN (%s, ...)'
+    )
+    assert fingerprint('SELECT * FROM "t" WHERE "id" = %s') == (
+        'SELECT * FROM "t" WHERE "id" = %s'
+    )
+
+
+@pytest.mark.django_db
+def test_request_queries_are_counted_and_repeats_reported(
+    client, metrics_registry, settings, caplog
+):
+    settings.QUERY_REPEAT_THRESHOLD = 1
+    for name in ["a", "b", "c"]:
+        Question.objects.create(identifier=name, text=name)
+
+    def view_with_n_plus_one(request):
+        for question in Question.objects.all():
+            list(question.options.all())
+        return HttpResponse()
+
+    request = RequestFactory().get("/quiz/")
+    with caplog.at_level(logging.WARNING, logger="core"):
+        response = QueryAccountingMiddleware(view_with_n_plus_one)(request)
+
+    assert response.status_code == 200
+    assert current_request_stats() is None
+    stats = request.query_stats
+    assert stats.count == 4
+    assert max(stats.statements.values()) == 3
+    warning = next(r for r in caplog.records if "possible N+1" in r.getMessage())
+    assert "queries=4" in warning.getMessage()
+    assert "repeats=3" in warning.getMessage()
+    assert '"' not in warning.getMessage()
+
+    body = metrics_registry.render()
+    assert 'http_request_db_queries_count{method="GET",route="<unmatched>"} 1' in body
+    assert (
+        'http_request_query_warnings_total{method="GET",route="<unmatched>",'
+        'reason="repeated"} 1' in body
+    )
+
+
+@pytest.mark.django_db
+def test_async_view_queries_are_counted(client, metrics_registry):
+    profile = UserProfile.objects.create(answers={})
+
+    client.post(
+        "/api/matcher/match/", {"user_profile_id": profile.id}, "application/json"
+    )
+
+    body = metrics_registry.render()
+    route = 'method="POST",route="/api/matcher/match/"'
+    assert f'http_request_db_queries_bucket{{{route},le="0"}} 0' in body
+    assert f"http_request_db_queries_count{{{route}}} 1" in body
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_profiling_is_off_by_default(client, tmp_path, settings):
+    settings.PROFILING_DIR = str(tmp_path)
+
+    response = client.get(
+        "/api/matcher/stats/",
+        {"_profile": "summary"},
+        HTTP_X_PROFILE_TOKEN=make_profiling_token(),
+    )
+
+    assert "X-Profile-Status" not in response
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_signed_token_returns_a_profile_summary(client, profiling):
+    response = client.post(
+        "/api/matcher/match/",
+        {"user_profile_id": 999999},
+        "application/json",
+        HTTP_X_PROFILE_TOKEN=make_profiling_token(),
+        HTTP_X_PROFILE_OUTPUT="summary",
+    )
+
+    assert response.status_code == 200
+    assert response["X-Profile-Status"] == "404"
+    body = response.content.decode()
+    assert "Ordered by: cumulative time" in body
+    assert "async_views.py" in body or "views.py" in body
+
+
+@pytest.mark.django_db
+def test_invalid_tokens_and_non_staff_users_are_not_profiled(client, profiling):
+    response = client.get(
+        "/api/pokemons/", {"_profile": "1"}, HTTP_X_PROFILE_TOKEN="forged:token"
+    )
+
+    assert "X-Profile-File" not in response
+    assert list(profiling.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_staff_query_parameter_writes_a_profile_file(admin_client, profiling):
+    response = admin_client.get("/api/pokemons/", {"_profile": "1"})
+
+    assert response.status_code == 200
+    assert (profiling / response["X-Profile-File"]).stat().st_size > 0
+
+
+@pytest.mark.django_db
+def test_async_requests_are_profiled(async_client, profiling):
+    response = async_to_sync(async_client.post)(
+        "/api/matcher/match/",
+        {"user_profile_id": 999999},
+        "application/json",
+        headers={"X-Profile-Token": make_profiling_token()},
+    )
+
+    assert response.status_code == 404
+    assert (profiling / response["X-Profile-File"]).exists()
+
+
+def test_sampled_requests_are_profiled_without_being_asked(rf, profiling, settings):
+    settings.PROFILING_SAMPLE_RATE = 1.0
+
+    response = ProfilingMiddleware(lambda request: HttpResponse())(rf.get("/"))
+
+    assert "X-Profile-File" not in response
+    assert len(list(profiling.iterdir())) == 1
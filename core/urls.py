@@ -7,4 +7,5 @@ urlpatterns = [
     path("quiz/", views.take_quiz, name="take_quiz"),
     path("result/", views.quiz_result, name="quiz_result"),
     path("quiz/reset/", views.quiz_reset, name="quiz_reset"),
+    path("metrics", views.metrics, name="metrics"),
 ]
@@ -1,7 +1,11 @@
 import logging
 
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect, render
+from redis.exceptions import RedisError
 
+from core.metrics import get_metrics_registry
 from core.models import AnswerOption, Question, UserProfile
 from matcher.matching_engine import MatchingEngine
 
@@ -135,3 +139,16 @@ def quiz_reset(request):
 
     logger.debug("Quiz session cleared")
     return redirect("take_quiz")
+
+
+def metrics(request):
+    """Request metrics of every worker in the Prometheus text format"""
+    # Internal endpoint: hidden from clients outside METRICS_ALLOWED_IPS
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    try:
+        body = get_metrics_registry().render()
+    except RedisError as e:
+        logger.error(f"Metrics unavailable: {e}")
+        return HttpResponse("Metrics unavailable\n", status=503)
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
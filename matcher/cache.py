@@ -8,6 +8,8 @@ from uuid import UUID
 import redis
 from django.conf import settings
 
+from pokemons.cache import get_async_redis_connection
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,15 +43,29 @@ def cache_match_result(
         return  # Skip caching if Redis is not available
 
     key = f"match_result:{answers_hash}"
-    data = {
+    r.setex(key, ttl, json.dumps(_match_cache_entry(pokemon_id, score)))
+    logger.debug(f"Cached match result for hash {answers_hash[:8]}... (truncated)")
+
+
+async def acache_match_result(
+    answers_hash: str, pokemon_id: str | UUID, score: float, ttl: int = 3600
+):
+    """Async cache_match_result, for code running on the event loop"""
+    key = f"match_result:{answers_hash}"
+    await get_async_redis_connection().set(
+        key, json.dumps(_match_cache_entry(pokemon_id, score)), ex=ttl
+    )
+    logger.debug(f"Cached match result for hash {answers_hash[:8]}... (truncated)")
+
+
+def _match_cache_entry(pokemon_id: str | UUID, score: float) -> dict:
+    return {
         "pokemon_id": (
             str(pokemon_id) if isinstance(pokemon_id, UUID) else pokemon_id
         ),  # Proper UUID conversion
         "score": score,
         "timestamp": time.time(),
     }
-    r.setex(key, ttl, json.dumps(data))
-    logger.debug(f"Cached match result for hash {answers_hash[:8]}... (truncated)")
 
 
 def get_cached_match(answers_hash: str):
@@ -59,7 +75,18 @@ def get_cached_match(answers_hash: str):
         return None  # Return None if Redis is not available
 
     key = f"match_result:{answers_hash}"
-    cached = r.get(key)
+    return _parse_cached_match(answers_hash, r.get(key))
+
+
+async def aget_cached_match(answers_hash: str):
+    """Async get_cached_match, for code running on the event loop"""
+    key = f"match_result:{answers_hash}"
+    return _parse_cached_match(
+        answers_hash, await get_async_redis_connection().get(key)
+    )
+
+
+def _parse_cached_match(answers_hash: str, cached: str | None):
     if cached:
         logger.debug(f"Found cached match for hash {answers_hash[:8]}... (truncated)")
         try:
@@ -7,3 +7,11 @@ class MatchingFailed(APIException):
     status_code = 500
     default_detail = "Pokemon matching failed."
     default_code = "matching_failed"
+
+
+class MatchStatsUnavailable(APIException):
+    """Custom exception for when match statistics can't be read"""
+
+    status_code = 503
+    default_detail = "Match statistics are temporarily unavailable."
+    default_code = "match_stats_unavailable"
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from matcher.write_behind import MatchResultFlusher, RedisQueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert every match result queued in Redis by the write-behind mode "
+        "(MATCH_RESULT_WRITE_MODE=redis), e.g. before scaling the web tier to zero"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.MATCH_RESULT_FLUSH_SIZE,
+            help="Rows per bulk INSERT "
+            f"(default: {settings.MATCH_RESULT_FLUSH_SIZE})",
+        )
+        parser.add_argument(
+            "--claim-timeout",
+            type=int,
+            default=settings.MATCH_RESULT_CLAIM_TIMEOUT,
+            help="Requeue batches claimed this many seconds ago and never "
+            "committed; 0 once every web worker is stopped "
+            f"(default: {settings.MATCH_RESULT_CLAIM_TIMEOUT})",
+        )
+
+    def handle(self, *args, **options):
+        queue = RedisQueue()
+        flusher = MatchResultFlusher(queue, options["batch_size"], interval=0)
+        queue.recover(options["claim_timeout"])
+        saved = flusher.flush()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved {saved} queued match results, {len(queue)} still queued"
+            )
+        )
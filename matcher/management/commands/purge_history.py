@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import UserProfile
+from matcher.models import MatchResult, MatchResultRollup
+
+
+def rollup_match_results(match_results) -> int:
+    """
+    Add ``match_results`` to the per-day, per-Pokemon counts of
+    MatchResultRollup and return how many rows were counted. Call it inside
+    the transaction that deletes those rows, so that each row is counted once.
+    """
+    counts = {
+        (row["day"], row["pokemon_id"]): row["count"]
+        for row in match_results.order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "pokemon_id")
+        .annotate(count=Count("id"))
+    }
+    total = sum(counts.values())
+    if not total:
+        return 0
+
+    # Increment in SQL so that concurrent runs can't overwrite each other
+    table = connection.ops.quote_name(MatchResultRollup._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} (day, pokemon_id, count) VALUES (%s, %s, %s) "
+            "ON CONFLICT (day, pokemon_id) "
+            f"DO UPDATE SET count = {table}.count + EXCLUDED.count",
+            [(day, pokemon_id, n) for (day, pokemon_id), n in counts.items()],
+        )
+    return total
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete user profiles older than --days and their match results, in "
+        "small transactions with a pause in between so that no lock is held "
+        "long and replicas keep up"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.HISTORY_RETENTION_DAYS,
+            help="Keep profiles created in the last DAYS days "
+            f"(default: {settings.HISTORY_RETENTION_DAYS})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Profiles deleted per transaction (default: 1000)",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.5,
+            help="Seconds to sleep between batches (default: 0.5)",
+        )
+        parser.add_argument(
+            "--rollup",
+            action="store_true",
+            help="Add the deleted match results to the daily per-Pokemon counts "
+            "(MatchResultRollup) before deleting them",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        expired = UserProfile.objects.filter(created_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would delete {expired.count()} profiles and "
+                f"{MatchResult.objects.filter(user_profile__in=expired).count()} "
+                f"match results created before {cutoff:%Y-%m-%d %H:%M}"
+            )
+            return
+
+        profiles = matches = rolled_up = batches = 0
+        while True:
+            with transaction.atomic():
+                # Oldest first, through the created_at index; SKIP LOCKED lets a
+                # concurrent run take the next batch instead of waiting
+                ids = list(
+                    expired.order_by("created_at")
+                    .select_for_update(skip_locked=True)
+                    .values_list("id", flat=True)[: options["batch_size"]]
+                )
+                if not ids:
+                    break
+                results = MatchResult.objects.filter(user_profile_id__in=ids)
+                if options["rollup"]:
+                    rolled_up += rollup_match_results(results)
+                matches += results.delete()[0]
+                profiles += UserProfile.objects.filter(id__in=ids).delete()[0]
+            batches += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Batch {batches}: {profiles} profiles deleted")
+            if len(ids) < options["batch_size"]:
+                break
+            time.sleep(options["pause"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {profiles} profiles and {matches} match results created "
+                f"before {cutoff:%Y-%m-%d %H:%M} in {batches} batches"
+                + (f", {rolled_up} rolled up" if options["rollup"] else "")
+            )
+        )
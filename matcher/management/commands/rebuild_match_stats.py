@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from matcher.stats import rebuild_match_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the Redis match statistics behind /api/matcher/stats/ from "
+        "MatchResult and MatchResultRollup, e.g. after a Redis flush"
+    )
+
+    def handle(self, *args, **options):
+        matches = rebuild_match_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt match statistics from {matches} matches")
+        )
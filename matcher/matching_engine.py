@@ -1,50 +1,108 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
 from typing import List, Optional, Tuple
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import transaction
 
-from matcher.cache import cache_match_result, get_answers_hash, get_cached_match
+from core.profiling import profiled
+from matcher.cache import (
+    acache_match_result,
+    aget_cached_match,
+    cache_match_result,
+    get_answers_hash,
+    get_cached_match,
+)
 from matcher.constants import ARCHETYPE_STATS, SCORES
 from matcher.dataclasses import MatchScore
 from matcher.models import MatchResult
 from matcher.preference_extractor import PreferenceExtractor
+from matcher.stats import arecord_match, record_match
+from matcher.write_behind import get_match_result_flusher
 from pokemons.models import Pokemon
 
 logger = logging.getLogger(__name__)
 
+# Bounded pool for async matching's CPU-bound scoring; created on first use
+_scoring_executor: ThreadPoolExecutor | None = None
+
+
+def get_scoring_executor() -> ThreadPoolExecutor:
+    global _scoring_executor
+    if _scoring_executor is None:
+        _scoring_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "MATCH_SCORING_WORKERS", 4),
+            thread_name_prefix="match-scoring",
+        )
+    return _scoring_executor
+
 
 class MatchingEngine:
     """Simple matching engine using database Pokemon only"""
 
     def __init__(self, user_profile):
-        self.user_profile = user_profile
-        self.extractor = PreferenceExtractor(user_profile)
+        self._setup(user_profile)
         self.match_profile = self.extractor.get_match_profile()
 
-        # Create hash for caching
-        self.answers_hash = get_answers_hash(self.user_profile.answers)
-        logger.debug(f"Answers hash: {self.answers_hash[:8]}... (truncated)")
-
         # Check cache first
         cached_result = get_cached_match(self.answers_hash)
+        cached_pokemon = None
         if cached_result:
             logger.debug(f"Cache hit for hash {self.answers_hash[:8]}...")
             try:
                 # Convert string UUID back to UUID object for database query
-                pokemon_id = cached_result["pokemon_id"]
-                score = cached_result["score"]
-
-                pokemon = Pokemon.objects.get(id=pokemon_id)
-                logger.debug(
-                    f"Retrieved cached Pokemon: {pokemon.name} (score: {score})"
+                cached_pokemon = Pokemon.objects.get(id=cached_result["pokemon_id"])
+            except (Pokemon.DoesNotExist, KeyError, ValueError, ValidationError):
+                pass
+        self._use_cached(cached_result, cached_pokemon)
+
+    @classmethod
+    async def acreate(cls, user_profile) -> "MatchingEngine":
+        """
+        Async constructor: the cache lookup and the answer option query run
+        concurrently instead of one after the other.
+        """
+        engine = cls.__new__(cls)
+        engine._setup(user_profile)
+        engine.match_profile, cached_result = await asyncio.gather(
+            engine.extractor.aget_match_profile(),
+            aget_cached_match(engine.answers_hash),
+        )
+        cached_pokemon = None
+        if cached_result:
+            logger.debug(f"Cache hit for hash {engine.answers_hash[:8]}...")
+            try:
+                cached_pokemon = await Pokemon.objects.aget(
+                    id=cached_result["pokemon_id"]
                 )
-                # Store cached result for later use
-                self.cached_pokemon = pokemon
-                self.cached_score = score
-            except (Pokemon.DoesNotExist, KeyError, ValueError):
-                logger.debug("Cached data invalid, performing fresh matching")
-                pass  # Continue to fresh matching
+            except (Pokemon.DoesNotExist, KeyError, ValueError, ValidationError):
+                pass
+        engine._use_cached(cached_result, cached_pokemon)
+        return engine
+
+    def _setup(self, user_profile) -> None:
+        self.user_profile = user_profile
+        self.extractor = PreferenceExtractor(user_profile)
+
+        # Create hash for caching
+        self.answers_hash = get_answers_hash(self.user_profile.answers)
+        logger.debug(f"Answers hash: {self.answers_hash[:8]}... (truncated)")
+
+    def _use_cached(self, cached_result, cached_pokemon) -> None:
+        if cached_pokemon is not None:
+            score = cached_result["score"]
+            logger.debug(
+                f"Retrieved cached Pokemon: {cached_pokemon.name} (score: {score})"
+            )
+            # Store cached result for later use
+            self.cached_pokemon = cached_pokemon
+            self.cached_score = score
+            return
+        if cached_result:
+            logger.debug("Cached data invalid, performing fresh matching")
 
         logger.debug(
             f"Cache miss, performing full matching for hash {self.answers_hash[:8]}... (truncated)"
@@ -63,8 +121,8 @@ class MatchingEngine:
             return self.cached_pokemon, self.cached_score
 
         # Get all Pokemon from database
-        pokemons = Pokemon.objects.all()
-        logger.debug(f"Found {pokemons.count()} Pokemon in database")
+        pokemons = list(Pokemon.objects.all())
+        logger.debug(f"Found {len(pokemons)} Pokemon in database")
 
         return self._find_best_among_pokemons(pokemons)
 
@@ -131,13 +189,7 @@ class MatchingEngine:
             logger.debug(
                 f"Using cached result: {self.cached_pokemon.name} (score: {self.cached_score})"
             )
-            with transaction.atomic():
-                match_result = MatchResult.objects.create(
-                    user_profile=self.user_profile,
-                    pokemon=self.cached_pokemon,
-                    total_score=self.cached_score,
-                )
-            return match_result
+            return self._save_match_result(self.cached_pokemon, self.cached_score)
 
         # Perform fresh matching only if no cache
         logger.debug(
@@ -145,8 +197,8 @@ class MatchingEngine:
         )
 
         # Get all Pokemon from database
-        pokemons = Pokemon.objects.all()
-        logger.debug(f"Found {pokemons.count()} Pokemon in database")
+        pokemons = list(Pokemon.objects.all())
+        logger.debug(f"Found {len(pokemons)} Pokemon in database")
 
         best_match = self._find_best_among_pokemons(pokemons)
 
@@ -158,18 +210,72 @@ class MatchingEngine:
             cache_match_result(self.answers_hash, pokemon.id, total_score)
 
             # Save to database
-            with transaction.atomic():
-                match_result = MatchResult.objects.create(
-                    user_profile=self.user_profile,
-                    pokemon=pokemon,
-                    total_score=total_score,
-                )
-
-            return match_result
+            return self._save_match_result(pokemon, total_score)
 
         logger.debug("No match found")
         return None
 
+    async def afind_and_save_match(self) -> Optional[MatchResult]:
+        """
+        Async find_and_save_match. Scoring is CPU-bound, so it runs on the
+        bounded scoring pool and leaves the event loop free for other matches.
+        """
+        if hasattr(self, "cached_pokemon") and hasattr(self, "cached_score"):
+            logger.debug(
+                f"Using cached result: {self.cached_pokemon.name} (score: {self.cached_score})"
+            )
+            return await self._asave_match_result(
+                self.cached_pokemon, self.cached_score
+            )
+
+        pokemons = [pokemon async for pokemon in Pokemon.objects.all()]
+        logger.debug(f"Found {len(pokemons)} Pokemon in database")
+
+        loop = asyncio.get_running_loop()
+        best_match = await loop.run_in_executor(
+            get_scoring_executor(), profiled(self._find_best_among_pokemons), pokemons
+        )
+        if not best_match:
+            logger.debug("No match found")
+            return None
+
+        pokemon, total_score = best_match
+        logger.debug(f"Best match found: {pokemon.name} with score {total_score}")
+        await acache_match_result(self.answers_hash, pokemon.id, total_score)
+        return await self._asave_match_result(pokemon, total_score)
+
+    def _save_match_result(self, pokemon: Pokemon, total_score: float) -> MatchResult:
+        """
+        Saves the match, or queues it when MATCH_RESULT_WRITE_MODE enables
+        write-behind; a queued result is returned unsaved (no pk yet).
+        """
+        match_result = MatchResult(
+            user_profile=self.user_profile, pokemon=pokemon, total_score=total_score
+        )
+        flusher = get_match_result_flusher()
+        if flusher is not None:
+            flusher.enqueue(match_result)
+        else:
+            with transaction.atomic():
+                match_result.save()
+        record_match(pokemon)
+        return match_result
+
+    async def _asave_match_result(
+        self, pokemon: Pokemon, total_score: float
+    ) -> MatchResult:
+        """Async _save_match_result"""
+        match_result = MatchResult(
+            user_profile=self.user_profile, pokemon=pokemon, total_score=total_score
+        )
+        flusher = get_match_result_flusher()
+        if flusher is not None:
+            await flusher.aenqueue(match_result)
+        else:
+            await match_result.asave()
+        await arecord_match(pokemon)
+        return match_result
+
     def _calculate_match_score(self, pokemon: Pokemon) -> float:
         """Calculates overall match score"""
         type_score = self._score_types(pokemon.types, self.match_profile.types)
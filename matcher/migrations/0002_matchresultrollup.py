@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matcher", "0001_initial"),
+        ("pokemons", "0008_pokemon_name_lower_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchResultRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "pokemon",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="match_rollups",
+                        to="pokemons.pokemon",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Match Result Rollup",
+                "verbose_name_plural": "Match Result Rollups",
+                "ordering": ["-day", "-count"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "pokemon"), name="match_rollup_day_pokemon_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
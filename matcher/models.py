@@ -30,3 +30,26 @@ class MatchResult(models.Model):
 
     def __str__(self):
         return f"{self.user_profile} → {self.pokemon} (Score: {self.total_score:.2f})"
+
+
+class MatchResultRollup(models.Model):
+    """Match counts per day and Pokemon, kept when purge_history deletes rows"""
+
+    day = models.DateField()
+    pokemon = models.ForeignKey(
+        Pokemon, on_delete=models.CASCADE, related_name="match_rollups"
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day", "-count"]
+        verbose_name = "Match Result Rollup"
+        verbose_name_plural = "Match Result Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "pokemon"], name="match_rollup_day_pokemon_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.pokemon} × {self.count}"
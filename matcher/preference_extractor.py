@@ -1,8 +1,8 @@
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from core.models import AnswerOption, Question, UserProfile
+from core.models import AnswerOption, UserProfile
 
 from .dataclasses import MatchProfile, UserPreferences
 
@@ -17,6 +17,31 @@ class PreferenceExtractor:
 
     def extract_preferences(self) -> UserPreferences:
         """Extracts preferences from user answers"""
+        # One query for every answered option
+        options = AnswerOption.objects.in_bulk(self._answer_option_ids())
+        return self._preferences_from_options(options)
+
+    async def aextract_preferences(self) -> UserPreferences:
+        """Async extract_preferences, for code running on the event loop"""
+        options = {
+            option.id: option
+            async for option in AnswerOption.objects.filter(
+                id__in=self._answer_option_ids()
+            )
+        }
+        return self._preferences_from_options(options)
+
+    def _answer_option_ids(self) -> List[int]:
+        return [
+            int(option_id)
+            for option_id in self.user_profile.answers.values()
+            if str(option_id).isdigit()
+        ]
+
+    def _preferences_from_options(
+        self, options: Dict[int, AnswerOption]
+    ) -> UserPreferences:
+        """Builds preferences from the answered options, in answer order"""
         preferences = UserPreferences(
             types=[],
             colors=[],
@@ -28,20 +53,24 @@ class PreferenceExtractor:
 
         # Process each answer
         for question_id, answer_option_id in self.user_profile.answers.items():
+            option = (
+                options.get(int(answer_option_id))
+                if str(answer_option_id).isdigit()
+                else None
+            )
+            if option is None:
+                logger.debug(
+                    f"Error processing answer {question_id}: "
+                    f"no answer option {answer_option_id}"
+                )
+                continue
             try:
-                option = AnswerOption.objects.get(id=answer_option_id)
-
                 # Parse JSON answer value from the option
                 answer_data = json.loads(option.value)
-                self._process_answer_data(answer_data, preferences)
-
-            except (
-                Question.DoesNotExist,
-                AnswerOption.DoesNotExist,
-                json.JSONDecodeError,
-            ) as e:
+            except json.JSONDecodeError as e:
                 logger.debug(f"Error processing answer {question_id}: {e}")
                 continue
+            self._process_answer_data(answer_data, preferences)
 
         return preferences
 
@@ -141,7 +170,13 @@ class PreferenceExtractor:
 
     def get_match_profile(self) -> MatchProfile:
         """Returns profile for matching"""
-        preferences = self.extract_preferences()
+        return self._match_profile(self.extract_preferences())
+
+    async def aget_match_profile(self) -> MatchProfile:
+        """Async get_match_profile, for code running on the event loop"""
+        return self._match_profile(await self.aextract_preferences())
+
+    def _match_profile(self, preferences: UserPreferences) -> MatchProfile:
         archetype = self.get_personality_archetype(preferences)
 
         return MatchProfile(
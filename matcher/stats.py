@@ -0,0 +1,195 @@
+"""
+Match distribution statistics kept in Redis sorted sets.
+
+Every saved match increments, for the match's day and for all time:
+
+- ``match_stats:pokemon:<period>``: sorted set of Pokemon id -> matches
+- ``match_stats:types:<period>``: sorted set of type -> matches
+- ``match_stats:total:<period>``: number of matches
+
+``<period>`` is ``all`` or a local date (``2025-01-31``). Day keys expire after
+``MATCH_STATS_DAYS``. Top-K reads are ``ZREVRANGE`` calls, O(log n + k) in the
+catalog size however long the match history. Windows of several days are
+unioned once and cached for ``WINDOW_TTL`` seconds. ``rebuild_match_stats``
+recomputes every key from MatchResult and MatchResultRollup.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from matcher.models import MatchResult, MatchResultRollup
+from pokemons.cache import get_async_redis_connection, get_redis_connection
+from pokemons.models import Pokemon
+
+logger = logging.getLogger(__name__)
+
+STATS_PREFIX = "match_stats"
+ALL_TIME = "all"
+# Seconds a unioned multi-day window is reused before being recomputed
+WINDOW_TTL = 60
+
+
+def stats_key(kind: str, period: str) -> str:
+    return f"{STATS_PREFIX}:{kind}:{period}"
+
+
+def _day_ttl() -> int:
+    return (getattr(settings, "MATCH_STATS_DAYS", 90) + 1) * 24 * 3600
+
+
+def _queue_match(pipe, pokemon: Pokemon, day: date) -> None:
+    for period, ttl in ((ALL_TIME, None), (day.isoformat(), _day_ttl())):
+        pipe.zincrby(stats_key("pokemon", period), 1, str(pokemon.id))
+        for pokemon_type in pokemon.types or []:
+            pipe.zincrby(stats_key("types", period), 1, pokemon_type)
+        pipe.incr(stats_key("total", period))
+        if ttl:
+            for kind in ("pokemon", "types", "total"):
+                pipe.expire(stats_key(kind, period), ttl)
+
+
+def record_match(pokemon: Pokemon) -> None:
+    """Count a match of ``pokemon`` today; Redis errors are logged, not raised"""
+    try:
+        pipe = get_redis_connection().pipeline(transaction=False)
+        _queue_match(pipe, pokemon, timezone.localdate())
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Match stats not recorded for {pokemon.name}: {e}")
+
+
+async def arecord_match(pokemon: Pokemon) -> None:
+    """Async record_match, for code running on the event loop"""
+    try:
+        pipe = get_async_redis_connection().pipeline(transaction=False)
+        _queue_match(pipe, pokemon, timezone.localdate())
+        await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Match stats not recorded for {pokemon.name}: {e}")
+
+
+def _window_keys(r, days: Optional[int]) -> Dict[str, str]:
+    """Sorted set keys of the window, unioning day keys into a cached key"""
+    if days is None:
+        return {kind: stats_key(kind, ALL_TIME) for kind in ("pokemon", "types")}
+    today = timezone.localdate()
+    periods = [(today - timedelta(days=n)).isoformat() for n in range(days)]
+    if days == 1:
+        return {kind: stats_key(kind, periods[0]) for kind in ("pokemon", "types")}
+
+    keys = {
+        kind: stats_key(kind, f"window:{periods[-1]}:{periods[0]}")
+        for kind in ("pokemon", "types")
+    }
+    if r.exists(keys["pokemon"]):
+        return keys
+    pipe = r.pipeline(transaction=False)
+    for kind, key in keys.items():
+        pipe.zunionstore(key, [stats_key(kind, period) for period in periods])
+        pipe.expire(key, WINDOW_TTL)
+    pipe.execute()
+    return keys
+
+
+def _window_total(r, days: Optional[int]) -> int:
+    if days is None:
+        return int(r.get(stats_key("total", ALL_TIME)) or 0)
+    today = timezone.localdate()
+    totals = r.mget(
+        [
+            stats_key("total", (today - timedelta(days=n)).isoformat())
+            for n in range(days)
+        ]
+    )
+    return sum(int(total or 0) for total in totals)
+
+
+def get_match_stats(top: int = 10, days: Optional[int] = None) -> dict:
+    """
+    The ``top`` most matched Pokemon and types of the last ``days`` days
+    (today included), or of all time when ``days`` is None.
+
+    Pokemon are returned as ``{"id", "count"}``; callers resolve the ids.
+    """
+    r = get_redis_connection()
+    keys = _window_keys(r, days)
+    pipe = r.pipeline(transaction=False)
+    pipe.zrevrange(keys["pokemon"], 0, top - 1, withscores=True)
+    pipe.zrevrange(keys["types"], 0, top - 1, withscores=True)
+    pokemons, types = pipe.execute()
+    return {
+        "total": _window_total(r, days),
+        "pokemon": [{"id": id, "count": int(count)} for id, count in pokemons],
+        "types": [{"type": name, "count": int(count)} for name, count in types],
+    }
+
+
+def rebuild_match_stats() -> int:
+    """
+    Recompute every stats key from the database and return the number of
+    matches counted. Matches recorded while it runs may be missed; the next
+    rebuild picks them up.
+    """
+    first_day = timezone.localdate() - timedelta(
+        days=getattr(settings, "MATCH_STATS_DAYS", 90) - 1
+    )
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    for row in (
+        MatchResult.objects.order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "pokemon_id")
+        .annotate(count=Count("id"))
+    ):
+        counts[row["day"].isoformat()][str(row["pokemon_id"])] += row["count"]
+    for row in MatchResultRollup.objects.values("day", "pokemon_id").annotate(
+        count=Sum("count")
+    ):
+        counts[row["day"].isoformat()][str(row["pokemon_id"])] += row["count"]
+
+    all_time: Counter = Counter()
+    for day_counts in counts.values():
+        all_time.update(day_counts)
+    types = {
+        str(id): pokemon_types or []
+        for id, pokemon_types in Pokemon.objects.filter(
+            id__in=list(all_time)
+        ).values_list("id", "types")
+    }
+    periods = {ALL_TIME: all_time}
+    periods.update(
+        (day, day_counts)
+        for day, day_counts in counts.items()
+        if day >= first_day.isoformat()
+    )
+
+    r = get_redis_connection()
+    stale_days = {
+        key.rsplit(":", 1)[1] for key in r.scan_iter(stats_key("total", "*"))
+    } - set(periods)
+    # One MULTI/EXEC, so readers never see a partially rebuilt key
+    pipe = r.pipeline(transaction=True)
+    for period, pokemon_counts in periods.items():
+        type_counts: Counter = Counter()
+        for pokemon_id, count in pokemon_counts.items():
+            for pokemon_type in types.get(pokemon_id, []):
+                type_counts[pokemon_type] += count
+        for kind, mapping in (("pokemon", pokemon_counts), ("types", type_counts)):
+            pipe.delete(stats_key(kind, period))
+            if mapping:
+                pipe.zadd(stats_key(kind, period), mapping)
+        pipe.set(stats_key("total", period), sum(pokemon_counts.values()))
+        if period != ALL_TIME:
+            for kind in ("pokemon", "types", "total"):
+                pipe.expire(stats_key(kind, period), _day_ttl())
+    for day in stale_days:
+        pipe.delete(*(stats_key(kind, day) for kind in ("pokemon", "types", "total")))
+    pipe.execute()
+    return sum(all_time.values())
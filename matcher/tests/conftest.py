@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from core.models import AnswerOption, Question
+from matcher.cache import get_answers_hash, get_redis_connection
+from matcher.tests.factories import PokemonFactory, UserProfileFactory
+
+
+@pytest.fixture
+def answered_profile(db):
+    """A profile answering with real AnswerOptions, plus two candidate Pokemon"""
+    PokemonFactory(name="Firemon", types=["fire"], color="red", habitat="mountain")
+    PokemonFactory(name="Aquamon", types=["water"], color="blue", habitat="sea")
+    answers = {}
+    for identifier, value in [
+        ("element_resonance", {"type": "fire"}),
+        ("favorite_color", {"color": "red"}),
+        ("place_you_belong", {"habitat": "mountain"}),
+        ("conflict_handling", {"stat": "attack"}),
+    ]:
+        question = Question.objects.create(identifier=identifier, text=identifier)
+        option = AnswerOption.objects.create(
+            question=question, text=identifier, value=json.dumps(value)
+        )
+        answers[identifier] = str(option.id)
+    profile = UserProfileFactory(answers=answers)
+    match_key = f"match_result:{get_answers_hash(answers)}"
+    get_redis_connection().delete(match_key)
+    yield profile
+    get_redis_connection().delete(match_key)
@@ -1,6 +1,7 @@
 import pytest
 from rest_framework.test import APIClient
 
+from core.profiling import make_profiling_token
 from matcher.tests.factories import PokemonFactory, UserProfileFactory
 from matcher.tests.test_utils import SimpleMatchingEngine
 
@@ -90,3 +91,42 @@ def test_match_pokemon_profiles(api_client, test_pokemons, answers, expected_nam
     assert result is not None
     assert result.pokemon.name == expected_name
     assert result.total_score > 0
+
+
+def test_match_view_matches_a_profile(api_client, answered_profile):
+    response = api_client.post(
+        "/api/matcher/match/", {"user_profile_id": answered_profile.id}, format="json"
+    )
+
+    assert response.status_code == 200
+    assert response.data["user_profile_id"] == answered_profile.id
+    assert response.data["pokemon"]["name"] == "Firemon"
+    assert answered_profile.match_results.count() == 1
+
+
+@pytest.mark.django_db
+def test_match_view_returns_404_for_an_unknown_profile(api_client):
+    response = api_client.post(
+        "/api/matcher/match/", {"user_profile_id": 999999}, format="json"
+    )
+
+    assert response.status_code == 404
+
+
+def test_profiled_match_includes_the_scoring_threads(
+    api_client, answered_profile, settings
+):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_TOP_FUNCTIONS = 1000
+
+    response = api_client.post(
+        "/api/matcher/match/",
+        {"user_profile_id": answered_profile.id},
+        format="json",
+        HTTP_X_PROFILE_TOKEN=make_profiling_token(),
+        HTTP_X_PROFILE_OUTPUT="summary",
+    )
+
+    assert response["X-Profile-Status"] == "200"
+    assert "_find_best_among_pokemons" in response.content.decode()
+    assert answered_profile.match_results.count() == 1
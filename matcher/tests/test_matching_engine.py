@@ -1,5 +1,8 @@
 import pytest
+from asgiref.sync import async_to_sync
 
+from matcher.matching_engine import MatchingEngine
+from matcher.preference_extractor import PreferenceExtractor
 from matcher.tests.factories import PokemonFactory, UserProfileFactory
 from matcher.tests.test_utils import SimpleMatchingEngine
 
@@ -91,3 +94,37 @@ def test_matching_engine(profile_answers, expected_pokemon_name):
 
     assert result is not None
     assert result.pokemon.name == expected_pokemon_name
+
+
+def test_extract_preferences_fetches_options_in_one_query(
+    answered_profile, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        preferences = PreferenceExtractor(answered_profile).extract_preferences()
+
+    assert preferences.types == ["fire"]
+    assert preferences.colors == ["red"]
+    assert preferences.habitats == ["mountain"]
+    assert preferences.stat_preferences == {"attack": 1}
+
+
+def test_async_engine_matches_like_the_sync_engine(answered_profile):
+    """acreate/afind_and_save_match score a miss, cache it and reuse the cache"""
+
+    async def match():
+        engine = await MatchingEngine.acreate(answered_profile)
+        return engine, await engine.afind_and_save_match()
+
+    engine, result = async_to_sync(match)()
+    sync_engine = MatchingEngine.__new__(MatchingEngine)
+    sync_engine._setup(answered_profile)
+    sync_engine.match_profile = sync_engine.extractor.get_match_profile()
+
+    assert engine.match_profile == sync_engine.match_profile
+    assert result.pokemon.name == "Firemon"
+    assert result.total_score == sync_engine.find_best_match()[1]
+
+    cached_engine, cached_result = async_to_sync(match)()
+    assert cached_engine.cached_pokemon == result.pokemon
+    assert cached_result.pk != result.pk
+    assert cached_result.total_score == result.total_score
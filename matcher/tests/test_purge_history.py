@@ -0,0 +1,66 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import UserProfile
+from matcher.models import MatchResult, MatchResultRollup
+from matcher.tests.factories import PokemonFactory, UserProfileFactory
+
+
+def profile_with_match(pokemon, days_old):
+    profile = UserProfileFactory(answers={})
+    MatchResult.objects.create(user_profile=profile, pokemon=pokemon, total_score=1)
+    created_at = timezone.now() - timedelta(days=days_old)
+    UserProfile.objects.filter(id=profile.id).update(created_at=created_at)
+    MatchResult.objects.filter(user_profile=profile).update(created_at=created_at)
+    profile.created_at = created_at
+    return profile
+
+
+@pytest.mark.django_db
+def test_purge_history_deletes_expired_profiles_in_batches():
+    pokemon = PokemonFactory()
+    expired = [profile_with_match(pokemon, days_old=40) for _ in range(5)]
+    recent = profile_with_match(pokemon, days_old=1)
+    out = StringIO()
+
+    call_command(
+        "purge_history", days=30, batch_size=2, pause=0, rollup=True, stdout=out
+    )
+
+    assert list(UserProfile.objects.all()) == [recent]
+    assert list(MatchResult.objects.values_list("user_profile", flat=True)) == [
+        recent.id
+    ]
+    assert "Deleted 5 profiles and 5 match results" in out.getvalue()
+    assert "in 3 batches, 5 rolled up" in out.getvalue()
+    rollup = MatchResultRollup.objects.get()
+    assert rollup.pokemon == pokemon
+    assert rollup.count == 5
+    assert rollup.day == timezone.localdate(expired[0].created_at)
+
+
+@pytest.mark.django_db
+def test_purge_history_rollups_add_up_across_runs():
+    pokemon = PokemonFactory()
+    profile_with_match(pokemon, days_old=40)
+    call_command("purge_history", days=30, pause=0, rollup=True, stdout=StringIO())
+    profile_with_match(pokemon, days_old=40)
+    call_command("purge_history", days=30, pause=0, rollup=True, stdout=StringIO())
+
+    assert MatchResultRollup.objects.get().count == 2
+
+
+@pytest.mark.django_db
+def test_purge_history_dry_run_deletes_nothing():
+    profile_with_match(PokemonFactory(), days_old=40)
+    out = StringIO()
+
+    call_command("purge_history", days=30, dry_run=True, stdout=out)
+
+    assert "Would delete 1 profiles and 1 match results" in out.getvalue()
+    assert UserProfile.objects.count() == 1
+    assert not MatchResultRollup.objects.exists()
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from matcher import stats
+from matcher.models import MatchResult, MatchResultRollup
+from matcher.tests.factories import PokemonFactory, UserProfileFactory
+from matcher.tests.test_utils import SimpleMatchingEngine
+from pokemons.cache import get_redis_connection
+
+
+@pytest.fixture(autouse=True)
+def stats_prefix(monkeypatch):
+    """Keep the test counters apart from the real ones"""
+    monkeypatch.setattr(stats, "STATS_PREFIX", "test_match_stats")
+    r = get_redis_connection()
+    keys = list(r.scan_iter("test_match_stats:*"))
+    if keys:
+        r.delete(*keys)
+    yield
+    keys = list(r.scan_iter("test_match_stats:*"))
+    if keys:
+        r.delete(*keys)
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_matches_are_counted_and_served_by_the_stats_endpoint(api_client):
+    fire = PokemonFactory(name="Firemon", types=["fire"])
+    PokemonFactory(name="Aquamon", types=["water"])
+    for element in ["fire", "fire", "water"]:
+        profile = UserProfileFactory(answers={"element_resonance": element})
+        engine = SimpleMatchingEngine(profile)
+        engine.answers_hash = f"test_stats_{profile.id}"
+        engine.find_and_save_match()
+        get_redis_connection().delete(f"match_result:{engine.answers_hash}")
+
+    response = api_client.get("/api/matcher/stats/", {"top": 1})
+
+    assert response.status_code == 200
+    assert response.data["total"] == 3
+    assert response.data["pokemon"] == [
+        {
+            "pokemon": {
+                "id": str(fire.id),
+                "name": "Firemon",
+                "types": ["fire"],
+                "image_url": fire.image_url,
+            },
+            "count": 2,
+        }
+    ]
+    assert response.data["types"] == [{"type": "fire", "count": 2}]
+
+    week = api_client.get("/api/matcher/stats/", {"days": 7}).data
+    assert week["total"] == 3
+    assert [entry["count"] for entry in week["pokemon"]] == [2, 1]
+    assert {entry["type"]: entry["count"] for entry in week["types"]} == {
+        "fire": 2,
+        "water": 1,
+    }
+
+
+@pytest.mark.django_db
+def test_rebuild_counts_match_results_and_rollups():
+    pokemon = PokemonFactory(types=["grass"])
+    profile = UserProfileFactory(answers={})
+    MatchResult.objects.create(user_profile=profile, pokemon=pokemon, total_score=1)
+    old_day = timezone.localdate() - timedelta(days=400)
+    MatchResultRollup.objects.create(day=old_day, pokemon=pokemon, count=4)
+    out = StringIO()
+
+    call_command("rebuild_match_stats", stdout=out)
+
+    assert "from 5 matches" in out.getvalue()
+    all_time = stats.get_match_stats()
+    assert all_time["total"] == 5
+    assert all_time["pokemon"] == [{"id": str(pokemon.id), "count": 5}]
+    assert all_time["types"] == [{"type": "grass", "count": 5}]
+    # The rolled up day is older than MATCH_STATS_DAYS, only today is kept
+    assert stats.get_match_stats(days=1)["total"] == 1
+    assert stats.get_match_stats(days=30)["total"] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [{"top": 0}, {"top": "many"}, {"days": 10000}])
+def test_stats_endpoint_rejects_invalid_params(api_client, params):
+    response = api_client.get("/api/matcher/stats/", params)
+
+    assert response.status_code == 400
@@ -0,0 +1,118 @@
+import pytest
+
+from matcher.models import MatchResult
+from matcher.tests.factories import PokemonFactory, UserProfileFactory
+from matcher.tests.test_utils import SimpleMatchingEngine
+from matcher.write_behind import (
+    MatchResultFlusher,
+    MemoryQueue,
+    RedisQueue,
+    get_match_result_flusher,
+)
+from pokemons.cache import get_redis_connection
+
+
+def clear_redis_queue(queue):
+    redis = get_redis_connection()
+    redis.delete(queue.key, queue.claims_key, *redis.zrange(queue.claims_key, 0, -1))
+
+
+@pytest.fixture
+def redis_queue():
+    queue = RedisQueue(key="test:match_results:queue")
+    clear_redis_queue(queue)
+    yield queue
+    clear_redis_queue(queue)
+
+
+@pytest.fixture
+def no_flusher_thread(monkeypatch):
+    """Flush from the test instead, the thread can't see the test transaction"""
+    monkeypatch.setattr(MatchResultFlusher, "start", lambda self: None)
+
+
+@pytest.mark.django_db
+def test_queued_results_are_saved_in_batches(
+    redis_queue, no_flusher_thread, django_assert_num_queries
+):
+    profile = UserProfileFactory(answers={})
+    pokemon = PokemonFactory()
+    flusher = MatchResultFlusher(redis_queue, batch_size=3, interval=60)
+
+    for score in range(5):
+        flusher.enqueue(
+            MatchResult(user_profile=profile, pokemon=pokemon, total_score=score)
+        )
+    assert len(redis_queue) == 5
+    assert not MatchResult.objects.exists()
+
+    # One INSERT per batch, each in its own savepoint
+    with django_assert_num_queries(6):
+        assert flusher.flush() == 5
+
+    assert len(redis_queue) == 0
+    scores = MatchResult.objects.values_list("total_score", flat=True)
+    assert sorted(scores) == list(range(5))
+
+
+@pytest.mark.django_db
+def test_batches_of_a_flusher_killed_mid_flush_are_requeued(redis_queue):
+    profile = UserProfileFactory(answers={})
+    pokemon = PokemonFactory()
+    flusher = MatchResultFlusher(redis_queue, batch_size=2, interval=60)
+    for score in range(3):
+        redis_queue.push(
+            flusher._row(
+                MatchResult(user_profile=profile, pokemon=pokemon, total_score=score)
+            )
+        )
+
+    # A flusher claims a batch and dies before committing it
+    redis_queue.claim(2)
+    assert len(redis_queue) == 1
+    assert redis_queue.recover(older_than=300) == 0
+
+    assert redis_queue.recover(older_than=0) == 2
+    assert len(redis_queue) == 3
+    assert flusher.flush() == 3
+    scores = MatchResult.objects.values_list("total_score", flat=True)
+    assert sorted(scores) == [0, 1, 2]
+    assert get_redis_connection().zcard(redis_queue.claims_key) == 0
+
+
+@pytest.mark.django_db
+def test_engine_queues_its_result_in_write_behind_mode(settings, no_flusher_thread):
+    settings.MATCH_RESULT_WRITE_MODE = "memory"
+    flusher = get_match_result_flusher()
+    flusher.flush()
+    PokemonFactory(name="Firemon", types=["fire"])
+    profile = UserProfileFactory(answers={"element_resonance": "fire"})
+
+    result = SimpleMatchingEngine(profile).find_and_save_match()
+
+    assert result.pk is None
+    assert result.pokemon.name == "Firemon"
+    assert not profile.match_results.exists()
+
+    assert flusher.flush() == 1
+    assert profile.match_results.get().total_score == result.total_score
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rows_violating_constraints_are_dropped_alone():
+    profile = UserProfileFactory(answers={})
+    pokemon = PokemonFactory()
+    queue = MemoryQueue()
+    flusher = MatchResultFlusher(queue, batch_size=10, interval=60)
+    for profile_id in [profile.id, profile.id + 1000]:
+        queue.push(
+            {
+                "user_profile_id": profile_id,
+                "pokemon_id": str(pokemon.id),
+                "total_score": 1.0,
+            }
+        )
+
+    assert flusher.flush() == 1
+    assert MatchResult.objects.get().user_profile == profile
+    assert len(queue) == 0
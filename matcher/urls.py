@@ -1,9 +1,10 @@
 from django.urls import path
 
-from .views import MatchPokemonView
+from .views import MatchPokemonView, MatchStatsView
 
 app_name = "matcher"
 
 urlpatterns = [
     path("match/", MatchPokemonView.as_view(), name="match-pokemon"),
+    path("stats/", MatchStatsView.as_view(), name="match-stats"),
 ]
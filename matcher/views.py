@@ -1,26 +1,30 @@
 import logging
 
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.conf import settings
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from redis.exceptions import RedisError
 from rest_framework import status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.async_views import AsyncAPIView
 from core.models import UserProfile
-from pokemons.serializers import PokemonModelSerializer
+from pokemons.models import Pokemon
+from pokemons.serializers import PokemonModelSerializer, pokemon_representation
 
 from .exceptions import (
     MatchingFailed,
+    MatchStatsUnavailable,
 )
 from .matching_engine import MatchingEngine
+from .stats import get_match_stats
 
 logger = logging.getLogger(__name__)
 
 
-class MatchPokemonView(APIView):
+class MatchPokemonView(AsyncAPIView):
     """API for matching Pokemon based on user profile"""
 
     @swagger_auto_schema(
@@ -82,7 +86,7 @@ class MatchPokemonView(APIView):
             500: openapi.Response("Matching failed"),
         },
     )
-    def post(self, request):
+    async def post(self, request):
         """Match Pokemon for user based on their profile"""
         user_profile_id = request.data.get("user_profile_id")
 
@@ -97,21 +101,21 @@ class MatchPokemonView(APIView):
 
         try:
             # Get user profile from database
-            user_profile = get_object_or_404(UserProfile, id=user_profile_id)
+            user_profile = await UserProfile.objects.aget(id=user_profile_id)
 
             # Check if user has answers
             if not user_profile.answers:
                 raise ValidationError("User profile has no answers")
 
             # Create matching engine and find best Pokemon
-            engine = MatchingEngine(user_profile)
-            match_result = engine.find_and_save_match()
+            engine = await MatchingEngine.acreate(user_profile)
+            match_result = await engine.afind_and_save_match()
 
             if not match_result:
                 raise NotFound("No suitable Pokemon found for this profile")
 
             # Form response with full Pokemon information
-            pokemon_data = PokemonModelSerializer(match_result.pokemon).data
+            pokemon_data = pokemon_representation(match_result.pokemon)
 
             return Response(
                 {
@@ -123,9 +127,111 @@ class MatchPokemonView(APIView):
                 status=status.HTTP_200_OK,
             )
 
-        except Http404:
+        except UserProfile.DoesNotExist:
             raise NotFound("User profile not found")
         except Exception as e:
             # Log unexpected errors for debugging
             logger.error(f"Matching failed: {str(e)}")
             raise MatchingFailed(detail=f"Matching failed: {str(e)}")
+
+
+class MatchStatsView(APIView):
+    """API for the distribution of matched Pokemon and types"""
+
+    max_top = 100
+    pokemon_fields = ["id", "name", "types", "image_url"]
+
+    @swagger_auto_schema(
+        operation_summary="Most matched Pokemon and types",
+        operation_description="Top-K matched Pokemon and types of all time, or of "
+        "the last `days` days. Served from counters kept up to date at match time.",
+        manual_parameters=[
+            openapi.Parameter(
+                "top",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                description=f"Number of Pokemon and types to return (1-{max_top}, default 10)",
+            ),
+            openapi.Parameter(
+                "days",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                description="Only count the last DAYS days, today included "
+                "(default: all time)",
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                "Match statistics",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "days": openapi.Schema(type=openapi.TYPE_INTEGER),
+                        "total": openapi.Schema(
+                            type=openapi.TYPE_INTEGER,
+                            description="Matches in the window",
+                        ),
+                        "pokemon": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                            description="Most matched Pokemon with their count",
+                        ),
+                        "types": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                            description="Most matched types with their count",
+                        ),
+                    },
+                ),
+            ),
+            400: openapi.Response("Invalid top or days"),
+            503: openapi.Response("Match statistics unavailable"),
+        },
+    )
+    def get(self, request):
+        """Most matched Pokemon and types"""
+        top = self.get_int_param(request, "top", 10, self.max_top)
+        days = self.get_int_param(request, "days", None, settings.MATCH_STATS_DAYS)
+
+        try:
+            stats = get_match_stats(top=top, days=days)
+        except RedisError as e:
+            raise MatchStatsUnavailable(detail=f"Match statistics unavailable: {e}")
+
+        rows = {
+            str(row["id"]): row
+            for row in Pokemon.objects.filter(
+                id__in=[entry["id"] for entry in stats["pokemon"]]
+            ).values(*PokemonModelSerializer.columns_for(self.pokemon_fields))
+        }
+        return Response(
+            {
+                "days": days,
+                "total": stats["total"],
+                "pokemon": [
+                    {
+                        "pokemon": pokemon_representation(
+                            rows[entry["id"]], self.pokemon_fields
+                        ),
+                        "count": entry["count"],
+                    }
+                    for entry in stats["pokemon"]
+                    # Pokemon removed from the catalog since
+                    if entry["id"] in rows
+                ],
+                "types": stats["types"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def get_int_param(self, request, name: str, default, maximum: int):
+        value = request.query_params.get(name)
+        if value is None or value == "":
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: "Must be an integer"})
+        if not 1 <= value <= maximum:
+            raise ValidationError({name: f"Must be between 1 and {maximum}"})
+        return value
@@ -0,0 +1,331 @@
+"""
+Write-behind saving of MatchResult rows.
+
+``MATCH_RESULT_WRITE_MODE`` decides how ``MatchingEngine`` stores a match:
+
+- ``"sync"`` (default): the row is inserted and committed before the response.
+- ``"redis"``: the row is pushed onto a Redis list shared by every process and
+  the response returns right away. Queued rows survive a worker crash or
+  restart and are lost only with Redis' own data (see its persistence
+  settings).
+- ``"memory"``: the row is queued in the worker process itself. Cheapest, but
+  rows still queued when the process is killed are lost.
+
+In both write-behind modes a flusher thread in each process inserts queued
+rows with one ``bulk_create`` per ``MATCH_RESULT_FLUSH_SIZE`` rows, as soon as
+that many are queued or every ``MATCH_RESULT_FLUSH_INTERVAL_MS``. Rows still
+queued at a clean shutdown are flushed by an ``atexit`` hook, and
+``manage.py flush_match_results`` drains the Redis queue on demand. A row is
+in the database at most one interval after its response (longer while the
+database is unreachable; the batch is requeued and retried), and its
+``created_at`` is the time of the flush.
+
+In Redis mode a flusher claims a batch by moving it, in one script, from the
+queue into a list of its own, and deletes that list once the batch is
+committed. Batches left claimed for ``MATCH_RESULT_CLAIM_TIMEOUT`` seconds,
+by a flusher killed mid-flush, go back to the queue. A flusher killed
+between the commit and the delete has its batch inserted twice: delivery is
+at least once.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+
+from matcher.models import MatchResult
+from pokemons.cache import get_async_redis_connection, get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+WRITE_MODES = ("sync", "redis", "memory")
+REDIS_QUEUE_KEY = "match_results:queue"
+
+# Move up to ARGV[1] rows from the head of the queue into a new batch list and
+# record the claim time (Redis clock) in the claims sorted set
+# KEYS: queue, batch list, claims; ARGV: count
+CLAIM_SCRIPT = """
+local rows = redis.call('LPOP', KEYS[1], ARGV[1])
+if not rows then
+    return {}
+end
+for _, row in ipairs(rows) do
+    redis.call('RPUSH', KEYS[2], row)
+end
+redis.call('ZADD', KEYS[3], redis.call('TIME')[1], KEYS[2])
+return rows
+"""
+
+# Put the rows of a batch back at the head of the queue, in order, and drop
+# the batch and its claim. KEYS: queue, batch list, claims
+RELEASE_SCRIPT = """
+local rows = redis.call('LRANGE', KEYS[2], 0, -1)
+for i = #rows, 1, -1 do
+    redis.call('LPUSH', KEYS[1], rows[i])
+end
+redis.call('DEL', KEYS[2])
+redis.call('ZREM', KEYS[3], KEYS[2])
+return #rows
+"""
+
+
+class RedisQueue:
+    """
+    Queued rows in a Redis list, shared by every process. Batches being
+    flushed stay in Redis until they are committed.
+    """
+
+    def __init__(self, key: str = REDIS_QUEUE_KEY):
+        self.key = key
+        self.claims_key = f"{key}:claims"
+        redis = get_redis_connection()
+        self._claim_script = redis.register_script(CLAIM_SCRIPT)
+        self._release_script = redis.register_script(RELEASE_SCRIPT)
+
+    def push(self, row: dict) -> int:
+        """Queue a row and return how many rows are queued"""
+        return get_redis_connection().rpush(self.key, json.dumps(row))
+
+    async def apush(self, row: dict) -> int:
+        return await get_async_redis_connection().rpush(self.key, json.dumps(row))
+
+    def claim(self, count: int) -> Tuple[Optional[str], List[dict]]:
+        """Take up to ``count`` rows off the queue as a batch to flush"""
+        batch = f"{self.key}:batch:{uuid.uuid4().hex}"
+        rows = self._claim_script(keys=[self.key, batch, self.claims_key], args=[count])
+        return batch, [json.loads(row) for row in rows]
+
+    def ack(self, batch: str) -> None:
+        """Forget a batch once its rows are committed"""
+        pipe = get_redis_connection().pipeline()
+        pipe.delete(batch)
+        pipe.zrem(self.claims_key, batch)
+        pipe.execute()
+
+    def requeue(self, batch: str, rows: List[dict]) -> None:
+        """Put a batch that failed to flush back at the head of the queue"""
+        self._release_script(keys=[self.key, batch, self.claims_key])
+
+    def recover(self, older_than: float) -> int:
+        """
+        Requeue the batches claimed more than ``older_than`` seconds ago,
+        whose flusher died before committing them; returns how many rows
+        """
+        redis = get_redis_connection()
+        deadline = redis.time()[0] - older_than
+        recovered = 0
+        for batch in redis.zrangebyscore(self.claims_key, "-inf", deadline):
+            recovered += self._release_script(keys=[self.key, batch, self.claims_key])
+        if recovered:
+            logger.warning(
+                f"Requeued {recovered} match results claimed by a flusher "
+                f"that did not finish"
+            )
+        return recovered
+
+    def __len__(self) -> int:
+        return get_redis_connection().llen(self.key)
+
+
+class MemoryQueue:
+    """Queued rows in this process only"""
+
+    def __init__(self):
+        self._rows: deque = deque()
+        self._lock = threading.Lock()
+
+    def push(self, row: dict) -> int:
+        with self._lock:
+            self._rows.append(row)
+            return len(self._rows)
+
+    async def apush(self, row: dict) -> int:
+        return self.push(row)
+
+    def claim(self, count: int) -> Tuple[Optional[str], List[dict]]:
+        with self._lock:
+            return None, [
+                self._rows.popleft() for _ in range(min(count, len(self._rows)))
+            ]
+
+    def ack(self, batch: Optional[str]) -> None:
+        pass
+
+    def requeue(self, batch: Optional[str], rows: List[dict]) -> None:
+        with self._lock:
+            self._rows.extendleft(reversed(rows))
+
+    def recover(self, older_than: float) -> int:
+        # A killed process takes its queue along
+        return 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def save_match_results(rows: List[dict]) -> int:
+    """
+    Insert queued rows with one bulk INSERT and return how many were saved.
+
+    If the batch violates a constraint (a profile or Pokemon deleted since its
+    match), the rows are retried one by one and only the offending ones are
+    dropped.
+    """
+    try:
+        with transaction.atomic():
+            MatchResult.objects.bulk_create(_match_results(rows))
+        return len(rows)
+    except IntegrityError:
+        logger.warning("Batch of queued match results failed, saving row by row")
+
+    saved = 0
+    for row, match_result in zip(rows, _match_results(rows)):
+        try:
+            with transaction.atomic():
+                match_result.save()
+            saved += 1
+        except IntegrityError as e:
+            logger.warning(f"Dropping queued match result {row}: {e}")
+    return saved
+
+
+def _match_results(rows: List[dict]) -> List[MatchResult]:
+    return [
+        MatchResult(
+            user_profile_id=row["user_profile_id"],
+            pokemon_id=row["pokemon_id"],
+            total_score=row["total_score"],
+        )
+        for row in rows
+    ]
+
+
+class MatchResultFlusher:
+    """Queues match results and bulk-inserts them from a background thread"""
+
+    def __init__(
+        self, queue, batch_size: int, interval: float, claim_timeout: float = 300
+    ):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.claim_timeout = claim_timeout
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def enqueue(self, match_result: MatchResult) -> None:
+        self._queued(self.queue.push(self._row(match_result)))
+
+    async def aenqueue(self, match_result: MatchResult) -> None:
+        self._queued(await self.queue.apush(self._row(match_result)))
+
+    def _row(self, match_result: MatchResult) -> dict:
+        return {
+            "user_profile_id": match_result.user_profile_id,
+            "pokemon_id": str(match_result.pokemon_id),
+            "total_score": match_result.total_score,
+        }
+
+    def _queued(self, pending: int) -> None:
+        self.start()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def start(self) -> None:
+        """Start this process' flusher thread unless it is running"""
+        # Threads don't survive a fork, so every gunicorn worker starts its own
+        if self._running():
+            return
+        with self._lock:
+            if self._running():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="match-result-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _running(self) -> bool:
+        return (
+            self._pid == os.getpid()
+            and self._thread is not None
+            and self._thread.is_alive()
+        )
+
+    def _run(self) -> None:
+        next_recovery = 0.0
+        while True:
+            if time.monotonic() >= next_recovery:
+                next_recovery = time.monotonic() + self.claim_timeout
+                try:
+                    self.queue.recover(self.claim_timeout)
+                except Exception:
+                    logger.exception(
+                        "Recovering unfinished match result batches failed"
+                    )
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                if not self.flush():
+                    continue
+            except Exception:
+                logger.exception("Flushing queued match results failed")
+            # The thread's own connection; honour CONN_MAX_AGE and drop broken ones
+            close_old_connections()
+
+    def flush(self) -> int:
+        """Insert every queued row and return how many were saved"""
+        saved = 0
+        while True:
+            batch, rows = self.queue.claim(self.batch_size)
+            if not rows:
+                return saved
+            try:
+                saved += save_match_results(rows)
+            except Exception:
+                self.queue.requeue(batch, rows)
+                raise
+            self.queue.ack(batch)
+            logger.debug(f"Flushed {len(rows)} queued match results")
+
+
+_flushers: Dict[str, MatchResultFlusher] = {}
+_flushers_lock = threading.Lock()
+
+
+def get_match_result_flusher() -> Optional[MatchResultFlusher]:
+    """The flusher of the configured write-behind mode, or None in sync mode"""
+    mode = getattr(settings, "MATCH_RESULT_WRITE_MODE", "sync")
+    if mode not in WRITE_MODES:
+        raise ValueError(f"MATCH_RESULT_WRITE_MODE must be one of {WRITE_MODES}")
+    if mode == "sync":
+        return None
+    with _flushers_lock:
+        if mode not in _flushers:
+            flusher = MatchResultFlusher(
+                RedisQueue() if mode == "redis" else MemoryQueue(),
+                batch_size=getattr(settings, "MATCH_RESULT_FLUSH_SIZE", 100),
+                interval=getattr(settings, "MATCH_RESULT_FLUSH_INTERVAL_MS", 250)
+                / 1000,
+                claim_timeout=getattr(settings, "MATCH_RESULT_CLAIM_TIMEOUT", 300),
+            )
+            atexit.register(_flush_at_exit, flusher)
+            _flushers[mode] = flusher
+        return _flushers[mode]
+
+
+def _flush_at_exit(flusher: MatchResultFlusher) -> None:
+    try:
+        flusher.flush()
+    except Exception:
+        logger.exception("Queued match results could not be flushed at exit")
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PokemonsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pokemons"
+
+    def ready(self):
+        # Register signal receivers
+        from pokemons import signals  # noqa: F401
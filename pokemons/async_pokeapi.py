@@ -0,0 +1,228 @@
+import asyncio
+import random
+import time
+from typing import Callable, Iterable, List
+
+import httpx
+from django.conf import settings
+
+from core.loop_clients import get_loop_client
+from pokemons.http_cache import ResponseCache
+from pokemons.pokeapi import (
+    MAX_ATTEMPTS,
+    REQUEST_TIMEOUT,
+    RETRY_BUDGET,
+    RETRYABLE_STATUSES,
+    USER_AGENT,
+    PokemonAPIError,
+    cache_key,
+    extract_pokemon_fields,
+    extract_species_fields,
+    get_response_cache,
+    get_upstream_limiter,
+    normalize_pokemon_data,
+    parse_retry_after,
+    pokemon_urls,
+)
+from pokemons.rate_limit import TokenBucket
+
+
+class AsyncPokeAPIClient:
+    """
+    Asyncio PokeAPI client with a pooled keep-alive connection set,
+    a shared token bucket and Retry-After aware retries.
+
+    Use as an async context manager so the connection pool is closed::
+
+        async with AsyncPokeAPIClient(concurrency=20, rate=50, burst=20) as client:
+            data = await client.get_full_pokemon_data(25)
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 5,
+        rate: float | None = 10.0,
+        burst: int = 10,
+        base_url: str | None = None,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_budget: float = RETRY_BUDGET,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: ResponseCache | None = None,
+    ):
+        self.base_url = base_url
+        self.cache = cache if cache is not None else get_response_cache()
+        self.max_attempts = max_attempts
+        self.retry_budget = retry_budget
+        # None leaves only the shared upstream limiter in place
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        # Shared with web workers and other ingest processes
+        self.upstream_limiter = get_upstream_limiter()
+        self.retries = 0
+        connect_timeout, read_timeout = REQUEST_TIMEOUT
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT, "Accept": "application/json"},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "AsyncPokeAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with jitter, mirroring the sync tenacity policy"""
+        return min(10.0, 2.0 ** (attempt - 1)) + random.uniform(0, 1.5)  # nosec B311
+
+    async def get_json(
+        self, url: str, extract: Callable[[dict], dict] | None = None
+    ) -> dict:
+        """
+        Performs a rate-limited GET with retries and returns the parsed JSON body,
+        or only the fields ``extract`` keeps from it (see ``pokeapi._get_json``).
+        """
+        key = cache_key(url, extract)
+        cached = None
+        if self.cache is not None:
+            # Cache entries are files; keep disk I/O off the event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if self.cache.offline:
+                if cached is None:
+                    raise PokemonAPIError(
+                        f"Offline mode: {url} is not in the response cache"
+                    )
+                return cached.payload
+        headers = self.cache.conditional_headers(cached) if self.cache else None
+
+        started = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            if self.limiter is not None:
+                await self.limiter.acquire_async()
+            if self.upstream_limiter is not None:
+                await self.upstream_limiter.acquire_async()
+            try:
+                response = await self._client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                error = PokemonAPIError(
+                    f"PokeAPI request failed for {url}: {e}", retryable=True
+                )
+                delay = self._backoff(attempt)
+            else:
+                if cached is not None and response.status_code == 304:
+                    # Unchanged upstream: no body was sent, serve the stored payload
+                    return cached.payload
+                if response.status_code not in RETRYABLE_STATUSES:
+                    break
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                error = PokemonAPIError(
+                    f"PokeAPI request failed for {url}: HTTP {response.status_code}",
+                    status_code=response.status_code,
+                    retryable=True,
+                    retry_after=retry_after,
+                )
+                if retry_after is not None:
+                    if response.status_code == 429:
+                        # Upstream asked everyone to back off, not just this request
+                        if self.limiter is not None:
+                            self.limiter.pause(retry_after)
+                        if self.upstream_limiter is not None:
+                            self.upstream_limiter.pause(retry_after)
+                    delay = retry_after
+                else:
+                    delay = self._backoff(attempt)
+
+            # Out of attempts, or the wait would overrun the call's retry budget
+            if (
+                attempt == self.max_attempts
+                or time.monotonic() - started + delay > self.retry_budget
+            ):
+                raise error
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+        # Client errors and successes end the loop without retrying
+        if response.is_error:
+            raise PokemonAPIError(
+                f"PokeAPI request failed for {url}: HTTP {response.status_code}",
+                status_code=response.status_code,
+            )
+        try:
+            payload = response.json()
+        except ValueError:
+            raise PokemonAPIError(f"Invalid JSON received from {url}")
+        if extract is not None:
+            payload = extract(payload)
+        if self.cache is not None:
+            await asyncio.to_thread(
+                self.cache.set,
+                key,
+                payload,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+        return payload
+
+    async def get_full_pokemon_data(self, name: str | int) -> dict:
+        """
+        Fetches /pokemon and /pokemon-species concurrently and returns
+        normalized Pokémon data.
+        """
+        poke_url, species_url = pokemon_urls(name, self.base_url)
+        poke_fields, species_fields = await asyncio.gather(
+            self.get_json(poke_url, extract=extract_pokemon_fields),
+            self.get_json(species_url, extract=extract_species_fields),
+        )
+        return normalize_pokemon_data(poke_fields, species_fields)
+
+
+def get_async_pokeapi_client() -> AsyncPokeAPIClient:
+    """
+    Returns the pooled client of the running event loop, for async views;
+    httpx pools are bound to the loop they run on (see core.loop_clients)
+    """
+    return get_loop_client(
+        "pokeapi",
+        lambda: AsyncPokeAPIClient(
+            concurrency=getattr(settings, "POKEAPI_MAX_CONNECTIONS", 20),
+            rate=None,
+        ),
+    )
+
+
+async def fetch_all_pokemon_data(
+    client: AsyncPokeAPIClient,
+    pokemon_ids: Iterable[int],
+    concurrency: int,
+    on_result: Callable[[int, dict], None],
+    on_error: Callable[[int, Exception], None],
+    latencies: List[float] | None = None,
+) -> None:
+    """
+    Fetches every id with at most ``concurrency`` Pokémon in flight, reporting
+    each outcome through the callbacks as soon as it completes. Successful
+    fetch times in seconds are appended to ``latencies`` when given.
+    """
+    remaining = iter(pokemon_ids)
+
+    async def worker() -> None:
+        # Workers share one iterator, so each id is fetched exactly once
+        for pokemon_id in remaining:
+            started = time.monotonic()
+            try:
+                data = await client.get_full_pokemon_data(pokemon_id)
+            except Exception as e:
+                on_error(pokemon_id, e)
+            else:
+                if latencies is not None:
+                    latencies.append(time.monotonic() - started)
+                on_result(pokemon_id, data)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
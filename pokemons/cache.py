@@ -1,7 +1,17 @@
 import json
+import logging
+import time
+import uuid
 
 import redis
+import redis.asyncio
 from django.conf import settings
+from redis.exceptions import RedisError
+
+from core.loop_clients import get_loop_client
+from pokemons.models import normalize_pokemon_name
+
+logger = logging.getLogger(__name__)
 
 
 def get_redis_connection():
@@ -18,6 +28,27 @@ def get_redis_connection():
         return None
 
 
+def _new_async_redis_connection() -> redis.asyncio.Redis:
+    return redis.asyncio.Redis(
+        host=getattr(settings, "REDIS_HOST", "localhost"),
+        port=getattr(settings, "REDIS_PORT", 6379),
+        db=0,
+        decode_responses=True,
+    )
+
+
+def get_async_redis_connection() -> redis.asyncio.Redis:
+    """
+    Get the asyncio Redis client of the running event loop, which is bound
+    to it (see core.loop_clients)
+    """
+    return get_loop_client("redis", _new_async_redis_connection)
+
+
+def pokemon_cache_key(name: str) -> str:
+    return f"pokemon:{normalize_pokemon_name(name)}"
+
+
 def get_pokemon_from_cache(name: str) -> dict | None:
     """
     Retrieve a cached Pokémon response from Redis by name.
@@ -26,7 +57,7 @@ def get_pokemon_from_cache(name: str) -> dict | None:
     if r is None:
         return None  # Return None if Redis is not available
 
-    key = f"pokemon:{name.lower()}"
+    key = pokemon_cache_key(name)
     cached: str | None = r.get(key)
     return json.loads(cached) if cached else None
 
@@ -39,10 +70,23 @@ def set_pokemon_to_cache(name: str, data: dict, ttl: int = 86400) -> None:
     if r is None:
         return  # Skip caching if Redis is not available
 
-    key = f"pokemon:{name.lower()}"
+    key = pokemon_cache_key(name)
     r.setex(key, ttl, json.dumps(data))
 
 
+async def aget_pokemon_from_cache(name: str) -> dict | None:
+    """Async get_pokemon_from_cache, for views running on the event loop"""
+    cached: str | None = await get_async_redis_connection().get(pokemon_cache_key(name))
+    return json.loads(cached) if cached else None
+
+
+async def aset_pokemon_to_cache(name: str, data: dict, ttl: int = 86400) -> None:
+    """Async set_pokemon_to_cache, for views running on the event loop"""
+    await get_async_redis_connection().set(
+        pokemon_cache_key(name), json.dumps(data), ex=ttl
+    )
+
+
 def delete_pokemon_from_cache(name: str) -> None:
     """
     Optional: Remove a specific Pokémon from cache (for future updates).
@@ -51,5 +95,69 @@ def delete_pokemon_from_cache(name: str) -> None:
     if r is None:
         return  # Skip if Redis is not available
 
-    key = f"pokemon:{name.lower()}"
+    key = pokemon_cache_key(name)
     r.delete(key)
+
+
+def delete_pokemons_from_cache(names) -> None:
+    """
+    Remove several Pokémon from cache in one round trip (e.g. after a refresh).
+    """
+    r = get_redis_connection()
+    if r is None or not names:
+        return  # Skip if Redis is not available or nothing to remove
+
+    r.delete(*(pokemon_cache_key(name) for name in names))
+
+
+# Current catalog generation: a random token plus when it was created.
+# Expires so a missed bump (e.g. Redis briefly down) cannot pin stale ETags.
+CATALOG_VERSION_KEY = "pokemon:catalog:version"
+CATALOG_VERSION_TTL = 86400
+
+
+def get_catalog_version() -> dict | None:
+    """
+    Return the catalog generation ({"token", "last_modified"}) used for list
+    ETags, starting a new one if none is stored. None if Redis is unavailable.
+    """
+    r = get_redis_connection()
+    if r is None:
+        return None
+
+    try:
+        pipe = r.pipeline()
+        pipe.hsetnx(CATALOG_VERSION_KEY, "token", uuid.uuid4().hex)
+        pipe.hsetnx(CATALOG_VERSION_KEY, "last_modified", time.time())
+        pipe.hgetall(CATALOG_VERSION_KEY)
+        started, _, version = pipe.execute()
+        if started:
+            r.expire(CATALOG_VERSION_KEY, CATALOG_VERSION_TTL)
+    except RedisError as e:
+        logger.warning(f"Catalog version unavailable: {e}")
+        return None
+    return {
+        "token": version["token"],
+        "last_modified": float(version["last_modified"]),
+    }
+
+
+def bump_catalog_version() -> None:
+    """
+    Start a new catalog generation after any write to the Pokemon table,
+    so list ETags and Last-Modified change.
+    """
+    r = get_redis_connection()
+    if r is None:
+        return
+
+    try:
+        pipe = r.pipeline()
+        pipe.hset(
+            CATALOG_VERSION_KEY,
+            mapping={"token": uuid.uuid4().hex, "last_modified": time.time()},
+        )
+        pipe.expire(CATALOG_VERSION_KEY, CATALOG_VERSION_TTL)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Could not bump catalog version: {e}")
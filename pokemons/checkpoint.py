@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IngestCheckpoint:
+    """
+    Append-only JSON-lines log of a catalog ingest.
+
+    Every fetched id is written with its slim record and every failure with its
+    error, one line each and flushed immediately, so a crashed run can resume
+    without re-fetching what it already has. When an id appears more than once
+    the latest line wins (e.g. a failure later retried successfully).
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self) -> Tuple[Dict[int, dict], Dict[int, str]]:
+        """Returns (fetched records by id, error messages of failed ids)"""
+        fetched: Dict[int, dict] = {}
+        failed: Dict[int, str] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        entry = json.loads(line)
+                        pokemon_id = int(entry["id"])
+                    except (ValueError, KeyError, TypeError):
+                        # A run killed mid-write can leave a truncated last line
+                        logger.warning(
+                            f"Skipping unreadable checkpoint line {line_number}"
+                        )
+                        continue
+                    if entry.get("status") == "ok":
+                        fetched[pokemon_id] = entry["record"]
+                        failed.pop(pokemon_id, None)
+                    else:
+                        failed[pokemon_id] = entry.get("error", "")
+                        fetched.pop(pokemon_id, None)
+        except FileNotFoundError:
+            pass
+        return fetched, failed
+
+    def open(self, resume: bool = False) -> None:
+        """Opens the log for appending; a fresh run truncates the previous one"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._ends_mid_line():
+            # Terminate the truncated last line, or the next entry joins it
+            self._file.write("\n")
+
+    def _ends_mid_line(self) -> bool:
+        with open(self.path, "rb") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "IngestCheckpoint":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write(self, entry: dict) -> None:
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def record_success(self, pokemon_id: int, record: dict) -> None:
+        self._write({"id": pokemon_id, "status": "ok", "record": record})
+
+    def record_failure(self, pokemon_id: int, error: Exception | str) -> None:
+        self._write({"id": pokemon_id, "status": "failed", "error": str(error)})
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -27,9 +27,9 @@ class PokemonRawData:
     base_stats: PokemonStats
     image_url: Optional[str]
     cries_url: Optional[str]
-    game_indices: List[Dict]
-    held_items: List[Dict]
-    moves: List[Dict]
+    game_indices_count: int
+    held_items_count: int
+    moves_count: int
 
 
 @dataclass
@@ -46,3 +46,74 @@ class PokemonSearchResult:
     image_url: Optional[str]
     cries_url: Optional[str]
     popularity_score: int
+
+
+@dataclass
+class CachedResponse:
+    """Data structure for a PokeAPI response stored in the on-disk cache"""
+
+    payload: Dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+@dataclass
+class BulkUpsertResult:
+    """Data structure for the rows touched by a bulk Pokemon upsert"""
+
+    inserted_names: List[str] = field(default_factory=list)
+    updated_names: List[str] = field(default_factory=list)
+    unchanged_names: List[str] = field(default_factory=list)
+    invalid: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def inserted(self) -> int:
+        return len(self.inserted_names)
+
+    @property
+    def updated(self) -> int:
+        return len(self.updated_names)
+
+    @property
+    def unchanged(self) -> int:
+        return len(self.unchanged_names)
+
+
+@dataclass
+class CatalogChangeset:
+    """Data structure for the Pokemon names a catalog refresh added, changed or removed"""
+
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+
+@dataclass
+class FakePokeAPIConfig:
+    """Data structure for the behaviour of the local fake PokeAPI server"""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    bandwidth: Optional[int] = None
+    payload_dir: Optional[str] = None
+    max_id: int = 1025
+    seed: Optional[int] = None
+
+
+@dataclass
+class IngestBenchmarkResult:
+    """Data structure for the figures reported by an ingest benchmark run"""
+
+    mode: str
+    fetched: int
+    failed: int
+    elapsed: float
+    throughput: float
+    p50_latency: float
+    p99_latency: float
+    retries: int
+    peak_rss_mb: float
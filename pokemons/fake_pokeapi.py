@@ -0,0 +1,310 @@
+import hashlib
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+from pokemons.dataclasses import FakePokeAPIConfig
+
+TYPES = ["normal", "fire", "water", "grass", "electric", "psychic", "ghost", "dragon"]
+COLORS = ["red", "blue", "green", "yellow", "purple", "brown", "black", "white"]
+HABITATS = ["cave", "forest", "grassland", "mountain", "sea", "urban", None]
+VERSION_GROUPS = ["red-blue", "gold-silver", "ruby-sapphire", "x-y", "sword-shield"]
+LANGUAGES = ["ja", "ko", "fr", "de", "es", "it", "en"]
+STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+PATH_PATTERN = re.compile(r"/api/v2/(pokemon|pokemon-species)/([^/]+)/?$")
+
+# Bandwidth-capped responses are written in slices this many times a second
+BANDWIDTH_TICKS_PER_SECOND = 10
+
+
+def _resource(kind: str, name: str) -> dict:
+    return {"name": name, "url": f"https://pokeapi.co/api/v2/{kind}/{name}/"}
+
+
+def synthetic_pokemon_payload(pokemon_id: int) -> dict:
+    """
+    Builds a deterministic /pokemon payload shaped like PokeAPI's, including
+    the large ``moves`` array with nested version-group details.
+    """
+    rng = random.Random(pokemon_id)  # nosec B311
+    name = f"pokemon-{pokemon_id}"
+    return {
+        "id": pokemon_id,
+        "name": name,
+        "abilities": [
+            {"ability": _resource("ability", f"ability-{rng.randint(1, 300)}")}
+            for _ in range(rng.randint(1, 3))
+        ],
+        "cries": {"latest": f"https://cries.test/{pokemon_id}.ogg"},
+        "game_indices": [
+            {"game_index": pokemon_id, "version": _resource("version", group)}
+            for group in VERSION_GROUPS[: rng.randint(1, len(VERSION_GROUPS))]
+        ],
+        "held_items": [
+            {"item": _resource("item", f"item-{rng.randint(1, 200)}")}
+            for _ in range(rng.randint(0, 2))
+        ],
+        "moves": [
+            {
+                "move": _resource("move", f"move-{rng.randint(1, 900)}"),
+                "version_group_details": [
+                    {
+                        "level_learned_at": rng.randint(0, 60),
+                        "move_learn_method": _resource("move-learn-method", "level-up"),
+                        "version_group": _resource("version-group", group),
+                    }
+                    for group in VERSION_GROUPS
+                ],
+            }
+            for _ in range(rng.randint(10, 120))
+        ],
+        "sprites": {"front_default": f"https://sprites.test/{pokemon_id}.png"},
+        "stats": [
+            {"base_stat": rng.randint(20, 150), "stat": _resource("stat", stat)}
+            for stat in STATS
+        ],
+        "types": [
+            {"slot": slot, "type": _resource("type", pokemon_type)}
+            for slot, pokemon_type in enumerate(rng.sample(TYPES, rng.randint(1, 2)), 1)
+        ],
+    }
+
+
+def synthetic_species_payload(pokemon_id: int) -> dict:
+    """Builds a deterministic /pokemon-species payload shaped like PokeAPI's"""
+    rng = random.Random(-pokemon_id)  # nosec B311
+    habitat = rng.choice(HABITATS)
+    return {
+        "id": pokemon_id,
+        "name": f"pokemon-{pokemon_id}",
+        "color": _resource("pokemon-color", rng.choice(COLORS)),
+        "habitat": _resource("pokemon-habitat", habitat) if habitat else None,
+        "flavor_text_entries": [
+            {
+                "flavor_text": f"Entry {index} for\npokemon #{pokemon_id}.",
+                "language": _resource("language", language),
+                "version": _resource("version", group),
+            }
+            for index, (language, group) in enumerate(
+                (language, group) for group in VERSION_GROUPS for language in LANGUAGES
+            )
+        ],
+    }
+
+
+class FakePokeAPIServer(ThreadingHTTPServer):
+    """
+    Local stand-in for PokeAPI serving /pokemon and /pokemon-species.
+
+    Payloads are read from ``payload_dir`` (``<dir>/<resource>/<id>.json``,
+    e.g. recorded from the real API) or generated synthetically. Latency,
+    errors, 429s with Retry-After and a per-response bandwidth cap are
+    injected according to the config, so ingest can be benchmarked offline.
+    """
+
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops connection bursts from
+    # concurrent clients, which then stall for a SYN retransmit (~1s)
+    request_queue_size = 128
+
+    def __init__(self, server_address, config: FakePokeAPIConfig | None = None):
+        super().__init__(server_address, FakePokeAPIRequestHandler)
+        self.config = config or FakePokeAPIConfig()
+        self._rng = random.Random(self.config.seed)  # nosec B311
+        self._rng_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v2"
+
+    def roll(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def delay(self) -> float:
+        with self._rng_lock:
+            return self.config.latency + self._rng.uniform(0, self.config.jitter)
+
+    def payload(self, resource: str, key: str) -> bytes | None:
+        """Returns the encoded body for a resource, or None if it does not exist"""
+        pokemon_id = _parse_pokemon_key(key)
+        if pokemon_id is None or not 1 <= pokemon_id <= self.config.max_id:
+            return None
+        return _load_payload(self.config.payload_dir, resource, pokemon_id)
+
+
+def _parse_pokemon_key(key: str) -> int | None:
+    """Accepts an id or a synthetic ``pokemon-<id>`` name"""
+    key = key.lower().removeprefix("pokemon-")
+    return int(key) if key.isdigit() else None
+
+
+@lru_cache(maxsize=4096)
+def _load_payload(payload_dir: str | None, resource: str, pokemon_id: int) -> bytes:
+    if payload_dir:
+        path = Path(payload_dir) / resource / f"{pokemon_id}.json"
+        if path.exists():
+            return path.read_bytes()
+    if resource == "pokemon":
+        payload = synthetic_pokemon_payload(pokemon_id)
+    else:
+        payload = synthetic_species_payload(pokemon_id)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+class FakePokeAPIRequestHandler(BaseHTTPRequestHandler):
+    server: FakePokeAPIServer
+    # Keep-alive, like the real API, so client connection pooling is exercised
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        config = self.server.config
+        time.sleep(self.server.delay())
+
+        if config.rate_limit_rate and self.server.roll() < config.rate_limit_rate:
+            self.send_empty(429, {"Retry-After": f"{config.retry_after:g}"})
+            return
+        if config.error_rate and self.server.roll() < config.error_rate:
+            self.send_empty(503)
+            return
+
+        match = PATH_PATTERN.match(self.path.split("?", 1)[0])
+        body = self.server.payload(*match.groups()) if match else None
+        if body is None:
+            self.send_empty(404)
+            return
+
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_empty(304, {"ETag": etag})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.write_body(body)
+
+    def send_empty(self, status: int, headers: dict | None = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def write_body(self, body: bytes):
+        bandwidth = self.server.config.bandwidth
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        # Trickle the body out in timed slices to emulate a slow link
+        slice_size = max(1, bandwidth // BANDWIDTH_TICKS_PER_SECOND)
+        for offset in range(0, len(body), slice_size):
+            self.wfile.write(body[offset : offset + slice_size])
+            self.wfile.flush()
+            time.sleep(1 / BANDWIDTH_TICKS_PER_SECOND)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate benchmark output
+        pass
+
+
+@contextmanager
+def running_fake_pokeapi(
+    config: FakePokeAPIConfig | None = None, host: str = "127.0.0.1", port: int = 0
+) -> Iterator[str]:
+    """
+    Serves a fake PokeAPI from a child process and yields its base URL.
+
+    A separate process keeps the server's CPU and memory out of the
+    figures measured in the calling process.
+    """
+    server = FakePokeAPIServer((host, port), config)
+    base_url = server.base_url
+    process = multiprocessing.get_context("fork").Process(
+        target=server.serve_forever, daemon=True
+    )
+    process.start()
+    # The child owns the listening socket from here on
+    server.server_close()
+    try:
+        yield base_url
+    finally:
+        process.terminate()
+        process.join()
+
+
+def add_fake_pokeapi_arguments(parser) -> None:
+    """Adds the fake server's behaviour options to a management command"""
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Seconds added to every response (default: 0.05)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Extra random latency of up to this many seconds (default: 0)",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with 503 (default: 0)",
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with 429 + Retry-After (default: 0)",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=float,
+        default=1.0,
+        help="Retry-After seconds sent with 429 responses (default: 1)",
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=int,
+        default=None,
+        help="Cap each response body at this many bytes per second",
+    )
+    parser.add_argument(
+        "--payload-dir",
+        default=None,
+        help="Serve recorded payloads from <dir>/pokemon/<id>.json and "
+        "<dir>/pokemon-species/<id>.json instead of synthetic ones",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for injected latency and failures, for repeatable runs",
+    )
+
+
+def fake_pokeapi_config_from_options(options: dict) -> FakePokeAPIConfig:
+    return FakePokeAPIConfig(
+        latency=options["latency"],
+        jitter=options["jitter"],
+        error_rate=options["error_rate"],
+        rate_limit_rate=options["rate_limit_rate"],
+        retry_after=options["retry_after"],
+        bandwidth=options["bandwidth"],
+        payload_dir=options["payload_dir"],
+        seed=options["seed"],
+    )
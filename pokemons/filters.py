@@ -0,0 +1,103 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import DecimalField, F
+from django.db.models.functions import Cast
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from pokemons.models import SEARCH_NAME_CONFIG, SEARCH_TEXT_CONFIG
+
+# Result order of ?search= requests without an explicit ?ordering=
+RANKED_ORDERING = ["-search_rank", "id"]
+
+# ts_rank is a float4, whose text form the cursor stores does not compare
+# equal to it again; as a fixed-scale numeric it round-trips exactly
+SEARCH_RANK_FIELD = DecimalField(max_digits=20, decimal_places=10)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def search_term(request) -> str:
+    return request.query_params.get(filters.SearchFilter.search_param, "").strip()
+
+
+def build_search_query(term: str) -> SearchQuery:
+    """
+    tsquery for a search box term: the term in websearch syntax (stemmed, so
+    "seeds" finds "seed"), or every word of it as a prefix ("pika" finds
+    "pikachu", "mr mi" finds "mr-mime").
+    """
+    query = SearchQuery(term, config=SEARCH_TEXT_CONFIG, search_type="websearch")
+    words = WORD_PATTERN.findall(term.lower())
+    if words:
+        prefixes = " & ".join(f"{word}:*" for word in words)
+        query |= SearchQuery(prefixes, config=SEARCH_NAME_CONFIG, search_type="raw")
+    return query
+
+
+class PokemonSearchFilter(filters.SearchFilter):
+    """
+    Indexed, ranked ``?search=`` over the Pokemon catalog.
+
+    Replaces SearchFilter's leading-wildcard ILIKE over several columns,
+    which no btree index can serve and so scanned the whole table. The term
+    is matched against ``Pokemon.search_vector`` (name, flavor text, color,
+    habitat) with one ``@@`` served by its GIN index, and matches are
+    annotated with ``search_rank`` (name hits outrank flavor text hits), a
+    numeric the cursor pagination can page on.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = search_term(request)
+        if not term:
+            return queryset
+        query = build_search_query(term)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(SearchRank(F("search_vector"), query), SEARCH_RANK_FIELD)
+        )
+
+
+class PokemonOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter that ranks search results best match first by default"""
+
+    def get_default_ordering(self, view):
+        if search_term(view.request):
+            return RANKED_ORDERING
+        return super().get_default_ordering(view)
+
+
+class PokemonArrayFilter(filters.BaseFilterBackend):
+    """
+    ``?type=`` and ``?ability=`` filters on the ArrayField columns.
+
+    Values may be repeated or comma-separated. ``?match=all`` (the default)
+    keeps Pokemon having every value (``@>``), ``?match=any`` those having at
+    least one (``&&``). Both operators are served by the GIN indexes on
+    ``types`` and ``abilities``.
+    """
+
+    match_param = "match"
+    match_lookups = {"all": "contains", "any": "overlap"}
+    array_params = {"type": "types", "ability": "abilities"}
+
+    def get_values(self, request, param: str) -> list:
+        return [
+            value.strip().lower()
+            for raw in request.query_params.getlist(param)
+            for value in raw.split(",")
+            if value.strip()
+        ]
+
+    def filter_queryset(self, request, queryset, view):
+        match = request.query_params.get(self.match_param, "all")
+        if match not in self.match_lookups:
+            raise ValidationError(
+                {self.match_param: f"Choose from {list(self.match_lookups)}"}
+            )
+        for param, field in self.array_params.items():
+            values = self.get_values(request, param)
+            if values:
+                lookup = f"{field}__{self.match_lookups[match]}"
+                queryset = queryset.filter(**{lookup: values})
+        return queryset
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from pokemons.dataclasses import CachedResponse
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of PokeAPI JSON responses, addressed by URL.
+
+    Each entry keeps the validators (ETag / Last-Modified) the upstream sent, so
+    a refresh can be a conditional request answered with 304 Not Modified.
+    In offline mode callers serve purely from the cache and never hit the network.
+    """
+
+    def __init__(self, directory: str | Path, offline: bool = False):
+        self.directory = Path(directory)
+        self.offline = offline
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        # Fan out into subdirectories so no single directory grows huge
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Returns the cached response for a URL, if any"""
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+            return CachedResponse(
+                payload=entry["payload"],
+                etag=entry.get("etag"),
+                last_modified=entry.get("last_modified"),
+                stored_at=entry.get("stored_at", 0.0),
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+
+    def set(
+        self,
+        url: str,
+        payload: dict,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Stores a response atomically so readers never see a partial entry"""
+        path = self._path(url)
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "payload": payload,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entry, f, separators=(",", ":"))
+                os.replace(tmp_path, path)
+            except BaseException:
+                # Don't leave a half-written entry behind in the cache directory
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            # A cache that can't be written must never fail the request itself
+            logger.warning(f"Could not cache response for {url}: {e}")
+
+    def conditional_headers(self, entry: CachedResponse | None) -> dict:
+        """Builds If-None-Match / If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
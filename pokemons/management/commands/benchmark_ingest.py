@@ -0,0 +1,174 @@
+import json
+import resource
+import statistics
+import tempfile
+from dataclasses import asdict
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from pokemons.dataclasses import IngestBenchmarkResult
+from pokemons.fake_pokeapi import (
+    add_fake_pokeapi_arguments,
+    fake_pokeapi_config_from_options,
+    running_fake_pokeapi,
+)
+from pokemons.management.commands import load_top_pokemons
+from pokemons.pokeapi import configure_response_cache, configure_upstream_limiter
+
+
+def percentile(values: list, pct: int) -> float:
+    """Interpolated percentile of a sample; 0.0 when it is empty"""
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark load_top_pokemons against a local fake PokeAPI and report "
+        "throughput, p50/p99 fetch latency, retries and peak RSS"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Benchmark the asyncio client instead of the thread pool",
+        )
+        parser.add_argument(
+            "--concurrent",
+            type=int,
+            default=20,
+            help="Number of concurrent requests (default: 20)",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=1000.0,
+            help="Client-side requests per second (default: 1000)",
+        )
+        parser.add_argument(
+            "--burst",
+            type=int,
+            default=100,
+            help="Client-side burst size (default: 100)",
+        )
+        parser.add_argument(
+            "--base-url",
+            default=None,
+            help="Benchmark against an already running server instead of "
+            "starting one",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Also write the results as JSON to this file",
+        )
+        parser.add_argument(
+            "--min-throughput",
+            type=float,
+            default=None,
+            help="Fail if fewer Pokemon per second are fetched",
+        )
+        parser.add_argument(
+            "--max-p99",
+            type=float,
+            default=None,
+            help="Fail if the p99 fetch latency exceeds this many seconds",
+        )
+        add_fake_pokeapi_arguments(parser)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            # A throwaway cache keeps runs cold and the real cache untouched, and
+            # the fake server is not PokeAPI: only the command's --rate applies
+            configure_response_cache(directory=str(Path(tmp) / "cache"))
+            configure_upstream_limiter(rate=0)
+            try:
+                if options["base_url"]:
+                    ingest = self.run_ingest(options["base_url"], tmp, options)
+                else:
+                    config = fake_pokeapi_config_from_options(options)
+                    with running_fake_pokeapi(config) as base_url:
+                        ingest = self.run_ingest(base_url, tmp, options)
+            finally:
+                configure_response_cache()
+                configure_upstream_limiter()
+
+        result = IngestBenchmarkResult(
+            mode="async" if options["use_async"] else "sync",
+            fetched=ingest.fetched,
+            failed=ingest.failed,
+            elapsed=ingest.fetch_elapsed,
+            throughput=(
+                ingest.fetched / ingest.fetch_elapsed if ingest.fetch_elapsed else 0.0
+            ),
+            p50_latency=percentile(ingest.fetch_latencies, 50),
+            p99_latency=percentile(ingest.fetch_latencies, 99),
+            retries=ingest.retries,
+            peak_rss_mb=peak_rss_mb(),
+        )
+        self.report(result)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(asdict(result), f, indent=2)
+
+        self.check_thresholds(result, options)
+
+    def run_ingest(self, base_url: str, tmp: str, options: dict):
+        """Runs a dry-run ingest against base_url and returns the command"""
+        ingest = load_top_pokemons.Command(stdout=StringIO())
+        call_command(
+            ingest,
+            base_url=base_url,
+            concurrent=options["concurrent"],
+            rate=options["rate"],
+            burst=options["burst"],
+            use_async=options["use_async"],
+            checkpoint=str(Path(tmp) / "checkpoint.jsonl"),
+            dry_run=True,
+            stdout=StringIO() if options["verbosity"] < 2 else self.stdout,
+        )
+        return ingest
+
+    def report(self, result: IngestBenchmarkResult):
+        self.stdout.write(
+            f"Ingest benchmark ({result.mode}):\n"
+            f"  fetched:     {result.fetched} ({result.failed} failed)\n"
+            f"  elapsed:     {result.elapsed:.2f}s\n"
+            f"  throughput:  {result.throughput:.1f} Pokemon/s\n"
+            f"  latency p50: {result.p50_latency * 1000:.1f} ms\n"
+            f"  latency p99: {result.p99_latency * 1000:.1f} ms\n"
+            f"  retries:     {result.retries}\n"
+            f"  peak RSS:    {result.peak_rss_mb:.1f} MB"
+        )
+
+    def check_thresholds(self, result: IngestBenchmarkResult, options: dict):
+        failures = []
+        if (
+            options["min_throughput"] is not None
+            and result.throughput < options["min_throughput"]
+        ):
+            failures.append(
+                f"throughput {result.throughput:.1f}/s is below "
+                f"{options['min_throughput']:g}/s"
+            )
+        if options["max_p99"] is not None and result.p99_latency > options["max_p99"]:
+            failures.append(
+                f"p99 latency {result.p99_latency:.3f}s exceeds {options['max_p99']:g}s"
+            )
+        if failures:
+            raise CommandError("Benchmark regression: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
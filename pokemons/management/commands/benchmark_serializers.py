@@ -0,0 +1,95 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+from pokemons.models import Pokemon
+from pokemons.serializers import PokemonModelSerializer, pokemon_representations
+
+
+def make_pokemon(index: int) -> Pokemon:
+    """Unsaved Pokemon with every column set, so no database is needed"""
+    return Pokemon(
+        id=uuid.uuid4(),
+        name=f"pokemon-{index}",
+        types=["grass", "poison"],
+        color="green",
+        habitat="grassland",
+        abilities=["overgrow", "chlorophyll"],
+        flavor_text="A strange seed was planted on its back at birth.",
+        hp=45,
+        attack=49,
+        defense=49,
+        special_attack=65,
+        special_defense=65,
+        speed=45,
+        image_url=f"https://img.test/{index}.png",
+        cries_url=f"https://cries.test/{index}.ogg",
+        popularity_score=index % 50,
+        created_at=timezone.now(),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-object cost of PokemonModelSerializer with the "
+        "pokemon_representation read path"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=1000,
+            help="Pokemon serialized per round (default: 1000)",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=5,
+            help="Rounds per variant; the fastest is reported (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        pokemons = [make_pokemon(index) for index in range(count)]
+        rows = [
+            {
+                **model_to_dict(pokemon),
+                "id": pokemon.id,
+                "created_at": pokemon.created_at,
+            }
+            for pokemon in pokemons
+        ]
+
+        variants = {
+            "PokemonModelSerializer": lambda: PokemonModelSerializer(
+                pokemons, many=True
+            ).data,
+            "pokemon_representations (instances)": lambda: pokemon_representations(
+                pokemons
+            ),
+            "pokemon_representations (.values() rows)": lambda: (
+                pokemon_representations(rows)
+            ),
+        }
+
+        baseline = None
+        self.stdout.write(f"Serializing {count} Pokemon, best of {options['rounds']}:")
+        for label, serialize in variants.items():
+            per_object = self.best_time(serialize, options["rounds"]) / count
+            baseline = baseline or per_object
+            self.stdout.write(
+                f"  {label:40} {per_object * 1e6:8.2f} µs/object "
+                f"({baseline / per_object:.1f}x)"
+            )
+
+    def best_time(self, serialize, rounds: int) -> float:
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            serialize()
+            best = min(best, time.perf_counter() - started)
+        return best
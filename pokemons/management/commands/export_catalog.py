@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pokemons.snapshot import SNAPSHOT_CHUNK_SIZE, write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Export the Pokemon catalog to a compressed, versioned snapshot file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Snapshot file to write, e.g. fixtures/pokemon_catalog.jsonl.gz",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=SNAPSHOT_CHUNK_SIZE,
+            help=f"Rows fetched per database round trip (default: {SNAPSHOT_CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = write_snapshot(options["path"], chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {count} Pokemon to {options['path']} "
+                f"in {time.monotonic() - started:.2f}s."
+            )
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from pokemons.fake_pokeapi import (
+    FakePokeAPIServer,
+    add_fake_pokeapi_arguments,
+    fake_pokeapi_config_from_options,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a local stand-in for PokeAPI (/pokemon and /pokemon-species) with "
+        "configurable latency, errors, 429s and bandwidth"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host",
+            default="127.0.0.1",
+            help="Interface to listen on (default: 127.0.0.1)",
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=8765,
+            help="Port to listen on (default: 8765)",
+        )
+        add_fake_pokeapi_arguments(parser)
+
+    def handle(self, *args, **options):
+        config = fake_pokeapi_config_from_options(options)
+        server = FakePokeAPIServer((options["host"], options["port"]), config)
+        self.stdout.write(
+            self.style.SUCCESS(f"Serving fake PokeAPI at {server.base_url}")
+        )
+        self.stdout.write(f"Use it with: --base-url {server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
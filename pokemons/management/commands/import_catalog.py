@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pokemons.snapshot import SNAPSHOT_CHUNK_SIZE, SnapshotError, import_snapshot
+
+
+class Command(BaseCommand):
+    help = "Import the Pokemon catalog from a snapshot written by export_catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file to read")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=SNAPSHOT_CHUNK_SIZE,
+            help=f"Rows inserted per statement (default: {SNAPSHOT_CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            count = import_snapshot(options["path"], chunk_size=options["chunk_size"])
+        except SnapshotError as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {count} Pokemon from {options['path']} "
+                f"in {time.monotonic() - started:.2f}s."
+            )
+        )
@@ -1,19 +1,32 @@
 # management/commands/load_top_pokemons.py
 
+import asyncio
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from redis.exceptions import RedisError
 
-from pokemons.dataclasses import PokemonRawData
-from pokemons.pokeapi import get_full_pokemon_data
-from pokemons.serializers import PokemonDataSerializer
+from pokemons.async_pokeapi import AsyncPokeAPIClient, fetch_all_pokemon_data
+from pokemons.cache import delete_pokemons_from_cache
+from pokemons.checkpoint import IngestCheckpoint
+from pokemons.pokeapi import (
+    configure_response_cache,
+    configure_session_pool,
+    get_full_pokemon_data,
+    get_retry_count,
+)
+from pokemons.rate_limit import TokenBucket
 from pokemons.services import (
-    create_or_update_pokemon_from_raw,
-    estimate_popularity_score,
-    extract_base_stats,
+    TopPokemonHeap,
+    bulk_upsert_pokemon,
+    slim_pokemon_record,
 )
 
+# Pokemon IDs available in PokeAPI
+POKEMON_IDS = range(1, 1026)
+
 
 class Command(BaseCommand):
     help = "Load top-N most popular Pokémon into the database from PokeAPI"
@@ -31,99 +44,262 @@ class Command(BaseCommand):
             default=5,
             help="Number of concurrent API requests (default: 5)",
         )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Fetch with the asyncio client instead of a thread pool",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=10.0,
+            help="Upstream requests per second (default: 10)",
+        )
+        parser.add_argument(
+            "--burst",
+            type=int,
+            default=10,
+            help="Requests allowed back-to-back before rate limiting (default: 10)",
+        )
+        parser.add_argument(
+            "--base-url",
+            default=None,
+            help="PokeAPI root URL, e.g. a local fake server for benchmarking",
+        )
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Serve PokeAPI responses only from the on-disk response cache",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="Checkpoint file recording fetched ids and failures "
+            "(default: INGEST_CHECKPOINT_PATH)",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue from the checkpoint, fetching only ids not attempted yet",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Re-fetch only the ids that failed in the checkpointed run",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Fetch and rank Pokémon without writing them to the database",
+        )
 
     def handle(self, *args, **options):
         limit = options["limit"]
         concurrent = options["concurrent"]
+        rate = options["rate"]
+        burst = options["burst"]
+        base_url = options["base_url"]
+        resume = options["resume"]
+        retry_failed = options["retry_failed"]
 
-        self.load_pokemons_sync(limit, concurrent)
+        if options["offline"]:
+            configure_response_cache(offline=True)
 
-    def load_pokemons_sync(self, limit: int, concurrent: int):
-        """Load Pokemon data from PokeAPI with concurrent requests"""
-        scores = []
+        self.top = TopPokemonHeap(limit)
+        self.fetched = 0
+        self.failed = 0
+        # Seconds spent fetching each Pokemon (both sub-resources)
+        self.fetch_latencies = []
+        self.fetch_elapsed = 0.0
+        self.retries = 0
+        self.checkpoint = IngestCheckpoint(
+            options["checkpoint"] or settings.INGEST_CHECKPOINT_PATH
+        )
+        pokemon_ids = self.ids_to_fetch(resume, retry_failed)
+
+        started = time.monotonic()
+        self.checkpoint.open(resume=resume or retry_failed)
+        with self.checkpoint:
+            if options["use_async"]:
+                self.load_pokemons_async(pokemon_ids, concurrent, rate, burst, base_url)
+            else:
+                self.load_pokemons_sync(pokemon_ids, concurrent, rate, burst, base_url)
+
+        if not options["dry_run"]:
+            self.save_top_pokemons(self.top.top())
+        if self.failed:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{self.failed} Pokemon failed; re-run them with --retry-failed"
+                )
+            )
+
+        self.stdout.write(f"Total ingest time: {time.monotonic() - started:.2f}s")
+
+    def ids_to_fetch(self, resume: bool, retry_failed: bool) -> list:
+        """Pick the ids to fetch, seeding the top-N with checkpointed records"""
+        if not (resume or retry_failed):
+            return list(POKEMON_IDS)
 
-        # Create tasks for all Pokemon IDs (1-1025 available in PokeAPI)
-        pokemon_ids = list(range(1, 1026))
+        fetched, failed = self.checkpoint.load()
+        for pokemon_id, record in fetched.items():
+            self.top.push(pokemon_id, record)
 
+        if retry_failed and not resume:
+            pokemon_ids = sorted(failed)
+        else:
+            pokemon_ids = [
+                pokemon_id
+                for pokemon_id in POKEMON_IDS
+                if pokemon_id not in fetched
+                and (retry_failed or pokemon_id not in failed)
+            ]
+
+        self.stdout.write(
+            f"Checkpoint {self.checkpoint.path}: {len(fetched)} fetched, "
+            f"{len(failed)} failed, {len(pokemon_ids)} left to fetch"
+        )
+        return pokemon_ids
+
+    def record_result(self, pokemon_id: int, record: dict):
+        """Checkpoint a slim record and offer it to the top-N"""
+        self.checkpoint.record_success(pokemon_id, record)
+        self.fetched += 1
+        self.top.push(pokemon_id, record)
+        self.stdout.write(f"{record['name']} | score: {record['popularity_score']}")
+
+    def record_error(self, pokemon_id: int, error: Exception):
+        """Checkpoint a failure so it can be retried with --retry-failed"""
+        self.checkpoint.record_failure(pokemon_id, error)
+        self.failed += 1
+        self.stdout.write(f"Error with #{pokemon_id}: {error}")
+
+    def load_pokemons_sync(
+        self,
+        pokemon_ids: list,
+        concurrent: int,
+        rate: float = 10.0,
+        burst: int = 10,
+        base_url: str | None = None,
+    ):
+        """Load Pokemon data from PokeAPI with concurrent requests"""
         self.stdout.write(
-            f"Fetching data for 1025 Pokemon with {concurrent} concurrent requests..."
+            f"Fetching data for {len(pokemon_ids)} Pokemon with {concurrent} concurrent requests..."
         )
 
+        # One pooled connection per worker, one rate limit shared by all workers
+        configure_session_pool(concurrent)
+        limiter = TokenBucket(rate, burst)
+        started = time.monotonic()
+        retries_before = get_retry_count()
+
         # Use ThreadPoolExecutor for concurrent API requests
         with ThreadPoolExecutor(max_workers=concurrent) as executor:
             # Submit all tasks for concurrent processing
             future_to_id = {
-                executor.submit(self.fetch_pokemon_data_sync, pokemon_id): pokemon_id
+                executor.submit(
+                    self.fetch_pokemon_data_sync, pokemon_id, limiter, base_url
+                ): pokemon_id
                 for pokemon_id in pokemon_ids
             }
 
-            # Process completed tasks and collect scores
+            # Score each result as it completes and keep only the top-N
             for future in as_completed(future_to_id):
-                pokemon_id = future_to_id[future]
+                pokemon_id = future_to_id.pop(future)
                 try:
-                    result = future.result()
-                    if result:
-                        scores.append(result)
-                        self.stdout.write(
-                            f"{result['name']} | score: {result['_score']}"
-                        )
+                    self.record_result(pokemon_id, future.result())
                 except Exception as e:
-                    self.stdout.write(f"Error with #{pokemon_id}: {e}")
+                    self.record_error(pokemon_id, e)
+
+        self.report_fetch_time(time.monotonic() - started)
+        self.retries = get_retry_count() - retries_before
+        self.stdout.write(f"Retried requests: {self.retries}")
+
+    def load_pokemons_async(
+        self,
+        pokemon_ids: list,
+        concurrent: int,
+        rate: float = 10.0,
+        burst: int = 10,
+        base_url: str | None = None,
+    ):
+        """Load Pokemon data from PokeAPI with the asyncio client"""
+        self.stdout.write(
+            f"Fetching data for {len(pokemon_ids)} Pokemon with {concurrent} "
+            f"concurrent Pokemon (async, {rate:g} req/s, burst {burst})..."
+        )
+
+        def on_result(pokemon_id: int, pokemon_data: dict):
+            self.record_result(pokemon_id, slim_pokemon_record(pokemon_data))
+
+        async def fetch_all():
+            # Each Pokemon has its two sub-resources in flight at once
+            async with AsyncPokeAPIClient(
+                concurrency=concurrent * 2, rate=rate, burst=burst, base_url=base_url
+            ) as client:
+                await fetch_all_pokemon_data(
+                    client,
+                    pokemon_ids,
+                    concurrent,
+                    on_result,
+                    self.record_error,
+                    latencies=self.fetch_latencies,
+                )
+                return client.retries
 
-        # Sort by popularity score and select top Pokemon
-        scores.sort(reverse=True, key=lambda x: x["_score"])
-        top = scores[:limit]
+        started = time.monotonic()
+        self.retries = asyncio.run(fetch_all())
 
+        self.report_fetch_time(time.monotonic() - started)
+        self.stdout.write(f"Retried requests: {self.retries}")
+
+    def report_fetch_time(self, elapsed: float):
+        """Report how long fetching took and the resulting throughput"""
+        self.fetch_elapsed = elapsed
+        rate = self.fetched / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(
+            f"\nFetched {self.fetched} Pokemon in {elapsed:.2f}s ({rate:.1f} Pokemon/s)"
+        )
+
+    def save_top_pokemons(self, top: list):
+        """Save the top-N scored Pokemon, most popular first, to the database"""
         self.stdout.write(f"\nSaving top {len(top)} Pokemon to database...")
 
-        # Save top Pokemon to database with validation
         for rank, pokemon_data in enumerate(top, 1):
-            try:
-                serializer = PokemonDataSerializer(data=pokemon_data)
-                if serializer.is_valid():
-                    create_or_update_pokemon_from_raw(pokemon_data)
-                    self.stdout.write(f"{rank:3}. {pokemon_data['name']} saved.")
-                else:
-                    self.stdout.write(f"{rank:3}. Invalid data: {serializer.errors}")
-            except Exception as e:
-                self.stdout.write(f"{rank:3}. Error saving: {e}")
-
-        self.stdout.write(self.style.SUCCESS(f"\nDone. Saved top {len(top)} Pokémon."))
-
-    def fetch_pokemon_data_sync(self, pokemon_id: int):
-        """Fetch Pokemon data from PokeAPI with rate limiting"""
-        try:
-            # Add small delay to be respectful to the API
-            time.sleep(0.1)
-
-            # Get Pokemon data from PokeAPI
-            pokemon_data = get_full_pokemon_data(pokemon_id)
-
-            # Create structured data for better type safety
-            base_stats = extract_base_stats(pokemon_data.get("base_stats", {}))
-
-            pokemon_raw_data = PokemonRawData(
-                name=pokemon_data["name"],
-                types=pokemon_data["types"],
-                color=pokemon_data.get("color"),
-                habitat=pokemon_data.get("habitat"),
-                abilities=pokemon_data["abilities"],
-                flavor_text=pokemon_data.get("flavor_text"),
-                base_stats=base_stats,
-                image_url=pokemon_data.get("image_url"),
-                cries_url=pokemon_data.get("cries_url"),
-                game_indices=pokemon_data.get("game_indices", []),
-                held_items=pokemon_data.get("held_items", []),
-                moves=pokemon_data.get("moves", []),
-            )
+            self.stdout.write(f"{rank:3}. {pokemon_data['name']}")
 
-            # Calculate popularity score based on game indices, held items, and moves
-            score = estimate_popularity_score(pokemon_raw_data)
+        # Validate and save in a few chunked upserts instead of one query per row
+        result = bulk_upsert_pokemon(top)
+        for name, errors in result.invalid.items():
+            self.stdout.write(f"Invalid data for {name}: {'; '.join(errors)}")
 
-            # Add score to data for sorting
-            pokemon_data["_score"] = score
+        # Cached search responses of rows whose content changed are now stale
+        try:
+            delete_pokemons_from_cache(result.updated_names)
+        except RedisError as e:
+            self.stdout.write(self.style.WARNING(f"Cache invalidation failed: {e}"))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nDone. Saved top {len(top)} Pokémon: {result.inserted} inserted, "
+                f"{result.updated} updated, {result.unchanged} unchanged, "
+                f"{len(result.invalid)} invalid."
+            )
+        )
 
-            return pokemon_data
+    def fetch_pokemon_data_sync(
+        self,
+        pokemon_id: int,
+        limiter: TokenBucket | None = None,
+        base_url: str | None = None,
+    ):
+        """Fetch Pokemon data from PokeAPI with rate limiting"""
+        # Get Pokemon data from PokeAPI; the shared limiter paces requests.
+        # Errors propagate to the caller so they end up in the checkpoint.
+        started = time.monotonic()
+        pokemon_data = get_full_pokemon_data(pokemon_id, limiter, base_url)
+        self.fetch_latencies.append(time.monotonic() - started)
 
-        except Exception:
-            return None
+        # Score it and drop the bulky lists before the result is queued
+        return slim_pokemon_record(pokemon_data)
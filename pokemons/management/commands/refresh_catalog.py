@@ -0,0 +1,160 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from pokemons.cache import delete_pokemons_from_cache
+from pokemons.dataclasses import CatalogChangeset
+from pokemons.models import Pokemon
+from pokemons.pokeapi import (
+    PokemonAPIError,
+    configure_session_pool,
+    get_full_pokemon_data,
+)
+from pokemons.rate_limit import TokenBucket
+from pokemons.services import bulk_upsert_pokemon, slim_pokemon_record
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-fetch ingested catalog rows older than --max-age from PokeAPI, write "
+        "only the rows whose content hash changed and emit the resulting changeset"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Extra Pokémon names to refresh (added if not in the catalog yet)",
+        )
+        parser.add_argument(
+            "--max-age",
+            type=float,
+            default=settings.CATALOG_REFRESH_MAX_AGE_HOURS,
+            help="Refresh rows last fetched more than this many hours ago "
+            f"(default: {settings.CATALOG_REFRESH_MAX_AGE_HOURS})",
+        )
+        parser.add_argument(
+            "--concurrent",
+            type=int,
+            default=5,
+            help="Number of concurrent API requests (default: 5)",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=10.0,
+            help="Upstream requests per second (default: 10)",
+        )
+        parser.add_argument(
+            "--burst",
+            type=int,
+            default=10,
+            help="Requests allowed back-to-back before rate limiting (default: 10)",
+        )
+        parser.add_argument(
+            "--base-url",
+            default=None,
+            help="PokeAPI root URL, e.g. a local fake server",
+        )
+        parser.add_argument(
+            "--changeset",
+            default=None,
+            help="Write the changeset as JSON to this file",
+        )
+        parser.add_argument(
+            "--delete-removed",
+            action="store_true",
+            help="Delete rows PokeAPI no longer knows about (404) instead of "
+            "only reporting them",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        cutoff = timezone.now() - timedelta(hours=options["max_age"])
+
+        # Only ingested rows: those created through the API were never fetched
+        # (PokeAPI would answer 404) and are refreshed only when named
+        stale = list(
+            Pokemon.objects.filter(fetched_at__lt=cutoff).values_list("name", flat=True)
+        )
+        names = stale + [
+            name.lower() for name in options["names"] if name.lower() not in stale
+        ]
+        self.stdout.write(
+            f"Refreshing {len(stale)} stale and {len(names) - len(stale)} "
+            f"requested Pokemon..."
+        )
+
+        records, missing = self.fetch_records(
+            names,
+            options["concurrent"],
+            options["rate"],
+            options["burst"],
+            options["base_url"],
+        )
+        result = bulk_upsert_pokemon(records)
+        for name, errors in result.invalid.items():
+            self.stdout.write(f"Invalid data for {name}: {'; '.join(errors)}")
+
+        # Only catalog rows can be "removed"; unknown extra names are just errors
+        removed = [name for name in missing if name in stale]
+        if removed and options["delete_removed"]:
+            Pokemon.objects.filter(name__in=removed).delete()
+
+        changeset = CatalogChangeset(
+            added=result.inserted_names,
+            changed=result.updated_names,
+            removed=removed,
+        )
+        self.invalidate_cache(changeset)
+
+        if options["changeset"]:
+            with open(options["changeset"], "w", encoding="utf-8") as f:
+                json.dump(asdict(changeset), f, indent=2)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done in {time.monotonic() - started:.2f}s: "
+                f"{len(changeset.added)} added, {len(changeset.changed)} changed, "
+                f"{len(changeset.removed)} removed, {result.unchanged} unchanged."
+            )
+        )
+
+    def fetch_records(self, names, concurrent, rate, burst, base_url):
+        """Fetch slim records; returns (records, names PokeAPI answered 404 for)"""
+        configure_session_pool(concurrent)
+        limiter = TokenBucket(rate, burst)
+        records, missing = [], []
+
+        with ThreadPoolExecutor(max_workers=concurrent) as executor:
+            future_to_name = {
+                executor.submit(get_full_pokemon_data, name, limiter, base_url): name
+                for name in names
+            }
+            for future in as_completed(future_to_name):
+                name = future_to_name.pop(future)
+                try:
+                    records.append(slim_pokemon_record(future.result()))
+                except PokemonAPIError as e:
+                    if e.status_code == 404:
+                        missing.append(name)
+                    else:
+                        self.stdout.write(f"Error with {name}: {e}")
+                except Exception as e:
+                    self.stdout.write(f"Error with {name}: {e}")
+
+        return records, missing
+
+    def invalidate_cache(self, changeset: CatalogChangeset):
+        """Drop cached search responses for every row the refresh touched"""
+        try:
+            delete_pokemons_from_cache(changeset.changed + changeset.removed)
+        except RedisError as e:
+            self.stdout.write(self.style.WARNING(f"Cache invalidation failed: {e}"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pokemons", "0003_pokemon_cries_url_pokemon_image_url_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pokemon",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="pokemon",
+            name="fetched_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="pokemon",
+            index=models.Index(
+                fields=["fetched_at"], name="pokemons_po_fetched_412415_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pokemons", "0004_pokemon_content_hash_fetched_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pokemon",
+            index=models.Index(
+                fields=["-created_at", "id"], name="pokemon_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:54
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pokemons", "0006_pokemon_search_vector"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="pokemon",
+            name="pokemons_po_types_0df55f_idx",
+        ),
+        migrations.AddIndex(
+            model_name="pokemon",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["types"], name="pokemon_types_gin_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pokemon",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["abilities"], name="pokemon_abilities_gin_idx"
+            ),
+        ),
+    ]
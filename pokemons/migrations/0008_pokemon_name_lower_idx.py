@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:55
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pokemons", "0007_pokemon_array_gin_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="pokemon",
+            name="pokemons_po_name_1d3bf0_idx",
+        ),
+        migrations.AddIndex(
+            model_name="pokemon",
+            index=models.Index(
+                django.db.models.functions.text.Lower("name"),
+                name="pokemon_name_lower_idx",
+            ),
+        ),
+    ]
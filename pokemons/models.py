@@ -1,7 +1,28 @@
 import uuid
 
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Lower
+
+# Text search configurations of Pokemon.search_vector: names and the color and
+# habitat vocabularies are kept verbatim so prefixes of them match, prose is stemmed
+SEARCH_NAME_CONFIG = "simple"
+SEARCH_TEXT_CONFIG = "english"
+
+
+def normalize_pokemon_name(name) -> str:
+    """Canonical form of a Pokemon name, shared by cache keys and DB lookups"""
+    return str(name).strip().lower()
+
+
+class PokemonQuerySet(models.QuerySet):
+    def by_name(self, name):
+        """Case-insensitive name match, one probe of pokemon_name_lower_idx"""
+        return self.alias(name_lower=Lower("name")).filter(
+            name_lower=normalize_pokemon_name(name)
+        )
 
 
 class Pokemon(models.Model):
@@ -25,18 +46,45 @@ class Pokemon(models.Model):
     cries_url = models.URLField(null=True, blank=True)
     popularity_score = models.IntegerField(default=0)
 
+    # sha256 of the normalized record; lets refreshes skip unchanged rows
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    # Last time the row was checked against PokeAPI, changed or not
+    fetched_at = models.DateTimeField(null=True, blank=True)
+
+    # Weighted full-text document kept up to date by Postgres on every write
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config=SEARCH_NAME_CONFIG)
+            + SearchVector("flavor_text", weight="B", config=SEARCH_TEXT_CONFIG)
+            + SearchVector("color", "habitat", weight="C", config=SEARCH_NAME_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PokemonQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
         verbose_name = "Pokemon"
         verbose_name_plural = "Pokemons"
         indexes = [
-            models.Index(fields=["name"]),
-            models.Index(fields=["types"]),
+            # Exact-case lookups use the unique constraint's btree; this one
+            # serves by_name(), which compares LOWER(name)
+            models.Index(Lower("name"), name="pokemon_name_lower_idx"),
+            # Containment (@>) and overlap (&&) filters on the array columns
+            GinIndex(fields=["types"], name="pokemon_types_gin_idx"),
+            GinIndex(fields=["abilities"], name="pokemon_abilities_gin_idx"),
             models.Index(fields=["color"]),
             models.Index(fields=["habitat"]),
+            models.Index(fields=["fetched_at"]),
+            # Keyset pagination order of the list endpoint
+            models.Index(fields=["-created_at", "id"], name="pokemon_created_id_idx"),
+            # Serves ?search= on the list endpoint
+            GinIndex(fields=["search_vector"], name="pokemon_search_vector_idx"),
         ]
 
     def __str__(self):
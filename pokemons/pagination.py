@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PokemonCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (-created_at, id), backed by a composite index.
+
+    Each page is one indexed range scan whatever its depth, unlike offset
+    pagination, whose cost grows with the catalog.
+    """
+
+    ordering = ("-created_at", "id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
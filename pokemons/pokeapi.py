@@ -1,67 +1,329 @@
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 from tenacity import (
+    RetryCallState,
     retry,
-    retry_if_exception_type,
+    retry_if_exception,
     stop_after_attempt,
+    stop_before_delay,
     wait_exponential,
     wait_random,
 )
 
+from pokemons.http_cache import ResponseCache
+from pokemons.rate_limit import RedisTokenBucket, TokenBucket
+
+DEFAULT_POKEAPI_BASE_URL = "https://pokeapi.co/api/v2"
+
+USER_AGENT = "PokemonEcho/1.0 (contact@example.com)"
+
+# (connect_timeout, read_timeout)
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Statuses worth another attempt; other client errors will not change on retry
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+MAX_ATTEMPTS = 3
+# Longest a single call may spend retrying, waits included, in seconds
+RETRY_BUDGET = 15.0
+
 
 # Custom exception for PokeAPI-related errors
 class PokemonAPIError(Exception):
-    pass
+    def __init__(
+        self,
+        message: str = "",
+        status_code: int | None = None,
+        retryable: bool = False,
+        retry_after: float | None = None,
+    ):
+        super().__init__(message)
+        # Upstream HTTP status, when the failure was an HTTP error response
+        self.status_code = status_code
+        # Transient failure (network error, 429 or 5xx) that may succeed later
+        self.retryable = retryable
+        # Seconds upstream asked us to wait before retrying (429 / 503)
+        self.retry_after = retry_after
 
 
 # Create a shared session for connection reuse and global headers
 session = requests.Session()
 session.headers.update(
     {
-        "User-Agent": "PokemonEcho/1.0 (contact@example.com)",
+        "User-Agent": USER_AGENT,
         "Accept": "application/json",
     }
 )
 
 
-# Retry logic: exponential backoff + random jitter to avoid API overloading
+def configure_session_pool(pool_size: int) -> None:
+    """
+    Size the shared session's connection pool so that ``pool_size`` concurrent
+    callers each keep a persistent connection instead of reconnecting.
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+# On-disk response cache; built lazily from settings on first use
+response_cache: ResponseCache | None = None
+
+
+def configure_response_cache(
+    directory: str | None = None, offline: bool | None = None
+) -> ResponseCache | None:
+    """
+    (Re)configures the shared response cache. Arguments left as None fall back
+    to POKEAPI_CACHE_DIR / POKEAPI_OFFLINE; an empty directory disables caching.
+    """
+    global response_cache
+    if directory is None:
+        directory = getattr(settings, "POKEAPI_CACHE_DIR", "")
+    if offline is None:
+        offline = getattr(settings, "POKEAPI_OFFLINE", False)
+    response_cache = ResponseCache(directory, offline=offline) if directory else None
+    if offline and response_cache is None:
+        raise PokemonAPIError("Offline mode requires POKEAPI_CACHE_DIR to be set")
+    return response_cache
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Returns the shared response cache, configuring it from settings if needed"""
+    if response_cache is None:
+        return configure_response_cache()
+    return response_cache
+
+
+def get_base_url() -> str:
+    """PokeAPI root URL; overridable to point ingest at a local stand-in server"""
+    return getattr(settings, "POKEAPI_BASE_URL", DEFAULT_POKEAPI_BASE_URL).rstrip("/")
+
+
+def pokemon_urls(name: str | int, base_url: str | None = None) -> tuple[str, str]:
+    """Returns the /pokemon and /pokemon-species URLs for a name or id"""
+    base_url = (base_url or get_base_url()).rstrip("/")
+    key = str(name).lower()
+    return f"{base_url}/pokemon/{key}", f"{base_url}/pokemon-species/{key}"
+
+
+# Bump when an extractor's output changes so older cache entries are ignored
+EXTRACTOR_VERSION = 1
+
+
+def cache_key(url: str, extract: Callable[[dict], dict] | None = None) -> str:
+    """Response cache key: extracted fields are cached apart from raw bodies"""
+    if extract is None:
+        return url
+    return f"{url}#{extract.__name__}-v{EXTRACTOR_VERSION}"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a Retry-After header (delta-seconds or HTTP-date) into seconds.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# Cross-process limiter on every upstream request; built lazily from settings
+upstream_limiter: RedisTokenBucket | None = None
+_upstream_limiter_configured = False
+
+
+def configure_upstream_limiter(
+    rate: float | None = None, burst: int | None = None
+) -> RedisTokenBucket | None:
+    """
+    (Re)configures the limiter shared by every process calling PokeAPI.
+    Arguments left as None fall back to POKEAPI_RATE_LIMIT / POKEAPI_BURST;
+    a rate of 0 disables it.
+    """
+    global upstream_limiter, _upstream_limiter_configured
+    if rate is None:
+        rate = getattr(settings, "POKEAPI_RATE_LIMIT", 0)
+    if burst is None:
+        burst = getattr(settings, "POKEAPI_BURST", 1)
+    upstream_limiter = RedisTokenBucket(rate, burst) if rate else None
+    _upstream_limiter_configured = True
+    return upstream_limiter
+
+
+def get_upstream_limiter() -> RedisTokenBucket | None:
+    """Returns the shared upstream limiter, configuring it from settings if needed"""
+    if not _upstream_limiter_configured:
+        return configure_upstream_limiter()
+    return upstream_limiter
+
+
+# Upstream requests retried since start-up, across all threads
+_retry_count = 0
+_retry_count_lock = threading.Lock()
+
+
+def get_retry_count() -> int:
+    return _retry_count
+
+
+def _count_retry(retry_state: RetryCallState) -> None:
+    global _retry_count
+    with _retry_count_lock:
+        _retry_count += 1
+
+
+_backoff = wait_exponential(multiplier=1, min=1, max=10) + wait_random(0, 1.5)
+
+
+def _wait_for_retry(retry_state: RetryCallState) -> float:
+    """Waits as long as upstream asked (Retry-After), else backs off with jitter"""
+    retry_after = getattr(retry_state.outcome.exception(), "retry_after", None)
+    return retry_after if retry_after is not None else _backoff(retry_state)
+
+
+# Retry logic: only transient failures, honoring Retry-After, within a time
+# budget; a wait that would overrun the budget fails the call right away
 @retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=1, max=10) + wait_random(0, 1.5),
-    retry=retry_if_exception_type((requests.exceptions.RequestException, HTTPError)),
+    stop=stop_after_attempt(MAX_ATTEMPTS) | stop_before_delay(RETRY_BUDGET),
+    wait=_wait_for_retry,
+    retry=retry_if_exception(lambda e: getattr(e, "retryable", False)),
+    before_sleep=_count_retry,
+    reraise=True,
 )
-def _get_json(url: str) -> dict:
+def _get_json(
+    url: str,
+    limiter: TokenBucket | None = None,
+    extract: Callable[[dict], dict] | None = None,
+) -> dict:
     """
     Performs a GET request with retry, timeout, error handling, and JSON parsing.
+
+    Every request draws from ``limiter`` (if given) and from the shared
+    upstream limiter. With ``extract`` the parsed body is reduced right away
+    and only the extracted fields are returned and cached, so the full
+    payload is not kept past the parse or re-parsed from the cache.
     """
+    cache = get_response_cache()
+    key = cache_key(url, extract)
+    cached = cache.get(key) if cache is not None else None
+    if cache is not None and cache.offline:
+        if cached is None:
+            raise PokemonAPIError(f"Offline mode: {url} is not in the response cache")
+        return cached.payload
+
+    limiters = [each for each in (limiter, get_upstream_limiter()) if each is not None]
+    for each in limiters:
+        each.acquire()
     try:
         response = session.get(
-            url, timeout=(3.05, 10)
-        )  # (connect_timeout, read_timeout)
+            url,
+            timeout=REQUEST_TIMEOUT,
+            headers=cache.conditional_headers(cached) if cache is not None else None,
+        )
+        if cached is not None and response.status_code == 304:
+            # Unchanged upstream: no body was sent, serve the stored payload
+            return cached.payload
         response.raise_for_status()
-        return response.json()
-    except (requests.exceptions.RequestException, HTTPError) as e:
-        raise PokemonAPIError(f"PokeAPI request failed for {url}: {e}") from e
+        payload = response.json()
+    except HTTPError as e:
+        status_code = e.response.status_code
+        retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+        if status_code == 429 and retry_after:
+            # Upstream asked everyone to back off, not just this request
+            for each in limiters:
+                each.pause(retry_after)
+        raise PokemonAPIError(
+            f"PokeAPI request failed for {url}: {e}",
+            status_code=status_code,
+            retryable=status_code in RETRYABLE_STATUSES,
+            retry_after=retry_after,
+        ) from e
     except ValueError:
+        # Also covers requests' JSONDecodeError, itself a RequestException
         raise PokemonAPIError(f"Invalid JSON received from {url}")
+    except requests.exceptions.RequestException as e:
+        # Connection errors and timeouts
+        raise PokemonAPIError(
+            f"PokeAPI request failed for {url}: {e}", retryable=True
+        ) from e
+
+    if extract is not None:
+        payload = extract(payload)
+    if cache is not None:
+        cache.set(
+            key,
+            payload,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return payload
 
 
-def get_full_pokemon_data(name: str | int) -> dict:
+def get_full_pokemon_data(
+    name: str | int,
+    limiter: TokenBucket | None = None,
+    base_url: str | None = None,
+) -> dict:
     """
     Fetches and returns normalized Pokémon data from PokeAPI.
     """
-    poke_url = f"https://pokeapi.co/api/v2/pokemon/{str(name).lower()}"
-    species_url = f"https://pokeapi.co/api/v2/pokemon-species/{str(name).lower()}"
+    poke_url, species_url = pokemon_urls(name, base_url)
 
-    poke_response = _get_json(poke_url)
-    species_response = _get_json(species_url)
+    poke_fields = _get_json(poke_url, limiter, extract=extract_pokemon_fields)
+    species_fields = _get_json(species_url, limiter, extract=extract_species_fields)
 
-    # Normalize stats
-    base_stats = {
-        stat["stat"]["name"].replace("-", "_"): stat["base_stat"]
-        for stat in poke_response.get("stats", [])
+    return normalize_pokemon_data(poke_fields, species_fields)
+
+
+def extract_pokemon_fields(poke_response: dict) -> dict:
+    """
+    Keeps only what the catalog uses from a /pokemon payload.
+
+    The payload is dominated by ``moves`` (hundreds of entries with nested
+    version-group details) but popularity only needs list lengths, so the
+    lists are reduced to counts and the rest of the tree can be freed at once.
+    The body is still parsed whole by ``response.json()``, so the peak memory
+    of the parse is unchanged; a streaming parser (ijson) measured slower
+    than json.loads on these bodies.
+    """
+    return {
+        "name": poke_response["name"],
+        "types": [t["type"]["name"] for t in poke_response.get("types", [])],
+        "abilities": [a["ability"]["name"] for a in poke_response.get("abilities", [])],
+        "stats": {
+            stat["stat"]["name"].replace("-", "_"): stat["base_stat"]
+            for stat in poke_response.get("stats", [])
+        },
+        "image_url": (poke_response.get("sprites") or {}).get("front_default"),
+        "cries_url": (poke_response.get("cries") or {}).get("latest"),
+        # used for popularity calculation
+        "game_indices_count": len(poke_response.get("game_indices") or []),
+        "held_items_count": len(poke_response.get("held_items") or []),
+        "moves_count": len(poke_response.get("moves") or []),
     }
 
+
+def extract_species_fields(species_response: dict) -> dict:
+    """
+    Keeps only what the catalog uses from a /pokemon-species payload.
+    """
     # Get first English flavor text
     flavor_text = next(
         (
@@ -71,14 +333,26 @@ def get_full_pokemon_data(name: str | int) -> dict:
         ),
         "No flavor text",
     )
-
     return {
-        "name": poke_response["name"],
-        "types": [t["type"]["name"] for t in poke_response.get("types", [])],
-        "color": species_response.get("color", {}).get("name", "unknown"),
-        "habitat": species_response.get("habitat", {}).get("name", "unknown"),
-        "abilities": [a["ability"]["name"] for a in poke_response.get("abilities", [])],
+        "color": (species_response.get("color") or {}).get("name", "unknown"),
+        "habitat": (species_response.get("habitat") or {}).get("name", "unknown"),
         "flavor_text": flavor_text,
+    }
+
+
+def normalize_pokemon_data(poke_fields: dict, species_fields: dict) -> dict:
+    """
+    Builds the normalized Pokémon record from the fields extracted out of
+    the /pokemon and /pokemon-species payloads.
+    """
+    base_stats = poke_fields["stats"]
+    return {
+        "name": poke_fields["name"],
+        "types": poke_fields["types"],
+        "color": species_fields["color"],
+        "habitat": species_fields["habitat"],
+        "abilities": poke_fields["abilities"],
+        "flavor_text": species_fields["flavor_text"],
         "base_stats": {
             "hp": base_stats.get("hp", 0),
             "attack": base_stats.get("attack", 0),
@@ -87,10 +361,9 @@ def get_full_pokemon_data(name: str | int) -> dict:
             "special_defense": base_stats.get("special_defense", 0),
             "speed": base_stats.get("speed", 0),
         },
-        # used for popularity calculation
-        "held_items": poke_response.get("held_items", []),
-        "moves": poke_response.get("moves", []),
-        "game_indices": poke_response.get("game_indices", []),
-        "image_url": poke_response.get("sprites", {}).get("front_default"),
-        "cries_url": poke_response.get("cries", {}).get("latest"),
+        "game_indices_count": poke_fields["game_indices_count"],
+        "held_items_count": poke_fields["held_items_count"],
+        "moves_count": poke_fields["moves_count"],
+        "image_url": poke_fields["image_url"],
+        "cries_url": poke_fields["cries_url"],
     }
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import threading
+import time
+
+from redis.exceptions import RedisError
+
+from pokemons.cache import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared by threads and coroutines.
+
+    Tokens refill at ``rate`` per second up to ``burst``. Callers reserve a
+    token under the lock and sleep outside of it, so waiting callers are served
+    in arrival order without holding the lock.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve one token and return how long the caller has to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds`` (e.g. after a Retry-After)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self) -> None:
+        """Block the current thread until a token is available"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Suspend the current coroutine until a token is available"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# Reserve one token in the shared bucket and return the wait in seconds.
+# Uses the Redis clock so every process agrees on time.
+# KEYS: bucket hash, pause key; ARGV: rate, burst
+RESERVE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 60)
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+local paused_until = tonumber(redis.call('GET', KEYS[2]) or '0')
+return tostring(math.max(wait, paused_until - now))
+"""
+
+# Push the shared pause deadline out to now + ARGV[1] seconds (never pull it in)
+PAUSE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local paused_until = now + tonumber(ARGV[1])
+if paused_until > tonumber(redis.call('GET', KEYS[1]) or '0') then
+    redis.call('SET', KEYS[1], tostring(paused_until),
+               'PX', math.ceil(tonumber(ARGV[1]) * 1000) + 1000)
+end
+return 1
+"""
+
+
+# After a Redis failure, limit locally for this long before trying Redis again
+REDIS_RETRY_INTERVAL = 30.0
+
+
+class RedisTokenBucket:
+    """
+    Token bucket kept in Redis, so every process sharing ``name`` draws from
+    one budget: web workers and ingest runs together stay under ``rate``.
+
+    Same interface as ``TokenBucket``. If Redis is unreachable, callers fall
+    back to a process-local bucket with the same settings instead of failing.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, name: str = "upstream"):
+        self.rate = float(rate)
+        self.burst = burst
+        self.key = f"ratelimit:{name}"
+        self.pause_key = f"ratelimit:{name}:paused"
+        # Validates rate and burst, and serves callers while Redis is down
+        self.fallback = TokenBucket(rate, burst)
+        self._redis = None
+        self._reserve_script = None
+        self._pause_script = None
+        self._unavailable_until = 0.0
+
+    def _connect(self):
+        if time.monotonic() < self._unavailable_until:
+            # Redis failed recently; don't make every caller wait on it again
+            return None
+        if self._redis is None:
+            self._redis = get_redis_connection()
+            if self._redis is not None:
+                self._reserve_script = self._redis.register_script(RESERVE_SCRIPT)
+                self._pause_script = self._redis.register_script(PAUSE_SCRIPT)
+        return self._redis
+
+    def _reserve(self) -> float:
+        try:
+            if self._connect() is not None:
+                return float(
+                    self._reserve_script(
+                        keys=[self.key, self.pause_key], args=[self.rate, self.burst]
+                    )
+                )
+        except RedisError as e:
+            logger.warning(f"Shared rate limit unavailable, limiting locally: {e}")
+            self._unavailable_until = time.monotonic() + REDIS_RETRY_INTERVAL
+        return self.fallback._reserve()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller in every process for ``seconds``"""
+        self.fallback.pause(seconds)
+        try:
+            if self._connect() is not None:
+                self._pause_script(keys=[self.pause_key], args=[seconds])
+        except RedisError as e:
+            logger.warning(f"Could not share rate limit pause: {e}")
+            self._unavailable_until = time.monotonic() + REDIS_RETRY_INTERVAL
+
+    def acquire(self) -> None:
+        """Block the current thread until a shared token is available"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Suspend the current coroutine until a shared token is available"""
+        # The Redis round trip is blocking; keep it off the event loop
+        wait = await asyncio.to_thread(self._reserve)
+        if wait > 0:
+            await asyncio.sleep(wait)
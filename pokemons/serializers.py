@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 
 from pokemons.models import Pokemon
@@ -27,9 +28,43 @@ class PokemonDataSerializer(serializers.Serializer):
     popularity_score = serializers.IntegerField(required=False, default=0)
 
 
+# Model columns each computed output field is built from
+SOURCE_COLUMNS = {
+    "base_stats": [
+        "hp",
+        "attack",
+        "defense",
+        "special_attack",
+        "special_defense",
+        "speed",
+    ],
+}
+
+
 class PokemonModelSerializer(serializers.ModelSerializer):
     base_stats = serializers.SerializerMethodField()
 
+    def __init__(self, *args, fields=None, **kwargs):
+        """Optionally restricts the output to a sparse fieldset (``fields``)"""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def output_fields(cls) -> list:
+        """Fields a client can ask for in a sparse fieldset"""
+        flat_stats = SOURCE_COLUMNS["base_stats"]
+        return [name for name in cls.Meta.fields if name not in flat_stats]
+
+    @classmethod
+    def columns_for(cls, fields) -> list:
+        """Model columns needed to render the given output fields"""
+        columns = []
+        for name in fields:
+            columns.extend(SOURCE_COLUMNS.get(name, [name]))
+        return columns
+
     class Meta:
         model = Pokemon
         fields = [
@@ -88,3 +123,64 @@ class PokemonModelSerializer(serializers.ModelSerializer):
         ]:
             data.pop(field, None)
         return data
+
+
+# Output fields of the read path, in the order PokemonModelSerializer emits them
+REPRESENTATION_FIELDS = PokemonModelSerializer.output_fields()
+
+# Fields needing more than a plain column copy; ``get`` reads one column
+_FIELD_BUILDERS = {
+    "id": lambda get, tz: str(get("id")),
+    "base_stats": lambda get, tz: {
+        stat: get(stat) for stat in SOURCE_COLUMNS["base_stats"]
+    },
+    "created_at": lambda get, tz: _format_datetime(get("created_at"), tz),
+}
+
+
+def _format_datetime(value, tz):
+    """ISO 8601 in the given timezone, as DRF's DateTimeField renders by default"""
+    if not value:
+        return None
+    if timezone.is_aware(value):
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def pokemon_representation(pokemon: Pokemon | dict, fields=None, tz=None) -> dict:
+    """
+    Read-only fast path producing the same dict as
+    ``PokemonModelSerializer(pokemon, fields=fields).data``.
+
+    Accepts a model instance or a ``.values()`` row with the columns the
+    requested fields need (see ``PokemonModelSerializer.columns_for``), and
+    skips DRF's per-field machinery. Writes keep using the serializer.
+    """
+    if tz is None:
+        tz = timezone.get_current_timezone()
+    if isinstance(pokemon, dict):
+        get = pokemon.__getitem__
+    else:
+
+        def get(column):
+            return getattr(pokemon, column)
+
+    names = (
+        REPRESENTATION_FIELDS
+        if fields is None
+        else [name for name in REPRESENTATION_FIELDS if name in fields]
+    )
+    data = {}
+    for name in names:
+        builder = _FIELD_BUILDERS.get(name)
+        data[name] = builder(get, tz) if builder is not None else get(name)
+    return data
+
+
+def pokemon_representations(pokemons, fields=None) -> list:
+    """``pokemon_representation`` for many rows, resolving the timezone once"""
+    tz = timezone.get_current_timezone()
+    return [pokemon_representation(pokemon, fields, tz) for pokemon in pokemons]
@@ -1,6 +1,39 @@
+import hashlib
+import heapq
+import json
+from typing import Iterable, List, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from pokemons.cache import bump_catalog_version
 from pokemons.models import Pokemon
 
-from .dataclasses import PokemonRawData, PokemonStats
+from .dataclasses import BulkUpsertResult, PokemonRawData, PokemonStats
+
+STAT_FIELDS = [
+    "hp",
+    "attack",
+    "defense",
+    "special_attack",
+    "special_defense",
+    "speed",
+]
+
+# Columns rewritten when an ingested Pokemon already exists (matched by name)
+UPSERT_FIELDS = [
+    "types",
+    "color",
+    "habitat",
+    "abilities",
+    "flavor_text",
+    *STAT_FIELDS,
+    "image_url",
+    "cries_url",
+    "popularity_score",
+]
+
+BULK_UPSERT_CHUNK_SIZE = 500
 
 
 def extract_base_stats(stats_dict: dict) -> PokemonStats:
@@ -18,49 +51,236 @@ def extract_base_stats(stats_dict: dict) -> PokemonStats:
 def estimate_popularity_score(poke_data: PokemonRawData) -> int:
     """Calculate popularity score based on Pokemon data from PokeAPI"""
     score = 0
-    score += len(poke_data.game_indices)
-    score += len(poke_data.held_items)
-    score += len(poke_data.moves) // 10
+    score += poke_data.game_indices_count
+    score += poke_data.held_items_count
+    score += poke_data.moves_count // 10
     return score
 
 
-def create_or_update_pokemon_from_raw(raw_data: dict) -> Pokemon:
-    """Create or update Pokemon from raw PokeAPI data"""
-    # Create structured data for better type safety
-    base_stats = extract_base_stats(raw_data.get("base_stats", {}))
+def pokemon_content_hash(name: str, fields: dict) -> str:
+    """Stable sha256 over a Pokemon's name and upserted columns"""
+    content = {"name": name, **{field: fields.get(field) for field in UPSERT_FIELDS}}
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
 
-    pokemon_data = PokemonRawData(
+def pokemon_raw_data_from_dict(raw_data: dict) -> PokemonRawData:
+    """Build structured PokemonRawData from a normalized PokeAPI dictionary"""
+    return PokemonRawData(
         name=raw_data["name"],
         types=raw_data["types"],
         color=raw_data.get("color"),
         habitat=raw_data.get("habitat"),
         abilities=raw_data["abilities"],
         flavor_text=raw_data.get("flavor_text"),
-        base_stats=base_stats,
+        base_stats=extract_base_stats(raw_data.get("base_stats", {})),
         image_url=raw_data.get("image_url"),
         cries_url=raw_data.get("cries_url"),
-        game_indices=raw_data.get("game_indices", []),
-        held_items=raw_data.get("held_items", []),
-        moves=raw_data.get("moves", []),
+        game_indices_count=raw_data.get("game_indices_count", 0),
+        held_items_count=raw_data.get("held_items_count", 0),
+        moves_count=raw_data.get("moves_count", 0),
+    )
+
+
+def pokemon_fields_from_raw(raw_data: dict) -> dict:
+    """Map raw PokeAPI data onto Pokemon model columns (excluding name)"""
+    pokemon_data = pokemon_raw_data_from_dict(raw_data)
+    return {
+        "types": pokemon_data.types,
+        "color": pokemon_data.color,
+        "habitat": pokemon_data.habitat,
+        "abilities": pokemon_data.abilities,
+        "flavor_text": pokemon_data.flavor_text,
+        "hp": pokemon_data.base_stats.hp,
+        "attack": pokemon_data.base_stats.attack,
+        "defense": pokemon_data.base_stats.defense,
+        "special_attack": pokemon_data.base_stats.special_attack,
+        "special_defense": pokemon_data.base_stats.special_defense,
+        "speed": pokemon_data.base_stats.speed,
+        "image_url": pokemon_data.image_url,
+        "cries_url": pokemon_data.cries_url,
+        "popularity_score": (
+            raw_data["popularity_score"]
+            if "popularity_score" in raw_data
+            else estimate_popularity_score(pokemon_data)
+        ),
+    }
+
+
+# Counts fetched from PokeAPI only to feed estimate_popularity_score
+POPULARITY_COUNT_FIELDS = ("game_indices_count", "held_items_count", "moves_count")
+
+
+def slim_pokemon_record(raw_data: dict) -> dict:
+    """
+    Score raw PokeAPI data and drop the counts only the score needs,
+    so ingest keeps just the catalog columns per Pokemon.
+    """
+    slim = {
+        key: value
+        for key, value in raw_data.items()
+        if key not in POPULARITY_COUNT_FIELDS
+    }
+    slim["popularity_score"] = estimate_popularity_score(
+        pokemon_raw_data_from_dict(raw_data)
     )
+    return slim
+
+
+class TopPokemonHeap:
+    """Keeps the ``limit`` most popular slim records seen so far in a min-heap"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        # (score, -pokemon_id, record): the root is the weakest record kept;
+        # on equal scores the lower Pokemon id wins, independent of arrival order
+        self._heap: List[Tuple[int, int, dict]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, pokemon_id: int, record: dict) -> bool:
+        """Offer a record; returns True if it is currently among the top"""
+        if self.limit <= 0:
+            return False
+        entry = (record["popularity_score"], -pokemon_id, record)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
 
+    def top(self) -> List[dict]:
+        """Records kept, most popular first"""
+        return [
+            record
+            for _, _, record in sorted(
+                self._heap, key=lambda entry: entry[:2], reverse=True
+            )
+        ]
+
+
+def create_or_update_pokemon_from_raw(raw_data: dict) -> Pokemon:
+    """Create or update Pokemon from raw PokeAPI data"""
     pokemon, _ = Pokemon.objects.update_or_create(
-        name=pokemon_data.name,
-        defaults={
-            "types": pokemon_data.types,
-            "color": pokemon_data.color,
-            "habitat": pokemon_data.habitat,
-            "abilities": pokemon_data.abilities,
-            "flavor_text": pokemon_data.flavor_text,
-            "hp": pokemon_data.base_stats.hp,
-            "attack": pokemon_data.base_stats.attack,
-            "defense": pokemon_data.base_stats.defense,
-            "special_attack": pokemon_data.base_stats.special_attack,
-            "special_defense": pokemon_data.base_stats.special_defense,
-            "speed": pokemon_data.base_stats.speed,
-            "image_url": pokemon_data.image_url,
-            "cries_url": pokemon_data.cries_url,
-            "popularity_score": estimate_popularity_score(pokemon_data),
-        },
+        name=raw_data["name"],
+        defaults=pokemon_fields_from_raw(raw_data),
     )
     return pokemon
+
+
+def _is_str_list(value, max_length: int) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(item, str) and len(item) <= max_length for item in value
+    )
+
+
+def _is_optional_str(value, max_length: int | None = None) -> bool:
+    if value is None:
+        return True
+    return isinstance(value, str) and (max_length is None or len(value) <= max_length)
+
+
+def validate_pokemon_record(raw_data: dict) -> List[str]:
+    """
+    Lightweight schema check for raw PokeAPI data before bulk persistence.
+    Mirrors PokemonDataSerializer and the model column limits; returns a list
+    of problems, empty when the record is valid.
+    """
+    errors = []
+    name = raw_data.get("name")
+    if not isinstance(name, str) or not name or len(name) > 100:
+        errors.append("name: must be a non-empty string of at most 100 characters")
+    if not _is_str_list(raw_data.get("types"), 50):
+        errors.append("types: must be a list of strings")
+    if not _is_str_list(raw_data.get("abilities"), 100):
+        errors.append("abilities: must be a list of strings")
+    for field in ("color", "habitat"):
+        if not _is_optional_str(raw_data.get(field), 50):
+            errors.append(f"{field}: must be a string of at most 50 characters")
+    if not _is_optional_str(raw_data.get("flavor_text")):
+        errors.append("flavor_text: must be a string")
+    for field in ("image_url", "cries_url"):
+        if not _is_optional_str(raw_data.get(field), 200):
+            errors.append(f"{field}: must be a URL of at most 200 characters")
+    base_stats = raw_data.get("base_stats")
+    if not isinstance(base_stats, dict) or not all(
+        isinstance(base_stats.get(stat, 0), int) for stat in STAT_FIELDS
+    ):
+        errors.append("base_stats: must map stat names to integers")
+    return errors
+
+
+def bulk_upsert_pokemon(
+    records: Iterable[dict], chunk_size: int = BULK_UPSERT_CHUNK_SIZE
+) -> BulkUpsertResult:
+    """
+    Validate and persist many raw Pokemon records in a handful of statements.
+
+    Each chunk runs in one transaction: a single SELECT reads the stored content
+    hashes, rows whose hash is unchanged only get their fetched_at bumped (one
+    UPDATE that leaves updated_at alone), and everything else goes through one
+    INSERT ... ON CONFLICT (name) DO UPDATE.
+    """
+    result = BulkUpsertResult()
+    now = timezone.now()
+
+    # Deduplicate by name (last record wins); Postgres rejects an upsert
+    # that touches the same row twice in one statement
+    rows = {}
+    for raw_data in records:
+        errors = validate_pokemon_record(raw_data)
+        if errors:
+            result.invalid[str(raw_data.get("name"))] = errors
+            continue
+        rows[raw_data["name"]] = pokemon_fields_from_raw(raw_data)
+
+    names = list(rows)
+    for start in range(0, len(names), chunk_size):
+        chunk = names[start : start + chunk_size]
+        with transaction.atomic():
+            existing = dict(
+                Pokemon.objects.filter(name__in=chunk).values_list(
+                    "name", "content_hash"
+                )
+            )
+            to_write = []
+            unchanged = []
+            for name in chunk:
+                fields = rows[name]
+                content_hash = pokemon_content_hash(name, fields)
+                if name not in existing:
+                    result.inserted_names.append(name)
+                elif existing[name] == content_hash:
+                    unchanged.append(name)
+                    continue
+                else:
+                    result.updated_names.append(name)
+                to_write.append(
+                    Pokemon(
+                        name=name,
+                        content_hash=content_hash,
+                        fetched_at=now,
+                        **fields,
+                    )
+                )
+
+            if to_write:
+                Pokemon.objects.bulk_create(
+                    to_write,
+                    update_conflicts=True,
+                    unique_fields=["name"],
+                    update_fields=UPSERT_FIELDS
+                    + ["content_hash", "fetched_at", "updated_at"],
+                )
+            if unchanged:
+                Pokemon.objects.filter(name__in=unchanged).update(fetched_at=now)
+                result.unchanged_names.extend(unchanged)
+
+    # bulk_create sends no signals; fetched_at-only updates don't change responses
+    if result.inserted_names or result.updated_names:
+        transaction.on_commit(bump_catalog_version)
+    return result
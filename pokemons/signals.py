@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pokemons.cache import bump_catalog_version
+from pokemons.models import Pokemon
+
+
+@receiver(post_save, sender=Pokemon)
+@receiver(post_delete, sender=Pokemon)
+def catalog_changed(sender, **kwargs):
+    """Row-level writes change the catalog; bulk writes bump it themselves"""
+    # After commit, so clients never see the new ETag with the old rows
+    transaction.on_commit(bump_catalog_version)
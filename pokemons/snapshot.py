@@ -0,0 +1,125 @@
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Iterator
+
+from django.db import transaction
+
+from pokemons.cache import bump_catalog_version
+from pokemons.models import Pokemon
+from pokemons.services import UPSERT_FIELDS, pokemon_content_hash
+
+SNAPSHOT_FORMAT = "pokesoul-catalog"
+SNAPSHOT_VERSION = 1
+
+# Timestamps are left out so the same catalog always produces the same bytes
+SNAPSHOT_FIELDS = ["id", "name", *UPSERT_FIELDS]
+
+SNAPSHOT_CHUNK_SIZE = 1000
+
+
+class SnapshotError(Exception):
+    """Raised when a catalog snapshot is missing, malformed or incompatible"""
+
+
+def write_snapshot(path: str | Path, chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> int:
+    """
+    Streams the Pokemon table into a gzip-compressed JSON-lines snapshot.
+
+    The first line is a header with the format, version and field order; every
+    following line is one row as a JSON array in that order. Rows are ordered
+    by name and the gzip header carries no timestamp, so the output is
+    byte-for-byte deterministic and usable as a benchmark fixture.
+    Returns the number of rows written.
+    """
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "fields": SNAPSHOT_FIELDS,
+    }
+    rows = (
+        Pokemon.objects.order_by("name")
+        .values_list(*SNAPSHOT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    count = 0
+    with (
+        open(path, "wb") as raw,
+        gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as compressed,
+        io.TextIOWrapper(compressed, encoding="utf-8") as f,
+    ):
+        f.write(json.dumps(header) + "\n")
+        for row in rows:
+            f.write(json.dumps(row, default=str, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def read_snapshot(path: str | Path) -> Iterator[dict]:
+    """Yields the rows of a snapshot as dictionaries of model field values"""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                raise SnapshotError(f"{path} has no snapshot header")
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise SnapshotError(f"{path} is not a {SNAPSHOT_FORMAT} snapshot")
+            if header.get("version") != SNAPSHOT_VERSION:
+                raise SnapshotError(
+                    f"Unsupported snapshot version {header.get('version')} "
+                    f"(expected {SNAPSHOT_VERSION})"
+                )
+            fields = header["fields"]
+            unknown = set(fields) - set(SNAPSHOT_FIELDS)
+            if unknown:
+                raise SnapshotError(f"Unknown snapshot fields: {sorted(unknown)}")
+            for line_number, line in enumerate(f, 2):
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise SnapshotError(
+                        f"{path} line {line_number} is not valid JSON: {e}"
+                    ) from e
+                if not isinstance(row, list) or len(row) != len(fields):
+                    raise SnapshotError(
+                        f"{path} line {line_number} does not have the "
+                        f"{len(fields)} fields of the header"
+                    )
+                yield dict(zip(fields, row))
+    except (OSError, EOFError) as e:
+        raise SnapshotError(f"Could not read snapshot {path}: {e}") from e
+
+
+def import_snapshot(path: str | Path, chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> int:
+    """
+    Loads a snapshot into the Pokemon table with chunked bulk upserts.
+
+    The whole import runs in one transaction; rows are matched by name so an
+    existing catalog is updated in place. Returns the number of rows imported.
+    """
+    count = 0
+    with transaction.atomic():
+        chunk = []
+        for row in read_snapshot(path):
+            row["content_hash"] = pokemon_content_hash(row["name"], row)
+            chunk.append(Pokemon(**row))
+            if len(chunk) >= chunk_size:
+                count += _upsert_chunk(chunk)
+                chunk = []
+        if chunk:
+            count += _upsert_chunk(chunk)
+        transaction.on_commit(bump_catalog_version)
+    return count
+
+
+def _upsert_chunk(chunk: list) -> int:
+    Pokemon.objects.bulk_create(
+        chunk,
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=UPSERT_FIELDS + ["content_hash", "updated_at"],
+    )
+    return len(chunk)
@@ -1,9 +1,18 @@
+import os
+
 import pytest
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from pokemons.cache import delete_pokemon_from_cache
+from pokemons.fake_pokeapi import running_fake_pokeapi
+from pokemons.http_cache import ResponseCache
 from pokemons.models import Pokemon
-from pokemons.serializers import PokemonModelSerializer
+from pokemons.serializers import (
+    PokemonModelSerializer,
+    pokemon_representation,
+    pokemon_representations,
+)
 
 
 @pytest.fixture
@@ -63,6 +72,69 @@ def test_match_existing_pokemon_in_db(api_client):
     assert response.data["base_stats"]["attack"] == 49
 
 
+@pytest.mark.django_db
+def test_match_normalizes_the_name_for_db_and_cache(
+    api_client, django_assert_num_queries
+):
+    """Test any spelling of a name hits one LOWER(name) lookup, then one cache key"""
+    make_pokemon("Pikachu")
+    delete_pokemon_from_cache("pikachu")
+    url = reverse("pokemon-search")
+
+    with django_assert_num_queries(1) as captured:
+        response = api_client.post(url, {"name": " pikachu "}, format="json")
+    assert response.status_code == 200
+    assert response.data["name"] == "Pikachu"
+    assert 'LOWER("pokemons_pokemon"."name")' in captured.captured_queries[0]["sql"]
+
+    with django_assert_num_queries(0):
+        response = api_client.post(url, {"name": "PIKACHU"}, format="json")
+    assert response.data["name"] == "Pikachu"
+
+
+@pytest.mark.django_db
+def test_match_fetches_and_stores_a_pokeapi_miss(
+    api_client, settings, monkeypatch, tmp_path
+):
+    """Test a cache and DB miss goes through the async PokeAPI client"""
+    monkeypatch.setattr("pokemons.pokeapi.response_cache", ResponseCache(tmp_path))
+    delete_pokemon_from_cache("pokemon-25")
+    url = reverse("pokemon-search")
+
+    with running_fake_pokeapi() as base_url:
+        settings.POKEAPI_BASE_URL = base_url
+        response = api_client.post(url, {"name": "Pokemon-25"}, format="json")
+
+    assert response.status_code == 200
+    assert response.data["name"] == "pokemon-25"
+    assert Pokemon.objects.by_name("pokemon-25").exists()
+
+
+@pytest.mark.django_db
+def test_search_misses_do_not_leak_connections(
+    api_client, settings, monkeypatch, tmp_path
+):
+    """Test every WSGI request closes its event loop's Redis and httpx clients"""
+    monkeypatch.setattr("pokemons.pokeapi.response_cache", ResponseCache(tmp_path))
+    url = reverse("pokemon-search")
+
+    def open_fds_after_searches(ids):
+        for i in ids:
+            delete_pokemon_from_cache(f"pokemon-{i}")
+            response = api_client.post(url, {"name": f"pokemon-{i}"}, format="json")
+            assert response.status_code == 200
+        return len(os.listdir("/proc/self/fd"))
+
+    with running_fake_pokeapi() as base_url:
+        settings.POKEAPI_BASE_URL = base_url
+        before = open_fds_after_searches(range(30, 32))
+        after = open_fds_after_searches(range(32, 52))
+
+    assert after <= before + 2
+    for i in range(30, 52):
+        delete_pokemon_from_cache(f"pokemon-{i}")
+
+
 @pytest.mark.django_db
 def test_match_invalid_pokemon(api_client):
     """Test Pokemon search API with non-existent Pokemon name"""
@@ -103,7 +175,7 @@ def test_list_pokemons(api_client):
     url = reverse("pokemon-list")
     response = api_client.get(url)
     assert response.status_code == 200
-    pokemon_data = next(p for p in response.data if p["name"] == "pikachu")
+    pokemon_data = next(p for p in response.data["results"] if p["name"] == "pikachu")
     assert pokemon_data["name"] == "pikachu"
     # Check the new base_stats structure
     assert "base_stats" in pokemon_data
@@ -191,3 +263,236 @@ def test_create_pokemon_with_flat_stats(api_client):
     pokemon = Pokemon.objects.get(name="mewtwo")
     assert pokemon.hp == 106
     assert pokemon.special_attack == 154
+
+
+def make_pokemon(name: str, **overrides) -> Pokemon:
+    data = {
+        "name": name,
+        "types": ["electric"],
+        "abilities": ["static"],
+        "flavor_text": "Electric mouse.",
+        "image_url": f"https://img.test/{name}.png",
+        "hp": 35,
+        "attack": 55,
+        "defense": 40,
+        "special_attack": 50,
+        "special_defense": 50,
+        "speed": 90,
+    }
+    data.update(overrides)
+    return Pokemon.objects.create(**data)
+
+
+@pytest.mark.django_db
+def test_list_pokemons_pages_with_a_cursor(api_client):
+    """Test keyset pagination walks the catalog newest first without gaps"""
+    for i in range(5):
+        make_pokemon(f"mon{i}")
+    url = reverse("pokemon-list")
+
+    names = []
+    response = api_client.get(url, {"page_size": 2})
+    while True:
+        assert response.status_code == 200
+        names += [p["name"] for p in response.data["results"]]
+        if not response.data["next"]:
+            break
+        response = api_client.get(response.data["next"])
+
+    assert names == ["mon4", "mon3", "mon2", "mon1", "mon0"]
+
+
+@pytest.mark.django_db
+def test_list_pokemons_with_sparse_fieldset(api_client, django_assert_max_num_queries):
+    """Test fields= narrows both the SELECT and the payload"""
+    make_pokemon("pikachu")
+    url = reverse("pokemon-list")
+
+    with django_assert_max_num_queries(1) as captured:
+        response = api_client.get(url, {"fields": "name,types,image_url"})
+
+    assert response.status_code == 200
+    assert response.data["results"] == [
+        {
+            "name": "pikachu",
+            "types": ["electric"],
+            "image_url": "https://img.test/pikachu.png",
+        }
+    ]
+    sql = captured.captured_queries[0]["sql"]
+    assert "flavor_text" not in sql
+    assert "image_url" in sql
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset_expands_base_stats(api_client):
+    """Test base_stats pulls its six stat columns when asked for"""
+    pokemon = make_pokemon("pikachu")
+    url = reverse("pokemon-detail", args=[pokemon.id])
+
+    response = api_client.get(url, {"fields": "name,base_stats"})
+
+    assert response.status_code == 200
+    assert set(response.data) == {"name", "base_stats"}
+    assert response.data["base_stats"]["speed"] == 90
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset_rejects_unknown_fields(api_client):
+    response = api_client.get(reverse("pokemon-list"), {"fields": "name,password"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_search_ranks_matches_best_first(api_client):
+    """Test ?search= hits name prefixes, colors and flavor text, ranked"""
+    make_pokemon("pikachu")
+    make_pokemon("raichu", flavor_text="Evolves when Pikachu meets a thunder stone.")
+    make_pokemon("bulbasaur", color="green", flavor_text="A seed on its back.")
+    url = reverse("pokemon-list")
+
+    def search(term, **params):
+        response = api_client.get(url, {"search": term, "fields": "name", **params})
+        assert response.status_code == 200
+        return [p["name"] for p in response.data["results"]]
+
+    assert search("pikachu") == ["pikachu", "raichu"]
+    assert search("PIKA") == ["pikachu", "raichu"]
+    assert search("seeds") == ["bulbasaur"]
+    assert search("green") == ["bulbasaur"]
+    assert search("thunder stone") == ["raichu"]
+    assert search("nothing-like-it") == []
+
+
+@pytest.mark.django_db
+def test_search_results_page_with_a_cursor(api_client):
+    """Test ranked search results walk through the cursor without gaps"""
+    for i in range(5):
+        make_pokemon(f"sparky{i}")
+    make_pokemon("bulbasaur")
+    url = reverse("pokemon-list")
+
+    names = []
+    response = api_client.get(url, {"search": "sparky", "page_size": 2})
+    while True:
+        assert response.status_code == 200
+        names += [p["name"] for p in response.data["results"]]
+        if not response.data["next"]:
+            break
+        response = api_client.get(response.data["next"])
+
+    assert sorted(names) == [f"sparky{i}" for i in range(5)]
+
+
+@pytest.mark.django_db
+def test_search_results_with_distinct_ranks_page_without_overlap(api_client):
+    """Test the cursor moves past rows whose float ranks differ"""
+    for i in range(40):
+        make_pokemon(f"mon{i}", flavor_text=" ".join(["spark"] * (i + 1) + ["x"] * i))
+    url = reverse("pokemon-list")
+
+    ids = []
+    response = api_client.get(url, {"search": "spark", "page_size": 3})
+    for _ in range(20):
+        assert response.status_code == 200
+        ids += [p["id"] for p in response.data["results"]]
+        if not response.data["next"]:
+            break
+        response = api_client.get(response.data["next"])
+    else:
+        pytest.fail("The cursor did not reach the last page")
+
+    assert len(ids) == len(set(ids)) == 40
+
+
+@pytest.mark.django_db
+def test_list_filters_by_types_and_abilities(api_client):
+    """Test ?type= / ?ability= with match=all (@>) and match=any (&&)"""
+    make_pokemon("charizard", types=["fire", "flying"], abilities=["blaze"])
+    make_pokemon("charmander", types=["fire"], abilities=["blaze"])
+    make_pokemon("pidgey", types=["normal", "flying"], abilities=["keen-eye"])
+    url = reverse("pokemon-list")
+
+    def names(params):
+        response = api_client.get(url, {"fields": "name", **params})
+        assert response.status_code == 200
+        return sorted(p["name"] for p in response.data["results"])
+
+    assert names({"type": ["fire", "flying"]}) == ["charizard"]
+    assert names({"type": "Fire,Flying", "match": "any"}) == [
+        "charizard",
+        "charmander",
+        "pidgey",
+    ]
+    assert names({"type": "fire", "ability": "blaze"}) == ["charizard", "charmander"]
+    assert names({"ability": ["blaze", "keen-eye"], "match": "any"}) == [
+        "charizard",
+        "charmander",
+        "pidgey",
+    ]
+    assert api_client.get(url, {"match": "some"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_fast_read_path_matches_the_serializer():
+    """Test pokemon_representation mirrors PokemonModelSerializer output"""
+    pokemon = make_pokemon("pikachu", cries_url=None, habitat=None)
+    row = Pokemon.objects.values().get(id=pokemon.id)
+    sparse = ["name", "base_stats", "created_at"]
+
+    expected = PokemonModelSerializer(pokemon).data
+    assert pokemon_representation(pokemon) == expected
+    assert list(pokemon_representation(pokemon)) == list(expected)
+    assert pokemon_representations([row]) == [expected]
+    assert pokemon_representation(row, sparse) == (
+        PokemonModelSerializer(pokemon, fields=sparse).data
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+    """Test ETag / Last-Modified revalidation of the catalog endpoints"""
+
+    def test_list_revalidates_without_touching_the_database(
+        self, api_client, django_assert_num_queries
+    ):
+        make_pokemon("pikachu")
+        url = reverse("pokemon-list")
+        first = api_client.get(url, {"fields": "name"})
+        assert first.status_code == 200
+        assert first.has_header("Last-Modified")
+
+        with django_assert_num_queries(0):
+            cached = api_client.get(
+                url, {"fields": "name"}, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+        assert cached.status_code == 304
+
+        # Another representation of the same catalog has its own ETag
+        other = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert other.status_code == 200
+
+    def test_catalog_writes_change_the_list_etag(self, api_client):
+        url = reverse("pokemon-list")
+        etag = api_client.get(url)["ETag"]
+
+        make_pokemon("raichu")
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_detail_revalidates_on_updated_at(
+        self, api_client, django_assert_num_queries
+    ):
+        pokemon = make_pokemon("pikachu")
+        url = reverse("pokemon-detail", args=[pokemon.id])
+        etag = api_client.get(url)["ETag"]
+
+        with django_assert_num_queries(1):
+            assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        pokemon.speed = 120
+        pokemon.save()
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
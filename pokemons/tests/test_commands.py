@@ -0,0 +1,297 @@
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from pokemons.checkpoint import IngestCheckpoint
+from pokemons.models import Pokemon
+from pokemons.pokeapi import PokemonAPIError
+from pokemons.services import bulk_upsert_pokemon
+from pokemons.snapshot import SNAPSHOT_FORMAT
+from pokemons.tests.test_services import make_raw_pokemon
+
+COMMAND_MODULE = "pokemons.management.commands.load_top_pokemons"
+
+
+def fake_full_pokemon_data(pokemon_id, limiter=None, base_url=None):
+    if pokemon_id == 3:
+        raise ValueError("upstream exploded")
+    # Popularity grows with the id: more moves per Pokemon
+    return make_raw_pokemon(f"mon{pokemon_id}", moves_count=pokemon_id * 10)
+
+
+@pytest.mark.django_db
+class TestLoadTopPokemons:
+    """Test the load_top_pokemons ingest command without hitting PokeAPI"""
+
+    @pytest.fixture(autouse=True)
+    def checkpoint_path(self, tmp_path):
+        self.checkpoint_path = tmp_path / "checkpoint.jsonl"
+
+    def run_command(self, fetch=fake_full_pokemon_data, **options):
+        out = StringIO()
+        with (
+            patch(f"{COMMAND_MODULE}.POKEMON_IDS", range(1, 7)),
+            patch(
+                f"{COMMAND_MODULE}.get_full_pokemon_data", side_effect=fetch
+            ) as mock_fetch,
+        ):
+            call_command(
+                "load_top_pokemons",
+                concurrent=2,
+                checkpoint=str(self.checkpoint_path),
+                stdout=out,
+                **options,
+            )
+        return out.getvalue(), sorted(c.args[0] for c in mock_fetch.call_args_list)
+
+    def test_saves_only_the_top_n(self):
+        output, _ = self.run_command(limit=2)
+
+        assert sorted(Pokemon.objects.values_list("name", flat=True)) == [
+            "mon5",
+            "mon6",
+        ]
+        assert "Fetched 5 Pokemon" in output
+        assert "2 inserted" in output
+
+    def test_checkpoints_fetched_records_and_failures(self):
+        self.run_command(limit=2)
+
+        fetched, failed = IngestCheckpoint(self.checkpoint_path).load()
+        assert sorted(fetched) == [1, 2, 4, 5, 6]
+        assert fetched[5]["popularity_score"] == 25
+        assert failed == {3: "upstream exploded"}
+
+    def test_retry_failed_fetches_only_failed_ids(self):
+        self.run_command(limit=10)
+
+        output, fetched_ids = self.run_command(
+            fetch=lambda pid, *args: make_raw_pokemon(f"mon{pid}"),
+            limit=10,
+            retry_failed=True,
+        )
+
+        assert fetched_ids == [3]
+        assert Pokemon.objects.filter(name="mon3").exists()
+        assert IngestCheckpoint(self.checkpoint_path).load()[1] == {}
+
+    def test_resume_skips_attempted_ids(self):
+        checkpoint = IngestCheckpoint(self.checkpoint_path)
+        checkpoint.open()
+        with checkpoint:
+            checkpoint.record_success(
+                1, {**make_raw_pokemon("mon1"), "popularity_score": 999}
+            )
+            checkpoint.record_failure(2, "timeout")
+
+        output, fetched_ids = self.run_command(limit=1, resume=True)
+
+        assert fetched_ids == [3, 4, 5, 6]
+        # The checkpointed record still competes for the top-N
+        assert list(Pokemon.objects.values_list("name", flat=True)) == ["mon1"]
+
+    def test_resume_after_a_truncated_last_line_keeps_new_entries(self):
+        checkpoint = IngestCheckpoint(self.checkpoint_path)
+        checkpoint.open()
+        with checkpoint:
+            checkpoint.record_failure(1, "timeout")
+        # A run killed mid-write
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write('{"id": 2, "status": "o')
+
+        checkpoint.open(resume=True)
+        with checkpoint:
+            checkpoint.record_failure(3, "timeout")
+
+        assert IngestCheckpoint(self.checkpoint_path).load()[1] == {
+            1: "timeout",
+            3: "timeout",
+        }
+
+
+@pytest.mark.django_db
+class TestBenchmarkIngest:
+    """Test the ingest benchmark against the bundled fake PokeAPI"""
+
+    def run_benchmark(self, **options):
+        out = StringIO()
+        with patch(f"{COMMAND_MODULE}.POKEMON_IDS", range(1, 6)):
+            call_command(
+                "benchmark_ingest", latency=0, concurrent=2, stdout=out, **options
+            )
+        return out.getvalue()
+
+    @pytest.mark.parametrize("use_async", [False, True])
+    def test_reports_results_without_touching_the_catalog(self, tmp_path, use_async):
+        output_path = tmp_path / "benchmark.json"
+
+        output = self.run_benchmark(use_async=use_async, output=str(output_path))
+
+        result = json.loads(output_path.read_text())
+        assert (result["fetched"], result["failed"]) == (5, 0)
+        assert result["p99_latency"] >= result["p50_latency"] > 0
+        assert result["peak_rss_mb"] > 0
+        assert "throughput" in output
+        assert Pokemon.objects.count() == 0
+
+    def test_fails_when_a_threshold_is_missed(self):
+        with pytest.raises(CommandError, match="throughput"):
+            self.run_benchmark(min_throughput=1_000_000)
+
+
+def test_benchmark_serializers_reports_each_variant():
+    out = StringIO()
+    call_command("benchmark_serializers", count=20, rounds=1, stdout=out)
+
+    output = out.getvalue()
+    assert "PokemonModelSerializer" in output
+    assert output.count("µs/object") == 3
+
+
+@pytest.mark.django_db
+class TestCatalogSnapshot:
+    """Test export_catalog / import_catalog round trips"""
+
+    def test_round_trip_preserves_catalog(self, tmp_path):
+        bulk_upsert_pokemon(
+            [make_raw_pokemon("bulbasaur"), make_raw_pokemon("charmander")]
+        )
+        expected = list(Pokemon.objects.order_by("name").values())
+        path = tmp_path / "catalog.jsonl.gz"
+
+        call_command("export_catalog", str(path), stdout=StringIO())
+        Pokemon.objects.all().delete()
+        call_command("import_catalog", str(path), chunk_size=1, stdout=StringIO())
+
+        imported = list(Pokemon.objects.order_by("name").values())
+        ignore = {"created_at", "updated_at", "fetched_at"}
+        assert [
+            {k: v for k, v in row.items() if k not in ignore} for row in imported
+        ] == [{k: v for k, v in row.items() if k not in ignore} for row in expected]
+
+    def test_export_is_deterministic(self, tmp_path):
+        bulk_upsert_pokemon([make_raw_pokemon("bulbasaur")])
+
+        call_command("export_catalog", str(tmp_path / "a.gz"), stdout=StringIO())
+        call_command("export_catalog", str(tmp_path / "b.gz"), stdout=StringIO())
+
+        assert (tmp_path / "a.gz").read_bytes() == (tmp_path / "b.gz").read_bytes()
+
+    def test_rejects_unknown_snapshot_version(self, tmp_path):
+        path = tmp_path / "catalog.jsonl.gz"
+        with gzip.open(path, "wt") as f:
+            f.write(json.dumps({"format": SNAPSHOT_FORMAT, "version": 99}) + "\n")
+
+        with pytest.raises(CommandError, match="version 99"):
+            call_command("import_catalog", str(path), stdout=StringIO())
+
+    @pytest.mark.parametrize(
+        "bad_line, error",
+        [('["bulbasaur", "gra', "line 3 is not valid JSON"), ('["x"]', "line 3 does")],
+    )
+    def test_rejects_corrupt_and_short_rows(self, tmp_path, bad_line, error):
+        bulk_upsert_pokemon([make_raw_pokemon("bulbasaur")])
+        path = tmp_path / "catalog.jsonl.gz"
+        call_command("export_catalog", str(path), stdout=StringIO())
+        with gzip.open(path, "at") as f:
+            f.write(bad_line + "\n")
+        Pokemon.objects.all().delete()
+
+        with pytest.raises(CommandError, match=error):
+            call_command("import_catalog", str(path), stdout=StringIO())
+        assert not Pokemon.objects.exists()
+
+
+@pytest.mark.django_db
+class TestRefreshCatalog:
+    """Test hash-driven incremental catalog refresh"""
+
+    def test_writes_only_changed_rows_and_emits_changeset(self, tmp_path):
+        bulk_upsert_pokemon(
+            [
+                make_raw_pokemon("bulbasaur"),
+                make_raw_pokemon("ivysaur"),
+                make_raw_pokemon("missingno"),
+                make_raw_pokemon("pikachu"),
+            ]
+        )
+        long_ago = timezone.now() - timedelta(days=2)
+        Pokemon.objects.exclude(name="pikachu").update(fetched_at=long_ago)
+        untouched = Pokemon.objects.get(name="bulbasaur").updated_at
+
+        def fetch(name, limiter=None, base_url=None):
+            if name == "missingno":
+                raise PokemonAPIError("gone", status_code=404)
+            if name == "ivysaur":
+                return make_raw_pokemon(name, color="blue")
+            return make_raw_pokemon(name)
+
+        changeset_path = tmp_path / "changeset.json"
+        with patch(
+            "pokemons.management.commands.refresh_catalog.get_full_pokemon_data",
+            side_effect=fetch,
+        ) as mock_fetch:
+            call_command(
+                "refresh_catalog",
+                "venusaur",
+                changeset=str(changeset_path),
+                stdout=StringIO(),
+            )
+
+        # Fresh rows are not re-fetched
+        assert sorted(c.args[0] for c in mock_fetch.call_args_list) == [
+            "bulbasaur",
+            "ivysaur",
+            "missingno",
+            "venusaur",
+        ]
+        assert json.loads(changeset_path.read_text()) == {
+            "added": ["venusaur"],
+            "changed": ["ivysaur"],
+            "removed": ["missingno"],
+        }
+        bulbasaur = Pokemon.objects.get(name="bulbasaur")
+        assert bulbasaur.updated_at == untouched
+        assert bulbasaur.fetched_at > long_ago
+        assert Pokemon.objects.get(name="ivysaur").color == "blue"
+
+    def test_rows_created_through_the_api_are_not_refreshed_or_removed(self):
+        bulk_upsert_pokemon([make_raw_pokemon("missingno")])
+        Pokemon.objects.update(fetched_at=timezone.now() - timedelta(days=2))
+        response = APIClient().post(
+            reverse("pokemon-list"),
+            {
+                "name": "homebrewmon",
+                "types": ["normal"],
+                "abilities": ["run-away"],
+                "hp": 50,
+                "attack": 50,
+                "defense": 50,
+                "special_attack": 50,
+                "special_defense": 50,
+                "speed": 50,
+            },
+            format="json",
+        )
+        assert response.status_code == 201
+
+        def fetch(name, limiter=None, base_url=None):
+            raise PokemonAPIError("gone", status_code=404)
+
+        with patch(
+            "pokemons.management.commands.refresh_catalog.get_full_pokemon_data",
+            side_effect=fetch,
+        ) as mock_fetch:
+            call_command("refresh_catalog", delete_removed=True, stdout=StringIO())
+
+        assert [c.args[0] for c in mock_fetch.call_args_list] == ["missingno"]
+        assert list(Pokemon.objects.values_list("name", flat=True)) == ["homebrewmon"]
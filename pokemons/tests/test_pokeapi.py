@@ -0,0 +1,484 @@
+import asyncio
+import threading
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+import redis
+import requests
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+from pokemons import pokeapi
+from pokemons.async_pokeapi import AsyncPokeAPIClient, fetch_all_pokemon_data
+from pokemons.dataclasses import FakePokeAPIConfig
+from pokemons.fake_pokeapi import FakePokeAPIServer
+from pokemons.http_cache import ResponseCache
+from pokemons.pokeapi import (
+    PokemonAPIError,
+    _get_json,
+    cache_key,
+    extract_pokemon_fields,
+    extract_species_fields,
+    get_retry_count,
+    parse_retry_after,
+)
+from pokemons.rate_limit import RedisTokenBucket, TokenBucket
+
+BASE_URL = "http://fake-pokeapi.test/api/v2"
+
+
+def make_pokemon_payload(pokemon_id: int) -> dict:
+    return {
+        "name": f"pokemon-{pokemon_id}",
+        "types": [{"type": {"name": "fire"}}],
+        "abilities": [{"ability": {"name": "blaze"}}],
+        "stats": [{"stat": {"name": "special-attack"}, "base_stat": 60}],
+        "moves": [{"move": {"name": "ember"}}] * 20,
+        "held_items": [],
+        "game_indices": [{"game_index": pokemon_id}],
+        "sprites": {"front_default": "https://img.test/front.png"},
+        "cries": {"latest": "https://img.test/cry.ogg"},
+    }
+
+
+def make_species_payload() -> dict:
+    return {
+        "color": {"name": "red"},
+        "habitat": {"name": "mountain"},
+        "flavor_text_entries": [
+            {"flavor_text": "Hot\nstuff.", "language": {"name": "en"}}
+        ],
+    }
+
+
+def fake_pokeapi_handler(request: httpx.Request) -> httpx.Response:
+    resource, key = request.url.path.rstrip("/").split("/")[-2:]
+    if resource == "pokemon":
+        return httpx.Response(200, json=make_pokemon_payload(int(key)))
+    return httpx.Response(200, json=make_species_payload())
+
+
+class TestTokenBucket:
+    """Test the shared token bucket rate limiter"""
+
+    def test_burst_is_served_immediately(self):
+        bucket = TokenBucket(rate=1, burst=5)
+        started = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        assert time.monotonic() - started < 0.1
+
+    def test_waits_for_refill_after_burst(self):
+        bucket = TokenBucket(rate=20, burst=1)
+        started = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        # Two tokens beyond the burst at 20/s take ~0.1s
+        assert time.monotonic() - started >= 0.09
+
+    def test_pause_holds_back_callers(self):
+        bucket = TokenBucket(rate=100, burst=10)
+        bucket.pause(0.1)
+        started = time.monotonic()
+        asyncio.run(bucket.acquire_async())
+        assert time.monotonic() - started >= 0.09
+
+    def test_rejects_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+        with pytest.raises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+
+class TestRedisTokenBucket:
+    """Test the token bucket shared between processes through Redis"""
+
+    @pytest.fixture
+    def name(self):
+        return f"test-{uuid.uuid4().hex}"
+
+    def test_instances_share_one_budget(self, name):
+        first = RedisTokenBucket(rate=20, burst=2, name=name)
+        second = RedisTokenBucket(rate=20, burst=2, name=name)
+        first.acquire()
+        first.acquire()
+
+        started = time.monotonic()
+        second.acquire()
+        # The burst was spent by the other instance: wait one refill (~0.05s)
+        assert time.monotonic() - started >= 0.04
+
+    def test_pause_applies_to_every_instance(self, name):
+        RedisTokenBucket(rate=100, burst=10, name=name).pause(0.1)
+
+        started = time.monotonic()
+        RedisTokenBucket(rate=100, burst=10, name=name).acquire()
+        assert time.monotonic() - started >= 0.08
+
+    def test_falls_back_to_a_local_bucket_without_redis(self, name):
+        unreachable = redis.Redis(port=1, retry=Retry(NoBackoff(), 0))
+        bucket = RedisTokenBucket(rate=20, burst=1, name=name)
+
+        with patch(
+            "pokemons.rate_limit.get_redis_connection", return_value=unreachable
+        ):
+            started = time.monotonic()
+            for _ in range(3):
+                bucket.acquire()
+        assert time.monotonic() - started >= 0.09
+
+
+class TestParseRetryAfter:
+    """Test Retry-After header parsing"""
+
+    def test_delta_seconds(self):
+        assert parse_retry_after("3") == 3.0
+
+    def test_http_date_in_the_past(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_missing_or_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+def make_http_response(status_code: int, body: bytes = b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = f"{BASE_URL}/pokemon/1"
+    return response
+
+
+class TestGetJsonRetries:
+    """Test which failures the sync client retries, and how long it waits"""
+
+    url = f"{BASE_URL}/pokemon/1"
+
+    @pytest.fixture(autouse=True)
+    def no_cache_or_shared_limit(self):
+        with (
+            patch.object(pokeapi, "get_response_cache", return_value=None),
+            patch.object(pokeapi, "get_upstream_limiter", return_value=None),
+            patch.object(_get_json.retry, "sleep") as self.sleep,
+        ):
+            yield
+
+    def get_json(self, *responses, limiter=None):
+        with patch.object(pokeapi.session, "get", side_effect=responses) as mock_get:
+            try:
+                return _get_json(self.url, limiter)
+            finally:
+                self.calls = mock_get.call_count
+
+    def test_client_errors_are_not_retried(self):
+        with pytest.raises(PokemonAPIError) as excinfo:
+            self.get_json(make_http_response(404))
+
+        assert excinfo.value.status_code == 404
+        assert self.calls == 1
+        self.sleep.assert_not_called()
+
+    def test_server_errors_are_retried_with_backoff(self):
+        retries_before = get_retry_count()
+
+        body = self.get_json(
+            make_http_response(503), make_http_response(200, b'{"ok": true}')
+        )
+
+        assert body == {"ok": True}
+        assert self.calls == 2
+        assert get_retry_count() - retries_before == 1
+
+    def test_waits_as_long_as_retry_after_asks(self):
+        limiter = TokenBucket(rate=1000, burst=10)
+
+        with patch.object(limiter, "pause") as pause:
+            self.get_json(
+                make_http_response(429, headers={"Retry-After": "2"}),
+                make_http_response(200, b"{}"),
+                limiter=limiter,
+            )
+
+        self.sleep.assert_called_once_with(2.0)
+        pause.assert_called_once_with(2.0)
+
+    def test_gives_up_when_retry_after_exceeds_the_budget(self):
+        with pytest.raises(PokemonAPIError) as excinfo:
+            self.get_json(make_http_response(503, headers={"Retry-After": "60"}))
+
+        assert excinfo.value.retry_after == 60.0
+        assert self.calls == 1
+        self.sleep.assert_not_called()
+
+
+class TestExtractFields:
+    """Test reducing PokeAPI payloads to the fields the catalog uses"""
+
+    def test_extract_pokemon_fields_counts_bulky_lists(self):
+        fields = extract_pokemon_fields(make_pokemon_payload(6))
+
+        assert fields["types"] == ["fire"]
+        assert fields["stats"] == {"special_attack": 60}
+        assert fields["image_url"] == "https://img.test/front.png"
+        assert fields["moves_count"] == 20
+        assert (fields["held_items_count"], fields["game_indices_count"]) == (0, 1)
+        assert not {"moves", "held_items", "game_indices"} & set(fields)
+
+    def test_extract_species_fields_handles_missing_habitat(self):
+        payload = {**make_species_payload(), "habitat": None}
+
+        assert extract_species_fields(payload) == {
+            "color": "red",
+            "habitat": "unknown",
+            "flavor_text": "Hot stuff.",
+        }
+
+
+class TestResponseCache:
+    """Test the on-disk conditional-request response cache"""
+
+    url = f"{BASE_URL}/pokemon/1"
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return ResponseCache(tmp_path)
+
+    @pytest.fixture
+    def shared_cache(self, cache):
+        with patch.object(pokeapi, "response_cache", cache):
+            yield cache
+
+    def make_response(self, status_code, payload=None, headers=None):
+        response = MagicMock(status_code=status_code, headers=headers or {})
+        response.json.return_value = payload
+        return response
+
+    def test_round_trip_and_conditional_headers(self, cache):
+        cache.set(self.url, {"name": "bulbasaur"}, etag='"abc"', last_modified="x")
+
+        entry = cache.get(self.url)
+        assert entry.payload == {"name": "bulbasaur"}
+        assert cache.conditional_headers(entry) == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "x",
+        }
+        assert cache.get(f"{BASE_URL}/pokemon/2") is None
+
+    def test_failed_writes_leave_no_temporary_file(self, cache, tmp_path):
+        with pytest.raises(TypeError):
+            cache.set(self.url, {"name": object()})
+
+        assert list(tmp_path.rglob("*.tmp")) == []
+        assert cache.get(self.url) is None
+
+    def test_stores_response_and_revalidates_with_etag(self, shared_cache):
+        fresh = self.make_response(200, {"name": "bulbasaur"}, {"ETag": '"v1"'})
+        not_modified = self.make_response(304)
+
+        with patch.object(pokeapi.session, "get", side_effect=[fresh, not_modified]):
+            assert _get_json(self.url) == {"name": "bulbasaur"}
+            assert _get_json(self.url) == {"name": "bulbasaur"}
+            second_call = pokeapi.session.get.call_args_list[1]
+
+        assert second_call.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        not_modified.json.assert_not_called()
+
+    def test_caches_extracted_fields_under_their_own_key(self, shared_cache):
+        fresh = self.make_response(200, make_pokemon_payload(1), {"ETag": '"v1"'})
+
+        with patch.object(pokeapi.session, "get", return_value=fresh):
+            fields = _get_json(self.url, extract=extract_pokemon_fields)
+
+        assert fields["moves_count"] == 20
+        assert shared_cache.get(self.url) is None
+        cached = shared_cache.get(cache_key(self.url, extract_pokemon_fields))
+        assert cached.payload == fields
+        assert cached.etag == '"v1"'
+
+    def test_offline_mode_serves_only_from_cache(self, shared_cache):
+        shared_cache.offline = True
+        shared_cache.set(self.url, {"name": "bulbasaur"})
+
+        with patch.object(pokeapi.session, "get") as mock_get:
+            assert _get_json(self.url) == {"name": "bulbasaur"}
+            with pytest.raises(PokemonAPIError):
+                _get_json(f"{BASE_URL}/pokemon/2")
+            mock_get.assert_not_called()
+
+
+class TestAsyncPokeAPIClient:
+    """Test the asyncio PokeAPI client against an in-memory transport"""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, tmp_path):
+        self.cache = ResponseCache(tmp_path)
+
+    def make_client(self, handler, **kwargs) -> AsyncPokeAPIClient:
+        return AsyncPokeAPIClient(
+            rate=1000,
+            burst=100,
+            base_url=BASE_URL,
+            transport=httpx.MockTransport(handler),
+            cache=self.cache,
+            **kwargs,
+        )
+
+    def test_get_full_pokemon_data_normalizes_both_resources(self):
+        async def run():
+            async with self.make_client(fake_pokeapi_handler) as client:
+                return await client.get_full_pokemon_data(4)
+
+        data = asyncio.run(run())
+        assert data["name"] == "pokemon-4"
+        assert data["types"] == ["fire"]
+        assert data["color"] == "red"
+        assert data["flavor_text"] == "Hot stuff."
+        assert data["base_stats"]["special_attack"] == 60
+        assert data["moves_count"] == 20
+        assert "moves" not in data
+
+    def test_honors_retry_after_on_429(self):
+        calls = []
+
+        def handler(request):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0.2"})
+            return httpx.Response(200, json={"ok": True})
+
+        async def run():
+            async with self.make_client(handler) as client:
+                return await client.get_json(f"{BASE_URL}/pokemon/1"), client.retries
+
+        body, retries = asyncio.run(run())
+        assert body == {"ok": True}
+        assert retries == 1
+        assert calls[1] - calls[0] >= 0.19
+
+    def test_revalidates_cached_response(self):
+        seen_headers = []
+
+        def handler(request):
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"ok": True}, headers={"ETag": '"v1"'})
+
+        async def run():
+            async with self.make_client(handler) as client:
+                first = await client.get_json(f"{BASE_URL}/pokemon/1")
+                second = await client.get_json(f"{BASE_URL}/pokemon/1")
+                return first, second
+
+        assert asyncio.run(run()) == ({"ok": True}, {"ok": True})
+        assert seen_headers == [None, '"v1"']
+
+    def test_gives_up_when_retry_after_exceeds_the_budget(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503, headers={"Retry-After": "60"})
+
+        async def run():
+            async with self.make_client(handler) as client:
+                await client.get_json(f"{BASE_URL}/pokemon/1")
+
+        with pytest.raises(PokemonAPIError) as excinfo:
+            asyncio.run(run())
+        assert excinfo.value.status_code == 503
+        assert len(calls) == 1
+
+    def test_client_errors_are_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(404)
+
+        async def run():
+            async with self.make_client(handler) as client:
+                await client.get_json(f"{BASE_URL}/pokemon/missingno")
+
+        with pytest.raises(PokemonAPIError):
+            asyncio.run(run())
+        assert len(calls) == 1
+
+    def test_fetch_all_reports_results_and_errors(self):
+        def handler(request):
+            if request.url.path.endswith("/3"):
+                return httpx.Response(404)
+            return fake_pokeapi_handler(request)
+
+        results, errors = {}, {}
+
+        async def run():
+            async with self.make_client(handler) as client:
+                await fetch_all_pokemon_data(
+                    client,
+                    range(1, 6),
+                    concurrency=2,
+                    on_result=lambda pid, data: results.__setitem__(pid, data),
+                    on_error=lambda pid, error: errors.__setitem__(pid, error),
+                )
+
+        asyncio.run(run())
+        assert sorted(results) == [1, 2, 4, 5]
+        assert list(errors) == [3]
+
+
+class TestFakePokeAPIServer:
+    """Test the local PokeAPI stand-in used for benchmarks"""
+
+    @pytest.fixture
+    def serve(self):
+        servers = []
+
+        def start(**config):
+            server = FakePokeAPIServer(
+                ("127.0.0.1", 0), FakePokeAPIConfig(max_id=10, **config)
+            )
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            servers.append(server)
+            return server.base_url
+
+        yield start
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_serves_payloads_the_client_can_normalize(self, serve):
+        base_url = serve()
+
+        with patch.object(pokeapi, "get_response_cache", return_value=None):
+            data = pokeapi.get_full_pokemon_data(7, base_url=base_url)
+
+        assert data["name"] == "pokemon-7"
+        assert data["moves_count"] >= 10
+        assert data["base_stats"]["hp"] > 0
+
+    def test_supports_etags_and_unknown_ids(self, serve):
+        base_url = serve()
+
+        first = requests.get(f"{base_url}/pokemon/1", timeout=5)
+        revalidated = requests.get(
+            f"{base_url}/pokemon/1",
+            headers={"If-None-Match": first.headers["ETag"]},
+            timeout=5,
+        )
+
+        assert revalidated.status_code == 304
+        assert requests.get(f"{base_url}/pokemon/11", timeout=5).status_code == 404
+
+    def test_injects_rate_limiting(self, serve):
+        base_url = serve(rate_limit_rate=1.0, retry_after=2)
+
+        response = requests.get(f"{base_url}/pokemon-species/1", timeout=5)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
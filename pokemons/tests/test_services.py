@@ -0,0 +1,117 @@
+import pytest
+
+from pokemons.models import Pokemon
+from pokemons.services import (
+    TopPokemonHeap,
+    bulk_upsert_pokemon,
+    slim_pokemon_record,
+    validate_pokemon_record,
+)
+
+
+def make_raw_pokemon(name: str, **overrides) -> dict:
+    data = {
+        "name": name,
+        "types": ["grass", "poison"],
+        "color": "green",
+        "habitat": "grassland",
+        "abilities": ["overgrow"],
+        "flavor_text": "A strange seed was planted on its back at birth.",
+        "base_stats": {
+            "hp": 45,
+            "attack": 49,
+            "defense": 49,
+            "special_attack": 65,
+            "special_defense": 65,
+            "speed": 45,
+        },
+        "image_url": "https://img.test/front.png",
+        "cries_url": None,
+        "game_indices_count": 20,
+        "held_items_count": 0,
+        "moves_count": 80,
+    }
+    data.update(overrides)
+    return data
+
+
+def test_validate_pokemon_record():
+    """Test the lightweight schema check used before bulk persistence"""
+    assert validate_pokemon_record(make_raw_pokemon("bulbasaur")) == []
+
+    errors = validate_pokemon_record(
+        make_raw_pokemon("", types="grass", base_stats={"hp": "45"})
+    )
+    assert [error.split(":")[0] for error in errors] == ["name", "types", "base_stats"]
+
+
+def test_slim_pokemon_record_drops_popularity_counts():
+    """Test that ingest keeps the score but not the counts it was computed from"""
+    slim = slim_pokemon_record(make_raw_pokemon("bulbasaur"))
+
+    assert slim["popularity_score"] == 28
+    assert not {"moves_count", "held_items_count", "game_indices_count"} & set(slim)
+    assert slim["base_stats"]["hp"] == 45
+
+
+def test_top_pokemon_heap_keeps_only_the_most_popular():
+    """Test bounded top-N selection with deterministic tie-breaking"""
+    heap = TopPokemonHeap(limit=3)
+    scores = {1: 10, 2: 50, 3: 30, 4: 50, 5: 5, 6: 30}
+    for pokemon_id, score in scores.items():
+        heap.push(pokemon_id, {"name": f"mon{pokemon_id}", "popularity_score": score})
+
+    assert len(heap) == 3
+    # Ties on score go to the lower Pokemon id
+    assert [record["name"] for record in heap.top()] == ["mon2", "mon4", "mon3"]
+
+
+@pytest.mark.django_db
+class TestBulkUpsertPokemon:
+    """Test chunked bulk persistence of ingested Pokemon"""
+
+    def test_inserts_new_pokemon(self, django_assert_max_num_queries):
+        records = [make_raw_pokemon(f"mon{i}") for i in range(50)]
+
+        # Per chunk: SELECT + INSERT ... ON CONFLICT, wrapped in a savepoint
+        with django_assert_max_num_queries(8):
+            result = bulk_upsert_pokemon(records, chunk_size=25)
+
+        assert (result.inserted, result.updated, result.unchanged) == (50, 0, 0)
+        assert Pokemon.objects.count() == 50
+        bulbasaur = Pokemon.objects.get(name="mon0")
+        assert bulbasaur.special_attack == 65
+        assert bulbasaur.popularity_score == 28
+
+    def test_reports_updated_and_unchanged_rows(self):
+        bulk_upsert_pokemon(
+            [make_raw_pokemon("bulbasaur"), make_raw_pokemon("ivysaur")]
+        )
+        original = Pokemon.objects.get(name="bulbasaur")
+
+        result = bulk_upsert_pokemon(
+            [
+                make_raw_pokemon("bulbasaur"),
+                make_raw_pokemon("ivysaur", color="blue"),
+                make_raw_pokemon("venusaur"),
+            ]
+        )
+
+        assert (result.inserted, result.updated, result.unchanged) == (1, 1, 1)
+        assert Pokemon.objects.get(name="ivysaur").color == "blue"
+        # Unchanged rows are not rewritten
+        assert Pokemon.objects.get(name="bulbasaur").updated_at == original.updated_at
+        assert Pokemon.objects.get(name="bulbasaur").id == original.id
+
+    def test_skips_invalid_records_and_duplicates(self):
+        result = bulk_upsert_pokemon(
+            [
+                make_raw_pokemon("bulbasaur", color="green"),
+                make_raw_pokemon("bulbasaur", color="blue"),
+                make_raw_pokemon("missingno", abilities=None),
+            ]
+        )
+
+        assert result.inserted == 1
+        assert list(result.invalid) == ["missingno"]
+        assert Pokemon.objects.get(name="bulbasaur").color == "blue"
@@ -1,22 +1,50 @@
+import hashlib
+import uuid
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from requests.exceptions import RequestException
-from rest_framework import filters, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
-from pokemons.cache import get_pokemon_from_cache, set_pokemon_to_cache
+from core.async_views import AsyncAPIView
+from pokemons.async_pokeapi import get_async_pokeapi_client
+from pokemons.cache import (
+    aget_pokemon_from_cache,
+    aset_pokemon_to_cache,
+    get_catalog_version,
+)
 from pokemons.exceptions import (
     InvalidPokemonData,
     PokemonAPIUnavailable,
 )
-from pokemons.models import Pokemon
-from pokemons.pokeapi import PokemonAPIError, get_full_pokemon_data
-from pokemons.serializers import PokemonDataSerializer, PokemonModelSerializer
+from pokemons.filters import (
+    PokemonArrayFilter,
+    PokemonOrderingFilter,
+    PokemonSearchFilter,
+)
+from pokemons.models import Pokemon, normalize_pokemon_name
+from pokemons.pagination import PokemonCursorPagination
+from pokemons.pokeapi import PokemonAPIError
+from pokemons.serializers import (
+    PokemonDataSerializer,
+    PokemonModelSerializer,
+    pokemon_representation,
+    pokemon_representations,
+)
 
 
-class PokemonSearchView(APIView):
+class PokemonSearchView(AsyncAPIView):
+    """
+    Async search path: Redis, then the database, then PokeAPI over a pooled
+    httpx client. Under an ASGI server a slow upstream holds a coroutine,
+    not a worker; only the ORM write runs in a thread.
+    """
 
     @swagger_auto_schema(
         operation_summary="Match a Pokémon by name",
@@ -39,36 +67,37 @@ class PokemonSearchView(APIView):
             502: "PokeAPI is unavailable or returned an error",
         },
     )
-    def post(self, request):
-        name = request.data.get("name")
+    async def post(self, request):
+        # One canonical form for the cache key, the DB lookup and PokeAPI
+        name = normalize_pokemon_name(request.data.get("name") or "")
         if not name:
             raise ValidationError("Pokemon name is required")
 
         try:
             # 1. Redis cache
-            cached = get_pokemon_from_cache(name)
+            cached = await aget_pokemon_from_cache(name)
             if cached:
                 return Response(cached)
 
             # 2. Database
-            db_result = self.get_pokemon_from_db(name)
+            db_result = await self.get_pokemon_from_db(name)
             if db_result:
                 return Response(db_result)
 
             # 3. External PokeAPI
-            raw_data = self.fetch_from_pokeapi(name)
+            raw_data = await self.fetch_from_pokeapi(name)
 
             # 4. Validate external data
             data_serializer = PokemonDataSerializer(data=raw_data)
             data_serializer.is_valid(raise_exception=True)
 
             # 5. Save to DB and return
-            pokemon = self.save_pokemon_if_new(raw_data)
-            model_serializer = PokemonModelSerializer(pokemon)
+            pokemon = await sync_to_async(self.save_pokemon_if_new)(raw_data)
+            data = pokemon_representation(pokemon)
 
             # 6. Cache and return
-            set_pokemon_to_cache(name, model_serializer.data)
-            return Response(model_serializer.data, status=status.HTTP_200_OK)
+            await aset_pokemon_to_cache(name, data)
+            return Response(data, status=status.HTTP_200_OK)
 
         except ValidationError:
             raise InvalidPokemonData()
@@ -77,24 +106,23 @@ class PokemonSearchView(APIView):
         except Exception as e:
             raise PokemonAPIUnavailable(detail=f"Unexpected error: {str(e)}")
 
-    def get_pokemon_from_db(self, name):
+    async def get_pokemon_from_db(self, name):
         try:
-            pokemon = Pokemon.objects.get(name__iexact=name)
-            serializer = PokemonModelSerializer(pokemon)
-            set_pokemon_to_cache(name, serializer.data)
-            return serializer.data
+            pokemon = await Pokemon.objects.by_name(name).aget()
+            data = pokemon_representation(pokemon)
+            await aset_pokemon_to_cache(name, data)
+            return data
         except Pokemon.DoesNotExist:
             return None
 
-    def fetch_from_pokeapi(self, name):
+    async def fetch_from_pokeapi(self, name):
         try:
-            return get_full_pokemon_data(name)
-        except (KeyError, TypeError, ValueError, RequestException):
+            return await get_async_pokeapi_client().get_full_pokemon_data(name)
+        except (KeyError, TypeError, ValueError):
             raise ValidationError("Malformed response from PokeAPI")
 
     def save_pokemon_if_new(self, raw_data):
-        pokemon, created = Pokemon.objects.get_or_create(
-            name__iexact=raw_data["name"],
+        pokemon, created = Pokemon.objects.by_name(raw_data["name"]).get_or_create(
             defaults={
                 "name": raw_data["name"],
                 "types": raw_data["types"],
@@ -113,29 +141,182 @@ class PokemonSearchView(APIView):
         return pokemon
 
 
+def is_valid_uuid(value) -> bool:
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+def _catalog_version(request):
+    # Memoized per request: condition() asks for the ETag and Last-Modified
+    if not hasattr(request, "_catalog_version"):
+        request._catalog_version = get_catalog_version()
+    return request._catalog_version
+
+
+def _pokemon_updated_at(request, pk):
+    if not hasattr(request, "_pokemon_updated_at"):
+        request._pokemon_updated_at = (
+            Pokemon.objects.filter(pk=pk).values_list("updated_at", flat=True).first()
+            if is_valid_uuid(pk)
+            else None
+        )
+    return request._pokemon_updated_at
+
+
+def _representation_etag(version: str, request) -> str:
+    # The query string (fields, cursor, page size, search...) shapes the body
+    return hashlib.sha256(f"{version}|{request.get_full_path()}".encode()).hexdigest()
+
+
+def catalog_list_etag(request, *args, **kwargs):
+    """List ETag: the catalog generation, no database access"""
+    version = _catalog_version(request)
+    return _representation_etag(version["token"], request) if version else None
+
+
+def catalog_list_last_modified(request, *args, **kwargs):
+    version = _catalog_version(request)
+    if version is None:
+        return None
+    return datetime.fromtimestamp(version["last_modified"], tz=dt_timezone.utc)
+
+
+def pokemon_detail_etag(request, pk=None, *args, **kwargs):
+    """Detail ETag: the row's updated_at, read with one primary-key lookup"""
+    updated_at = _pokemon_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    return _representation_etag(f"{pk}|{updated_at.isoformat()}", request)
+
+
+def pokemon_detail_last_modified(request, pk=None, *args, **kwargs):
+    return _pokemon_updated_at(request, pk)
+
+
+fields_param = openapi.Parameter(
+    "fields",
+    openapi.IN_QUERY,
+    description="Comma-separated sparse fieldset, e.g. name,types,image_url",
+    type=openapi.TYPE_STRING,
+)
+array_filter_params = [
+    openapi.Parameter(
+        "type",
+        openapi.IN_QUERY,
+        description="Pokemon type; repeat or comma-separate for several",
+        type=openapi.TYPE_ARRAY,
+        items=openapi.Items(type=openapi.TYPE_STRING),
+        collection_format="multi",
+    ),
+    openapi.Parameter(
+        "ability",
+        openapi.IN_QUERY,
+        description="Ability; repeat or comma-separate for several",
+        type=openapi.TYPE_ARRAY,
+        items=openapi.Items(type=openapi.TYPE_STRING),
+        collection_format="multi",
+    ),
+    openapi.Parameter(
+        "match",
+        openapi.IN_QUERY,
+        description="all: Pokemon must have every type/ability given; any: at least one",
+        type=openapi.TYPE_STRING,
+        enum=["all", "any"],
+        default="all",
+    ),
+]
+
+
 class PokemonViewSet(viewsets.ModelViewSet):
     queryset = Pokemon.objects.all()
     serializer_class = PokemonModelSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["name", "color", "habitat"]
+    pagination_class = PokemonCursorPagination
+    # ?search= over name, flavor text, color and habitat, ranked when searching
+    filter_backends = [PokemonArrayFilter, PokemonSearchFilter, PokemonOrderingFilter]
     ordering_fields = ["hp", "attack", "defense", "speed", "created_at"]
-    ordering = ["-created_at"]
+    # Matches the composite (-created_at, id) index the cursor pages over
+    ordering = ["-created_at", "id"]
+
+    def get_sparse_fields(self) -> list | None:
+        """Parses ?fields= on reads; None means the full representation"""
+        if self.request.method != "GET" or "fields" not in self.request.query_params:
+            return None
+        fields = [
+            name.strip()
+            for name in self.request.query_params["fields"].split(",")
+            if name.strip()
+        ]
+        allowed = PokemonModelSerializer.output_fields()
+        unknown = [name for name in fields if name not in allowed]
+        if unknown or not fields:
+            raise ValidationError(
+                {"fields": f"Unknown or empty fields {unknown}; choose from {allowed}"}
+            )
+        return fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        # Select only what is rendered, plus the columns the cursor is built from
+        return queryset.only(
+            *PokemonModelSerializer.columns_for(fields), "created_at", "id"
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
 
     @swagger_auto_schema(
         operation_summary="List all Pokémon",
+        manual_parameters=[fields_param, *array_filter_params],
         responses={
             200: openapi.Response("List of Pokémon", PokemonModelSerializer(many=True))
         },
     )
+    @method_decorator(
+        condition(
+            etag_func=catalog_list_etag, last_modified_func=catalog_list_last_modified
+        )
+    )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        # Read path: plain dicts from .values() rows, no model instances
+        fields = self.get_sparse_fields()
+        columns = PokemonModelSerializer.columns_for(
+            fields or PokemonModelSerializer.output_fields()
+        )
+        queryset = self.filter_queryset(self.get_queryset())
+        # The cursor is built from the ordering columns (search_rank included)
+        cursor_columns = [
+            name.lstrip("-")
+            for name in self.paginator.get_ordering(request, queryset, self)
+        ]
+        page = self.paginate_queryset(
+            queryset.values(*dict.fromkeys([*columns, *cursor_columns]))
+        )
+        return self.get_paginated_response(pokemon_representations(page, fields))
 
     @swagger_auto_schema(
         operation_summary="Retrieve Pokémon by ID",
+        manual_parameters=[fields_param],
         responses={200: openapi.Response("Pokémon details", PokemonModelSerializer())},
     )
+    @method_decorator(
+        condition(
+            etag_func=pokemon_detail_etag,
+            last_modified_func=pokemon_detail_last_modified,
+        )
+    )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        return Response(
+            pokemon_representation(self.get_object(), self.get_sparse_fields())
+        )
 
     @swagger_auto_schema(
         operation_summary="Create a new Pokémon",